@@ -0,0 +1,6 @@
+"""
+Benchmarks for the email collector
+
+Run individual benchmarks as modules from the backend directory, e.g.:
+    python -m benchmarks.keyword_matcher
+"""
@@ -0,0 +1,371 @@
+"""
+Local fakes of the Gmail and Supabase APIs for offline benchmarks
+
+Both fakes sit below the repo's own clients: FakeGmailService stands in for the
+googleapiclient resource passed to GmailClient(service=...), and FakeSupabase
+for the supabase-py Client passed to SupabaseClient(client=...). Everything above
+them (parsing, serialization, model validation, dedup, triage) is the real code.
+Gemini is faked by the existing stub LLM backend (LLM_BACKEND=stub).
+
+Each fake sleeps `latency_ms` (+ uniform jitter) per executed request and counts
+calls by operation.
+"""
+
+import json
+import time
+import uuid
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from email_collector.utils.sharding import Shard
+
+from .mailbox import SyntheticMailbox
+
+class _Latency:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep((self.latency_ms + jitter) / 1000)
+
+class _Request:
+    """Deferred call mirroring googleapiclient's HttpRequest.execute()"""
+
+    def __init__(self, run: Callable[[], Any]):
+        self._run = run
+
+    def execute(self, num_retries: int = 0) -> Any:
+        return self._run()
+
+class FakeGmailService:
+    """
+    In-process Gmail API over a SyntheticMailbox
+
+    Supports users().messages().list/get and users().threads().get. The search
+    query is not evaluated: every synthetic thread is a sponsorship thread.
+    Responses are JSON round-tripped so decode cost matches the real client.
+    """
+
+    def __init__(self, mailbox: SyntheticMailbox, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.mailbox = mailbox
+        self.latency = _Latency(latency_ms, jitter_ms, seed=1)
+        self.calls: Counter = Counter()
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._refs: Optional[List[Dict[str, str]]] = None
+
+    def _respond(self, operation: str, resource: Any) -> Any:
+        self.latency.wait()
+        encoded = json.dumps(resource)
+        with self._lock:
+            self.calls[operation] += 1
+            self.bytes += len(encoded)
+        return json.loads(encoded)
+
+    # Resource tree: service.users().messages() / service.users().threads()
+    def users(self) -> "FakeGmailService":
+        return self
+
+    def messages(self) -> "_FakeMessages":
+        return _FakeMessages(self)
+
+    def threads(self) -> "_FakeThreads":
+        return _FakeThreads(self)
+
+    def _list(self, maxResults: int = 100, pageToken: Optional[str] = None, **_) -> Dict[str, Any]:
+        if self._refs is None:
+            self._refs = list(self.mailbox.iter_message_refs())
+        start = int(pageToken or 0)
+        end = min(start + min(maxResults, 500), len(self._refs))
+        response: Dict[str, Any] = {"resultSizeEstimate": len(self._refs)}
+        if end > start:
+            response["messages"] = self._refs[start:end]
+        if end < len(self._refs):
+            response["nextPageToken"] = str(end)
+        return self._respond("messages.list", response)
+
+class _FakeMessages:
+    def __init__(self, service: FakeGmailService):
+        self.service = service
+
+    def list(self, userId: str = "me", **kwargs) -> _Request:
+        return _Request(lambda: self.service._list(**kwargs))
+
+    def get(self, userId: str = "me", id: str = "", format: str = "full") -> _Request:
+        return _Request(lambda: self.service._respond("messages.get", self.service.mailbox.message(id)))
+
+class _FakeThreads:
+    def __init__(self, service: FakeGmailService):
+        self.service = service
+
+    def get(self, userId: str = "me", id: str = "", format: str = "full") -> _Request:
+        return _Request(lambda: self.service._respond("threads.get", self.service.mailbox.thread(id)))
+
+class _Result:
+    def __init__(self, data: Any):
+        self.data = data
+
+class _Query:
+    """Subset of the postgrest query builder used by SupabaseClient"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.operation = "select"
+        self.columns: Optional[List[str]] = None
+        self.payload: Any = None
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.equals: Dict[str, Any] = {}
+        self.order_by: Optional[tuple] = None
+        self.row_range: Optional[tuple] = None
+        self.row_limit: Optional[int] = None
+
+    def select(self, columns: str = "*") -> "_Query":
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, payload: Any) -> "_Query":
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def update(self, payload: Dict[str, Any]) -> "_Query":
+        self.operation, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload: Any, on_conflict: str = "id") -> "_Query":
+        self.operation, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        self.equals[column] = value
+        self.filters.append(lambda row: str(row.get(column)) == str(value) if value is not None else row.get(column) is None)
+        return self
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "_Query":
+        self.order_by = (column, desc)
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self.row_range = (start, end)
+        return self
+
+    def limit(self, count: int) -> "_Query":
+        self.row_limit = count
+        return self
+
+    def execute(self) -> _Result:
+        return self.db._execute(self)
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the supabase-py Client
+
+    Implements the table operations SupabaseClient issues (select / insert /
+    update / upsert with eq, lt, order, range, limit) and the RPCs the collector
+    calls.
+    Payloads are JSON round-tripped to mirror request/response encoding.
+    Thread-safe, since pipelined runs write from several worker threads.
+    """
+
+    THREAD_DEFAULTS = {
+        "llm_processed": False, "llm_failure_count": 0, "llm_transient_failure_count": 0, "llm_last_error": None,
+        "lease_owner": None, "lease_expires_at": None, "organization_id": None,
+    }
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {"email_threads": [], "email_messages": [], "email_thread_aliases": []}
+        self.thread_by_id: Dict[str, Dict[str, Any]] = {}
+        self.thread_by_gmail_id: Dict[str, Dict[str, Any]] = {}
+        self.messages_by_thread: Dict[str, List[Dict[str, Any]]] = {}
+        self.message_ids: set = set()
+        self.organizations: Dict[str, str] = {}
+        self.latency = _Latency(latency_ms, jitter_ms, seed=2)
+        self.calls: Counter = Counter()
+        self.bytes = 0
+        self._lock = threading.RLock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> _Request:
+        handler = getattr(self, f"_rpc_{name}")
+        return _Request(lambda: self._call(f"rpc.{name}", lambda: handler(**self._roundtrip(params))))
+
+    def _roundtrip(self, payload: Any) -> Any:
+        encoded = json.dumps(payload, default=str)
+        self.bytes += len(encoded)
+        return json.loads(encoded)
+
+    def _call(self, operation: str, run: Callable[[], Any]) -> _Result:
+        self.latency.wait()
+        with self._lock:
+            self.calls[operation] += 1
+            return _Result(self._roundtrip(run()))
+
+    # Table operations
+    def _execute(self, query: _Query) -> _Result:
+        return self._call(f"{query.table}.{query.operation}", lambda: self._run_query(query))
+
+    def _run_query(self, query: _Query) -> Any:
+        if query.operation == "insert":
+            rows = query.payload if isinstance(query.payload, list) else [query.payload]
+            inserted = [self._insert_row(query.table, self._roundtrip(row)) for row in rows]
+            return inserted
+
+        if query.operation == "upsert":
+            rows = query.payload if isinstance(query.payload, list) else [query.payload]
+            written = []
+            for row in map(self._roundtrip, rows):
+                existing = next((stored for stored in self.tables[query.table]
+                                 if stored.get(query.on_conflict) == row[query.on_conflict]), None)
+                if existing is None:
+                    written.append(self._insert_row(query.table, row))
+                else:
+                    existing.update(row)
+                    written.append(dict(existing))
+            return written
+
+        rows = self._match(query)
+        if query.operation == "update":
+            changes = self._roundtrip(query.payload)
+            for row in rows:
+                row.update(changes)
+                if query.table == "email_threads" and "gmail_thread_id" in changes:
+                    self.thread_by_gmail_id[row["gmail_thread_id"]] = row
+            return [dict(row) for row in rows]
+
+        if query.order_by:
+            column, desc = query.order_by
+            rows = sorted(rows, key=lambda row: (row.get(column) is None, row.get(column) or ""), reverse=desc)
+        if query.row_range:
+            rows = rows[query.row_range[0]:query.row_range[1] + 1]
+        if query.row_limit is not None:
+            rows = rows[:query.row_limit]
+        if query.columns:
+            return [{column: row.get(column) for column in query.columns} for row in rows]
+        return [dict(row) for row in rows]
+
+    def _match(self, query: _Query) -> List[Dict[str, Any]]:
+        return [row for row in self._scan(query) if all(check(row) for check in query.filters)]
+
+    def _scan(self, query: _Query) -> List[Dict[str, Any]]:
+        """Rows to filter; equality lookups on indexed columns avoid full scans (like the real indexes)"""
+        indexes = {
+            "email_threads": (("id", self.thread_by_id), ("gmail_thread_id", self.thread_by_gmail_id)),
+            "email_messages": (),
+            "email_thread_aliases": (),
+        }
+        for column, index in indexes[query.table]:
+            if column in query.equals:
+                row = index.get(str(query.equals[column]))
+                return [row] if row is not None else []
+        if query.table == "email_messages" and "thread_id" in query.equals:
+            return self.messages_by_thread.get(str(query.equals["thread_id"]), [])
+        return self.tables[query.table]
+
+    def _insert_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", now)
+        if table == "email_threads":
+            for column, default in self.THREAD_DEFAULTS.items():
+                row.setdefault(column, default)
+            row["updated_at"] = now
+            self.thread_by_id[row["id"]] = row
+            self.thread_by_gmail_id[row["gmail_thread_id"]] = row
+        elif table == "email_messages":
+            self.message_ids.add(row["gmail_message_id"])
+            self.messages_by_thread.setdefault(str(row["thread_id"]), []).append(row)
+        self.tables[table].append(row)
+        return dict(row)
+
+    # RPCs (see sql/*.sql for the real definitions)
+    def _rpc_save_thread_messages(self, p_thread_id: str, p_messages: List[Dict[str, Any]]) -> int:
+        inserted = 0
+        for message in p_messages:
+            if message["gmail_message_id"] in self.message_ids:
+                continue
+            self._insert_row("email_messages", {**message, "thread_id": p_thread_id})
+            inserted += 1
+
+        thread = self.thread_by_id.get(p_thread_id)
+        stored = self.messages_by_thread.get(p_thread_id, [])
+        if thread is not None and stored:
+            last = max(stored, key=lambda message: message["received_date"])
+            thread.update({
+                "last_message_sender_name": last.get("sender_name"),
+                "last_message_sender_email": last.get("sender_email"),
+                "last_message_subject": last.get("subject"),
+                "last_message_snippet": last.get("snippet"),
+                "last_message_from_user": last.get("is_from_user", False),
+                "last_received_date": last.get("received_date"),
+            })
+        return inserted
+
+    def _rpc_claim_threads_for_processing(self, p_worker_id: str, p_limit: int, p_lease_seconds: int,
+                                          p_max_failures: int, p_shard_index: int = 0,
+                                          p_shard_count: int = 1) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        claimable = [
+            row for row in self.tables["email_threads"]
+            if not row["llm_processed"] and row["llm_failure_count"] < p_max_failures
+            and (row["lease_expires_at"] is None or row["lease_expires_at"] < now.isoformat())
+            and (p_shard_count <= 1 or Shard.bucket(row["gmail_thread_id"], p_shard_count) == p_shard_index)
+        ]
+        claimable.sort(key=lambda row: row["last_message_date"], reverse=True)
+        expires = (now + timedelta(seconds=p_lease_seconds)).isoformat()
+        claimed = []
+        for row in claimable[:p_limit]:
+            row["lease_owner"], row["lease_expires_at"] = p_worker_id, expires
+            claimed.append(dict(row))
+        return claimed
+
+    def _rpc_claim_thread_for_processing(self, p_thread_id: str, p_worker_id: str, p_lease_seconds: int,
+                                         p_max_failures: int) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        row = self.thread_by_id.get(p_thread_id)
+        if (row is None or row["llm_processed"] or row["llm_failure_count"] >= p_max_failures
+                or (row["lease_expires_at"] is not None and row["lease_expires_at"] >= now.isoformat()
+                    and row["lease_owner"] != p_worker_id)):
+            return []
+        row["lease_owner"] = p_worker_id
+        row["lease_expires_at"] = (now + timedelta(seconds=p_lease_seconds)).isoformat()
+        return [dict(row)]
+
+    def _rpc_renew_thread_leases(self, p_worker_id: str, p_thread_ids: List[str], p_lease_seconds: int) -> int:
+        expires = (datetime.now(timezone.utc) + timedelta(seconds=p_lease_seconds)).isoformat()
+        renewed = 0
+        for thread_id in p_thread_ids:
+            row = self.thread_by_id.get(thread_id)
+            if row is not None and row["lease_owner"] == p_worker_id:
+                row["lease_expires_at"] = expires
+                renewed += 1
+        return renewed
+
+    def _rpc_sync_thread_organization(self, p_thread_id: str, p_domain: str, p_name: str,
+                                      p_last_contact: Optional[str], p_contacts: List[Dict[str, Any]]) -> str:
+        org_id = self.organizations.setdefault(p_domain, str(uuid.uuid4()))
+        row = self.thread_by_id.get(p_thread_id)
+        if row is not None:
+            row["organization_id"] = org_id
+        return org_id
+
+    def _rpc_update_organization_value(self, p_thread_id: str, p_org_name: Optional[str], p_value: Optional[float]) -> None:
+        row = self.thread_by_id.get(p_thread_id)
+        if row is not None:
+            row["organization_value"] = p_value
+        return None
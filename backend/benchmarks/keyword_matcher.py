@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+KeywordMatcher benchmark
+
+Compares the compiled single-scan matcher against the previous per-keyword regex
+implementation on synthetic sponsorship messages.
+
+Usage:
+    python -m benchmarks.keyword_matcher [--messages 5000] [--body-words 300]
+"""
+
+import re
+import time
+import random
+import argparse
+
+from email_collector.utils.keywords import KeywordMatcher
+
+FILLER_WORDS = [
+    "hello", "team", "event", "thanks", "regards", "meeting", "budget", "proposal",
+    "students", "conference", "next", "week", "please", "let", "know", "attached",
+]
+
+def legacy_find_keywords(matcher: KeywordMatcher, text: str):
+    """Previous implementation: rebuild the keyword set and run one regex per keyword"""
+    if not text:
+        return []
+    text_lower = text.lower()
+    found_keywords = []
+    for keyword in matcher.get_all_keywords():
+        pattern = r'\b' + re.escape(keyword) + r'\b'
+        if re.search(pattern, text_lower):
+            found_keywords.append(keyword)
+    return found_keywords
+
+def legacy_keyword_score(matcher: KeywordMatcher, subject: str, body: str, snippet: str = "") -> float:
+    """Previous get_keyword_score: two full keyword passes per message"""
+    found_keywords = legacy_find_keywords(matcher, f"{subject} {body} {snippet}")
+    if not found_keywords:
+        return 0.0
+    score = sum(1.0 if keyword in KeywordMatcher.PRIMARY_KEYWORDS else 0.5 for keyword in found_keywords)
+    score += len(legacy_find_keywords(matcher, subject)) * 0.5
+    return min(score, 5.0)
+
+def generate_messages(count: int, body_words: int, seed: int = 42):
+    """Synthetic (subject, body, snippet) tuples with a sprinkling of keywords"""
+    rng = random.Random(seed)
+    keywords = sorted(KeywordMatcher().get_all_keywords())
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(body_words)]
+        for _ in range(rng.randint(0, 4)):
+            words[rng.randrange(body_words)] = rng.choice(keywords)
+        subject = f"{rng.choice(keywords).title()} opportunity for {rng.choice(FILLER_WORDS)}"
+        body = " ".join(words)
+        messages.append((subject, body, body[:100]))
+    return messages
+
+def time_it(label: str, func, message_count: int) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {elapsed * 1000:>10.1f} ms  {elapsed / message_count * 1e6:>8.1f} us/message")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="KeywordMatcher benchmark")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--body-words", type=int, default=300)
+    args = parser.parse_args()
+
+    matcher = KeywordMatcher()
+    messages = generate_messages(args.messages, args.body_words)
+
+    legacy_scores = []
+    compiled_scores = []
+    batch_scores = []
+
+    legacy = time_it("legacy get_keyword_score", lambda: legacy_scores.extend(
+        legacy_keyword_score(matcher, *message) for message in messages), len(messages))
+    compiled = time_it("compiled get_keyword_score", lambda: compiled_scores.extend(
+        matcher.get_keyword_score(*message) for message in messages), len(messages))
+    batch = time_it("get_keyword_scores_batch", lambda: batch_scores.extend(
+        matcher.get_keyword_scores_batch(messages)), len(messages))
+
+    assert legacy_scores == compiled_scores == batch_scores, "Scores diverged from the legacy implementation"
+    print(f"\nSpeedup: {legacy / compiled:.1f}x per-message, {legacy / batch:.1f}x batch (scores identical)")
+
+if __name__ == "__main__":
+    main()
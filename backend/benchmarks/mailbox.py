@@ -0,0 +1,211 @@
+"""
+Synthetic Gmail mailbox
+
+Generates Gmail API thread/message resources (format='full') deterministically
+from a seed, one thread at a time, so mailboxes of 100k threads never have to be
+held in memory. MIME structures mirror what real sponsorship mail looks like:
+
+- text/plain single-part messages
+- multipart/alternative (plain + HTML)
+- multipart/mixed wrapping an alternative part and a PDF attachment
+- HTML-only messages
+- single-part messages in legacy charsets (ISO-8859-1 / Windows-1252)
+- replies carrying the full quoted history of the thread
+"""
+
+import base64
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from email_collector.config import Config
+
+ORGANIZATIONS = [
+    ("Acme Labs", "acme-labs.com"), ("Globex", "globex.io"), ("Initech", "initech.com"),
+    ("Umbrella Health", "umbrella-health.org"), ("Hooli", "hooli.xyz"), ("Stark Industries", "stark.com"),
+    ("Wayne Enterprises", "wayne-ent.com"), ("Soylent Foods", "soylent.co"), ("Vandelay Imports", "vandelay.net"),
+    ("Pied Piper", "piedpiper.com"), ("Cyberdyne", "cyberdyne.ai"), ("Tyrell Corp", "tyrell.co.uk"),
+]
+FREEMAIL_DOMAINS = ["gmail.com", "outlook.com", "yahoo.com"]
+FIRST_NAMES = ["Alex", "Sam", "Priya", "Jordan", "Mei", "Lucas", "Amara", "Diego", "Noor", "Ines", "Kai", "Zoë"]
+LAST_NAMES = ["Nguyen", "Smith", "García", "Okafor", "Müller", "Chen", "Rossi", "Kowalski", "Haddad", "Silva"]
+EVENTS = ["HackHarvard", "the Spring Hackathon", "Demo Day", "the AI Summit", "the Career Fair"]
+SUBJECTS = [
+    "Sponsorship opportunity with {org}", "{org} x {event} partnership", "Partnership opportunity: {event}",
+    "Sponsoring {event}", "Brand partnership proposal from {org}", "{event} sponsor package",
+]
+SENTENCES = [
+    "We would love to sponsor {event} this year.",
+    "Our team can offer {amount} in cash sponsorship plus swag for attendees.",
+    "Could you share the sponsorship deck and the tier benefits?",
+    "Happy to jump on a call next week to discuss the partnership.",
+    "We are also open to an in-kind partnership covering catering.",
+    "Please find attached our proposal for the event.",
+    "Let me know if the Gold tier is still available.",
+    "Thanks for reaching out about {event}!",
+    "Our marketing budget for student events is confirmed for Q3.",
+    "Looking forward to collaborating with your team.",
+]
+AMOUNTS = ["$5,000", "$2.5k", "€3,000", "$10,000", "£1,500", "$500-$1,000", "up to $20k"]
+LEGACY_CHARSET_TEXT = "Café crème for the résumé workshop – merci beaucoup, Zoë. Sponsorship confirmed: 2 500 €."
+
+# (mime kind, weight)
+MIME_KINDS = [
+    ("plain", 0.25),
+    ("alternative", 0.30),
+    ("mixed_attachment", 0.20),
+    ("html_only", 0.15),
+    ("legacy_charset", 0.10),
+]
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+def _header_list(headers: Dict[str, str]) -> List[Dict[str, str]]:
+    return [{"name": name, "value": value} for name, value in headers.items()]
+
+class SyntheticMailbox:
+    """
+    Deterministic mailbox of `thread_count` sponsorship threads
+
+    Thread ids are stable ("t0000002a"), so two runs with the same seed see the
+    same mailbox. Message counts per thread are drawn up front (one int per
+    thread); everything else is generated when a thread is requested.
+    """
+
+    def __init__(self, thread_count: int, seed: int = 7, max_messages: int = 8,
+                 quoted_history: bool = True, start: datetime = None):
+        self.thread_count = thread_count
+        self.seed = seed
+        self.quoted_history = quoted_history
+        self.start = start or datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+        rng = random.Random(seed)
+        # Most threads are short; a tail of long ones carries large quoted histories
+        self.message_counts = [
+            min(max_messages, 1 + int(rng.expovariate(0.6))) for _ in range(thread_count)
+        ]
+        self.mime_kinds = [kind for kind, _ in MIME_KINDS]
+        self.mime_weights = [weight for _, weight in MIME_KINDS]
+
+    @property
+    def message_total(self) -> int:
+        return sum(self.message_counts)
+
+    @staticmethod
+    def thread_id(index: int) -> str:
+        return f"t{index:08x}"
+
+    @staticmethod
+    def message_id(index: int, position: int) -> str:
+        return f"m{index:08x}{position:02x}"
+
+    @staticmethod
+    def thread_index(thread_id: str) -> int:
+        return int(thread_id[1:], 16)
+
+    def iter_message_refs(self) -> Iterator[Dict[str, str]]:
+        """messages.list entries, newest thread first (Gmail's ordering)"""
+        for index in range(self.thread_count - 1, -1, -1):
+            thread_id = self.thread_id(index)
+            for position in range(self.message_counts[index] - 1, -1, -1):
+                yield {"id": self.message_id(index, position), "threadId": thread_id}
+
+    def _body_text(self, rng: random.Random, org: str, event: str, sentences: int) -> str:
+        lines = ["Hi team,", ""]
+        for _ in range(sentences):
+            lines.append(rng.choice(SENTENCES).format(event=event, org=org, amount=rng.choice(AMOUNTS)))
+        lines += ["", "Best regards,"]
+        return "\n".join(lines)
+
+    def _payload(self, kind: str, headers: Dict[str, str], text: str) -> Dict[str, Any]:
+        html = "<html><body>" + "".join(f"<p>{line}</p>" for line in text.split("\n")) + "</body></html>"
+        plain_part = {"partId": "0", "mimeType": "text/plain",
+                      "headers": [{"name": "Content-Type", "value": "text/plain; charset=UTF-8"}],
+                      "body": {"size": len(text), "data": _b64(text.encode("utf-8"))}}
+        html_part = {"partId": "1", "mimeType": "text/html",
+                     "headers": [{"name": "Content-Type", "value": "text/html; charset=UTF-8"}],
+                     "body": {"size": len(html), "data": _b64(html.encode("utf-8"))}}
+
+        if kind == "plain":
+            return {"mimeType": "text/plain", "headers": _header_list(headers), "body": plain_part["body"]}
+        if kind == "html_only":
+            return {"mimeType": "text/html", "headers": _header_list(headers), "body": html_part["body"]}
+        if kind == "legacy_charset":
+            charset = "ISO-8859-1" if len(text) % 2 else "windows-1252"
+            legacy = f"{LEGACY_CHARSET_TEXT}\n{text}".encode("cp1252", errors="replace")
+            headers = {**headers, "Content-Type": f"text/plain; charset={charset}"}
+            return {"mimeType": "text/plain", "headers": _header_list(headers),
+                    "body": {"size": len(legacy), "data": _b64(legacy)}}
+
+        alternative = {"partId": "0", "mimeType": "multipart/alternative", "headers": [],
+                       "body": {"size": 0}, "parts": [plain_part, html_part]}
+        if kind == "alternative":
+            return {"mimeType": "multipart/alternative", "headers": _header_list(headers),
+                    "body": {"size": 0}, "parts": [plain_part, html_part]}
+
+        attachment = {"partId": "1", "mimeType": "application/pdf", "filename": "sponsorship-deck.pdf",
+                      "headers": [{"name": "Content-Disposition", "value": 'attachment; filename="sponsorship-deck.pdf"'}],
+                      "body": {"size": 482113, "attachmentId": f"att-{headers['Message-ID'][1:17]}"}}
+        return {"mimeType": "multipart/mixed", "headers": _header_list(headers),
+                "body": {"size": 0}, "parts": [alternative, attachment]}
+
+    def thread(self, thread_id: str) -> Dict[str, Any]:
+        """threads.get(format='full') resource"""
+        index = self.thread_index(thread_id)
+        rng = random.Random(self.seed * 1_000_003 + index)
+
+        org, domain = rng.choice(ORGANIZATIONS)
+        if rng.random() < 0.1:
+            domain = rng.choice(FREEMAIL_DOMAINS)
+        contact_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        contact = f"{contact_name.split()[0].lower()}.{index % 97}@{domain}"
+        event = rng.choice(EVENTS)
+        subject = rng.choice(SUBJECTS).format(org=org, event=event)
+
+        sent_at = self.start + timedelta(minutes=index * 7 + rng.randint(0, 300))
+        messages = []
+        history = ""
+        for position in range(self.message_counts[index]):
+            from_user = position % 2 == 1
+            sender = f"{Config.USER_NAME} <{Config.USER_EMAIL}>" if from_user else f'"{contact_name}" <{contact}>'
+            recipient = f'"{contact_name}" <{contact}>' if from_user else f"{Config.USER_NAME} <{Config.USER_EMAIL}>"
+            text = self._body_text(rng, org, event, rng.randint(2, 6))
+            if self.quoted_history and history:
+                quoted = "\n".join(f"> {line}" for line in history.split("\n"))
+                text = f"{text}\n\nOn {format_datetime(sent_at)}, {recipient} wrote:\n{quoted}"
+            history = text
+
+            headers = {
+                "From": sender,
+                "To": recipient,
+                "Subject": subject if position == 0 else f"Re: {subject}",
+                "Date": format_datetime(sent_at),
+                "Message-ID": f"<{self.message_id(index, position)}@mail.{domain}>",
+            }
+            if rng.random() < 0.2:
+                headers["Cc"] = f"partnerships@{domain}, events@college.harvard.edu"
+
+            kind = rng.choices(self.mime_kinds, weights=self.mime_weights)[0]
+            payload = self._payload(kind, headers, text)
+            messages.append({
+                "id": self.message_id(index, position),
+                "threadId": thread_id,
+                "labelIds": ["INBOX"] if not from_user else ["SENT"],
+                "snippet": " ".join(text.split())[:160],
+                "internalDate": str(int(sent_at.timestamp() * 1000)),
+                "sizeEstimate": len(text) * 2,
+                "payload": payload,
+            })
+            sent_at += timedelta(hours=rng.randint(1, 72))
+
+        return {"id": thread_id, "historyId": str(index), "messages": messages}
+
+    def message(self, message_id: str) -> Dict[str, Any]:
+        """messages.get(format='full') resource"""
+        index, position = int(message_id[1:9], 16), int(message_id[9:], 16)
+        return self.thread(self.thread_id(index))["messages"][position]
+
+    def stats(self) -> Tuple[int, int]:
+        return self.thread_count, self.message_total
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline throughput benchmark
+
+Runs the real EmailCollector against a synthetic mailbox served by local fakes
+of Gmail and Supabase and the stub LLM backend, and measures throughput, peak
+memory and call counts of collect_new_emails, process_with_llm and
+run_full_pipeline. Each (size, scenario) runs in a fresh child process, so peak
+RSS is per scenario. Results are written as JSON that can be diffed across runs
+with --compare.
+
+Usage:
+    python -m benchmarks.pipeline_throughput [--sizes 1000,10000,100000]
+        [--scenarios collect,process,full] [--gmail-latency-ms 0] [--db-latency-ms 0]
+        [--llm-latency-ms 0] [--jitter-ms 0] [--gmail-quota-units 0] [--output PATH] [--compare PREVIOUS.json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+SCENARIOS = ("collect", "process", "full")
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _configure(settings: Dict[str, Any], workdir: str, total_messages: int):
+    from email_collector.config import Config
+
+    # Offline run: dummy credentials satisfy Config.validate(), nothing leaves the process
+    for name in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "GMAIL_CLIENT_ID", "GMAIL_CLIENT_SECRET",
+                 "GMAIL_REFRESH_TOKEN", "GEMINI_API_KEY"):
+        setattr(Config, name, "benchmark")
+    Config.LLM_BACKEND = "stub"
+    Config.LLM_SYNTHETIC_LATENCY_MS = settings["llm_latency_ms"]
+    Config.GMAIL_QUOTA_UNITS_PER_SECOND = settings["gmail_quota_units"]
+    # The production cap (500 messages per search) would truncate large mailboxes
+    Config.MAX_RESULTS_PER_QUERY = total_messages
+    Config.DEDUP_INDEX_PATH = os.path.join(workdir, "dedup_index.npz")
+    Config.METRICS_JSON_PATH = ""
+    Config.METRICS_PROMETHEUS_PATH = ""
+
+def _build_collector(settings: Dict[str, Any], mailbox, db):
+    from email_collector.database.client import SupabaseClient
+    from email_collector.gmail.client import GmailClient
+    from email_collector.gmail.search import EmailSearcher
+    from email_collector.main import EmailCollector
+    from .fakes import FakeGmailService
+
+    gmail = FakeGmailService(mailbox, settings["gmail_latency_ms"], settings["jitter_ms"])
+    collector = EmailCollector(
+        db_client=SupabaseClient(client=db),
+        email_searcher=EmailSearcher(gmail_client=GmailClient(service=gmail)),
+    )
+    return collector, gmail
+
+def run_scenario(scenario: str, size: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario in the current process and return its measurements"""
+    import email_collector.main  # noqa: F401 - configures logging on import; override it below
+    from email_collector.utils.metrics import metrics
+    from .fakes import FakeSupabase
+    from .mailbox import SyntheticMailbox
+
+    logging.getLogger().setLevel(settings["log_level"])
+    mailbox = SyntheticMailbox(size, seed=settings["seed"])
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure(settings, workdir, mailbox.message_total)
+        db = FakeSupabase(settings["db_latency_ms"], settings["jitter_ms"])
+
+        if scenario == "process":
+            # Untimed setup: store the mailbox, then measure only the LLM stage
+            setup, _ = _build_collector(settings, mailbox, db)
+            asyncio.run(setup.collect_new_emails())
+
+        collector, gmail = _build_collector(settings, mailbox, db)
+        db.calls.clear()
+        metrics.reset()
+        baseline_rss = _peak_rss_mb()
+
+        started = time.perf_counter()
+        if scenario == "collect":
+            result = asyncio.run(collector.collect_new_emails())
+        elif scenario == "process":
+            result = asyncio.run(collector.process_with_llm(limit=size))
+        else:
+            result = asyncio.run(collector.run_full_pipeline())
+        seconds = time.perf_counter() - started
+
+    llm_threads = result.updated_threads + result.triaged_threads + result.failed_threads
+    stages = metrics.report()["stages"]
+    return {
+        "scenario": scenario,
+        "threads": size,
+        "messages": mailbox.message_total,
+        "seconds": round(seconds, 3),
+        "threads_per_second": round(size / seconds, 1) if seconds else None,
+        "messages_per_second": round(mailbox.message_total / seconds, 1) if seconds else None,
+        "llm_threads_per_second": round(llm_threads / seconds, 1) if seconds and llm_threads else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline_rss,
+        "result": {
+            "success": result.success,
+            "new_threads": result.new_threads,
+            "updated_threads": result.updated_threads,
+            "triaged_threads": result.triaged_threads,
+            "failed_threads": result.failed_threads,
+            "messages_processed": result.messages_processed,
+            "errors": len(result.errors),
+        },
+        "calls": {
+            "gmail": dict(sorted(gmail.calls.items())),
+            "supabase": dict(sorted(db.calls.items())),
+            "llm": result.llm_calls,
+        },
+        "bytes": {"gmail": gmail.bytes, "supabase": db.bytes},
+        "stages": {name: {key: stats[key] for key in ("calls", "seconds", "p50_seconds", "p95_seconds")}
+                   for name, stats in stages.items()},
+    }
+
+def _child(scenario: str, size: int, settings: Dict[str, Any], conn):
+    try:
+        conn.send(run_scenario(scenario, size, settings))
+    except Exception as e:
+        conn.send({"scenario": scenario, "threads": size, "error": repr(e)})
+    finally:
+        conn.close()
+
+def run_isolated(scenario: str, size: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(scenario, size, settings, child_conn))
+    process.start()
+    child_conn.close()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: List[Dict[str, Any]], previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {(row["scenario"], row["threads"]): row for row in json.load(f)["results"] if "error" not in row}
+
+    print(f"\nCompared with {previous_path}:")
+    for row in current:
+        before = previous.get((row["scenario"], row["threads"]))
+        if not before or "error" in row:
+            continue
+        speedup = before["seconds"] / row["seconds"] if row["seconds"] else float("inf")
+        print(f"  {row['scenario']:<8} {row['threads']:>7} threads: {before['seconds']:>8.2f}s -> {row['seconds']:>8.2f}s "
+              f"({speedup:.2f}x), peak RSS {before['peak_rss_mb']} -> {row['peak_rss_mb']} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline throughput benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated thread counts")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--gmail-latency-ms", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--gmail-quota-units", type=float, default=0.0,
+                        help="Gmail quota limiter in units/second (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--log-level", default="CRITICAL", help="Collector log level inside the benchmark processes")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/pipeline_throughput-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    scenarios = [scenario for scenario in args.scenarios.split(",") if scenario]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    settings = {
+        "gmail_latency_ms": args.gmail_latency_ms,
+        "db_latency_ms": args.db_latency_ms,
+        "llm_latency_ms": args.llm_latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "gmail_quota_units": args.gmail_quota_units,
+        "seed": args.seed,
+        "log_level": args.log_level.upper(),
+    }
+
+    results = []
+    print(f"{'scenario':<8} {'threads':>8} {'messages':>9} {'seconds':>9} {'threads/s':>10} {'peak RSS':>10}")
+    for size in sizes:
+        for scenario in scenarios:
+            row = run_isolated(scenario, size, settings)
+            results.append(row)
+            if "error" in row:
+                print(f"{scenario:<8} {size:>8} failed: {row['error']}")
+                continue
+            print(f"{scenario:<8} {size:>8} {row['messages']:>9} {row['seconds']:>9.2f} "
+                  f"{row['threads_per_second']:>10.1f} {row['peak_rss_mb']:>7.1f} MB")
+
+    created_at = datetime.now(timezone.utc)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"pipeline_throughput-{created_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "pipeline_throughput",
+            "created_at": created_at.isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": settings,
+            "results": results,
+        }, f, indent=2)
+        f.write("\n")
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+CLI startup benchmark
+
+Runs fresh interpreters with `-X importtime` and reports how long importing the
+collector takes with the SDK imports deferred, compared with loading every SDK
+up front the way main.py used to. Also lists the slowest top-level imports.
+
+Usage:
+    python -m benchmarks.startup_time [--runs 7] [--top 10]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("lazy (import main)", "import email_collector.main"),
+    ("lazy + EmailCollector()", "import email_collector.main as m; m.EmailCollector()"),
+    ("eager SDK imports", (
+        "import email_collector.main, email_collector.database.client, email_collector.gmail.search, "
+        "email_collector.llm.gemini_client, email_collector.utils.dedup, email_collector.utils.priority_refresh, "
+        "supabase, googleapiclient.discovery, google.generativeai"
+    )),
+]
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) for every line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Drop the separator space; remaining indentation (2 per level) marks nesting
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()[1:]))
+    return entries
+
+def run_importtime(statement: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Wall seconds and parsed import timings for one fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - started, parse_importtime(completed.stderr)
+
+def project_import_us(entries: List[Tuple[int, int, str]]) -> int:
+    """Cumulative import time of top-level modules, excluding interpreter startup (site)"""
+    return sum(cumulative for _, cumulative, name in entries
+               if not name.startswith(" ") and name not in ("site", "encodings"))
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    medians: Dict[str, float] = {}
+    print(f"{'scenario':<28} {'imports (median)':>18} {'process wall (median)':>24}")
+    for label, statement in SCENARIOS:
+        import_ms, wall_ms = [], []
+        package_us: Dict[str, List[int]] = defaultdict(list)
+        for _ in range(args.runs):
+            wall, entries = run_importtime(statement)
+            import_ms.append(project_import_us(entries) / 1000)
+            wall_ms.append(wall * 1000)
+            for _, cumulative, name in entries:
+                # Root packages wherever they were first imported (submodules are included)
+                if "." not in name.strip() and not name.strip().startswith("_"):
+                    package_us[name.strip()].append(cumulative)
+        medians[label] = statistics.median(import_ms)
+        print(f"{label:<28} {medians[label]:>15.1f} ms {statistics.median(wall_ms):>21.1f} ms")
+
+        if label == SCENARIOS[-1][0]:
+            heaviest = sorted(package_us.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+            print(f"\nSlowest third-party/stdlib packages under '{label}':")
+            for name, samples in heaviest[:args.top]:
+                print(f"  {name:<32} {statistics.median(samples) / 1000:>8.1f} ms")
+
+    lazy, eager = medians[SCENARIOS[0][0]], medians[SCENARIOS[-1][0]]
+    print(f"\nImporting main with deferred SDKs: {lazy:.1f} ms vs {eager:.1f} ms eager ({eager / lazy:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
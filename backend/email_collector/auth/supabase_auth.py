@@ -3,6 +3,7 @@ from typing import Optional
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from ..config import Config
+from ..database.models import MailboxAccount
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +13,34 @@ class SupabaseAuthClient:
     or environment variables as fallback
     """
     
-    def __init__(self):
+    def __init__(self, account: Optional[MailboxAccount] = None):
+        """
+        Args:
+            account: Mailbox to authenticate as (multi-mailbox runs); the single
+                inbox configured through GMAIL_REFRESH_TOKEN when omitted
+        """
+        self.account = account
         self.credentials: Optional[Credentials] = None
     
     def get_gmail_credentials(self) -> Optional[Credentials]:
         """
-        Get Gmail API credentials using refresh token from environment
+        Get Gmail API credentials using the account's refresh token, or the one from environment
         """
+        account = self.account
         try:
-            if not Config.GMAIL_REFRESH_TOKEN:
-                logger.error("No Gmail refresh token found in environment")
+            refresh_token = account.refresh_token if account else Config.GMAIL_REFRESH_TOKEN
+            if not refresh_token:
+                logger.error(f"No Gmail refresh token found for {account.email}" if account
+                             else "No Gmail refresh token found in environment")
                 return None
             
             # Create credentials from refresh token
             credentials = Credentials(
                 token=None,  # Will be refreshed
-                refresh_token=Config.GMAIL_REFRESH_TOKEN,
+                refresh_token=refresh_token,
                 token_uri="https://oauth2.googleapis.com/token",
-                client_id=Config.GMAIL_CLIENT_ID,
-                client_secret=Config.GMAIL_CLIENT_SECRET,
+                client_id=(account and account.client_id) or Config.GMAIL_CLIENT_ID,
+                client_secret=(account and account.client_secret) or Config.GMAIL_CLIENT_SECRET,
                 scopes=Config.GMAIL_SCOPES
             )
             
@@ -40,14 +50,14 @@ class SupabaseAuthClient:
             
             if credentials.valid:
                 self.credentials = credentials
-                logger.info("Successfully obtained Gmail credentials")
+                logger.info(f"Successfully obtained Gmail credentials{f' for {account.email}' if account else ''}")
                 return credentials
             else:
                 logger.error("Failed to refresh Gmail credentials")
                 return None
                 
         except Exception as e:
-            logger.error(f"Error getting Gmail credentials: {e}")
+            logger.error(f"Error getting Gmail credentials{f' for {account.email}' if account else ''}: {e}")
             return None
     
     def get_access_token(self) -> Optional[str]:
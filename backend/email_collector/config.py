@@ -24,6 +24,13 @@ class Config:
     USER_EMAIL = "jackfan@college.harvard.edu"
     USER_NAME = "Jack Fan"
 
+    # Multi-mailbox collection (see gmail/accounts.py): accounts come from a JSON file
+    # or a Supabase table; with neither, the single inbox above is collected
+    GMAIL_ACCOUNTS_FILE = os.getenv("GMAIL_ACCOUNTS_FILE", "")
+    GMAIL_ACCOUNTS_TABLE = os.getenv("GMAIL_ACCOUNTS_TABLE", "")  # e.g. gmail_accounts (sql/add_mailbox_accounts.sql)
+    # Fetched threads buffered between the per-account Gmail workers and the database writer
+    ACCOUNT_QUEUE_SIZE = int(os.getenv("ACCOUNT_QUEUE_SIZE", "50"))
+
     # Focused keywords for subject line search - more precise to reduce noise
     SPONSORSHIP_KEYWORDS = [
         "sponsorship", "partnership", "sponsor", "partnering",
@@ -39,10 +46,90 @@ class Config:
         'https://www.googleapis.com/auth/gmail.modify'
     ]
 
+    # Per-mailbox Gmail quota in units/second (list/get cost 5, threads.get 10); 0 disables
+    GMAIL_QUOTA_UNITS_PER_SECOND = float(os.getenv("GMAIL_QUOTA_UNITS_PER_SECOND", "250"))
+
+    # Gmail transport: pooled keep-alive connections shared by every request of a client
+    GMAIL_HTTP_POOL_SIZE = int(os.getenv("GMAIL_HTTP_POOL_SIZE", "10"))
+    GMAIL_HTTP_TIMEOUT_SECONDS = float(os.getenv("GMAIL_HTTP_TIMEOUT_SECONDS", "60"))
+    # Optional pinned discovery document (defaults to the copy bundled with google-api-python-client)
+    GMAIL_DISCOVERY_DOCUMENT = os.getenv("GMAIL_DISCOVERY_DOCUMENT", "")
+
+    # Retries, circuit breakers and hedged reads for Gmail, Supabase and Gemini (see utils/resilience.py)
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))  # Tries per call, including the first
+    RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+    RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "20"))
+    CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "8"))  # Consecutive transient failures
+    CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+    # Send a second copy of a slow idempotent read after this many seconds; 0 disables hedging
+    GMAIL_HEDGE_AFTER_SECONDS = float(os.getenv("GMAIL_HEDGE_AFTER_SECONDS", "0"))
+    SUPABASE_HEDGE_AFTER_SECONDS = float(os.getenv("SUPABASE_HEDGE_AFTER_SECONDS", "0"))
+    HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "8"))
+    # Budgets for all calls and retries made for one thread; 0 disables
+    GMAIL_THREAD_DEADLINE_SECONDS = float(os.getenv("GMAIL_THREAD_DEADLINE_SECONDS", "120"))
+    COLLECT_THREAD_DEADLINE_SECONDS = float(os.getenv("COLLECT_THREAD_DEADLINE_SECONDS", "120"))
+    LLM_THREAD_DEADLINE_SECONDS = float(os.getenv("LLM_THREAD_DEADLINE_SECONDS", "300"))
+    LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "120"))
+
     # Gemini Configuration
     GEMINI_MODEL = "gemini-1.5-flash"
     GEMINI_TEMPERATURE = 0.1
     GEMINI_MAX_OUTPUT_TOKENS = 2048
+    # Cache the static instruction prefix as a Gemini context cache (falls back to a
+    # system instruction when the prefix is below the model's minimum cacheable size)
+    GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() == "true"
+    GEMINI_CACHE_MODEL = os.getenv("GEMINI_CACHE_MODEL", "models/gemini-1.5-flash-002")
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+    GEMINI_PARSE_RETRIES = int(os.getenv("GEMINI_PARSE_RETRIES", "1"))  # Re-requests after local repair fails
+    LLM_MAX_FAILURES = int(os.getenv("LLM_MAX_FAILURES", "3"))  # Stop retrying a thread after this many failures
+    # Consecutive transient failures (outages, timeouts) that count as one of LLM_MAX_FAILURES
+    LLM_MAX_TRANSIENT_FAILURES = int(os.getenv("LLM_MAX_TRANSIENT_FAILURES", "5"))
+
+    # Work-queue leases for LLM processing (see database/work_queue.py)
+    LLM_LEASE_SECONDS = int(os.getenv("LLM_LEASE_SECONDS", "600"))
+    LLM_LEASE_HEARTBEAT_SECONDS = int(os.getenv("LLM_LEASE_HEARTBEAT_SECONDS", "60"))
+
+    # LLM backend: "gemini" (live), "record" (live + save responses), "replay" or "stub" (offline)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+    LLM_RECORDINGS_PATH = os.getenv("LLM_RECORDINGS_PATH", "llm_recordings/responses.jsonl")
+    LLM_SYNTHETIC_LATENCY_MS = float(os.getenv("LLM_SYNTHETIC_LATENCY_MS", "0"))
+    LLM_SYNTHETIC_JITTER_MS = float(os.getenv("LLM_SYNTHETIC_JITTER_MS", "0"))
+
+    # Pipelined full run: collection hands saved threads straight to LLM workers
+    PIPELINED_FULL_RUN = os.getenv("PIPELINED_FULL_RUN", "true").lower() == "true"
+    PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "4"))  # Shared by both stages
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+
+    # Long-running daemon mode (see daemon.py)
+    DAEMON_INTERVAL_SECONDS = float(os.getenv("DAEMON_INTERVAL_SECONDS", "60"))
+    DAEMON_JITTER_SECONDS = float(os.getenv("DAEMON_JITTER_SECONDS", "10"))
+    DAEMON_SYNC_OVERLAP_SECONDS = int(os.getenv("DAEMON_SYNC_OVERLAP_SECONDS", "300"))  # Re-searched margin per incremental window
+    DAEMON_FULL_SYNC_HOURS = float(os.getenv("DAEMON_FULL_SYNC_HOURS", "24"))
+    DAEMON_PRIORITY_REFRESH_HOURS = float(os.getenv("DAEMON_PRIORITY_REFRESH_HOURS", "1"))  # 0 disables
+    DAEMON_LOCK_PATH = os.getenv("DAEMON_LOCK_PATH", "email_collector_daemon.lock")
+
+    # Local triage before LLM processing (see utils/triage.py)
+    TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "true").lower() == "true"
+    TRIAGE_MIN_KEYWORD_SCORE = float(os.getenv("TRIAGE_MIN_KEYWORD_SCORE", "1.0"))
+    TRIAGE_SPAM_OVERRIDE_SCORE = float(os.getenv("TRIAGE_SPAM_OVERRIDE_SCORE", "3.0"))
+
+    # Currency assumed for bare amounts like "5000" or "2.5k" (see utils/values.py)
+    DEFAULT_VALUE_CURRENCY = os.getenv("DEFAULT_VALUE_CURRENCY", "USD")
+
+    # Near-duplicate thread detection (see utils/dedup.py)
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "dedup_index.npz")
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.7"))
+
+    # Run metrics report (see utils/metrics.py); empty paths disable that output
+    METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", "run_metrics.json")
+    METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")  # e.g. node_exporter textfile dir/email_collector.prom
+
+    # --profile mode (see utils/profiling.py)
+    PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+    PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
 
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -55,6 +142,9 @@ class Config:
             "GMAIL_CLIENT_ID", "GMAIL_CLIENT_SECRET", "GMAIL_REFRESH_TOKEN",
             "GEMINI_API_KEY"
         ]
+        if cls.GMAIL_ACCOUNTS_FILE or cls.GMAIL_ACCOUNTS_TABLE:
+            # Every account carries its own refresh token
+            required_vars.remove("GMAIL_REFRESH_TOKEN")
 
         missing_vars = []
         for var in required_vars:
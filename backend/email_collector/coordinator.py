@@ -0,0 +1,89 @@
+import signal
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from typing import List, Tuple
+
+from .database.models import ProcessingResult
+from .utils.sharding import Shard
+
+logger = logging.getLogger(__name__)
+
+def _run_shard(args: argparse.Namespace, shard_spec: str, conn) -> None:
+    """Worker process entry point: run the requested mode as one shard and send back its result"""
+    from .main import run_collector  # configures logging on import
+
+    log_format = f"%(asctime)s - shard {shard_spec} - %(name)s - %(levelname)s - %(message)s"
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(log_format))
+
+    try:
+        result = asyncio.run(run_collector(args, Shard.parse(shard_spec)))
+    except Exception as e:
+        logger.error(f"Shard {shard_spec} failed: {e}")
+        result = ProcessingResult(success=False, threads_processed=0, messages_processed=0,
+                                  errors=[f"Shard {shard_spec}: {str(e)}"])
+    try:
+        conn.send(result.model_dump())
+    finally:
+        conn.close()
+
+class ShardCoordinator:
+    """
+    Runs --shards N: one local worker process per shard, results merged
+
+    Each worker is a fresh (spawned) process running the selected mode as
+    --shard i/N, so it has its own Gmail clients, quota limiter share and run
+    report, and merges its near-duplicates into the shared dedup index. The coordinator only waits, forwards SIGTERM and
+    merges the workers' ProcessingResults; a worker that dies without reporting
+    counts as a failed shard. Shards on other machines are started with
+    --shard i/N directly and need no coordinator.
+    """
+
+    def __init__(self, count: int):
+        if count < 1:
+            raise ValueError("Shard count must be at least 1")
+        self.count = count
+
+    def run(self, args: argparse.Namespace) -> ProcessingResult:
+        context = multiprocessing.get_context("spawn")
+        workers: List[Tuple[Shard, multiprocessing.Process, object]] = []
+        for index in range(self.count):
+            shard = Shard(index, self.count)
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(target=_run_shard, args=(args, str(shard), child_conn),
+                                      name=f"shard-{index}-of-{self.count}")
+            process.start()
+            child_conn.close()
+            workers.append((shard, process, parent_conn))
+        logger.info(f"Started {self.count} shard workers")
+
+        def forward(signum, frame):
+            logger.info("Shutdown requested; stopping shard workers")
+            for _, process, _ in workers:
+                if process.is_alive():
+                    process.terminate()
+
+        previous_handler = signal.signal(signal.SIGTERM, forward)
+        results = []
+        try:
+            for shard, process, conn in workers:
+                try:
+                    result = ProcessingResult(**conn.recv())
+                except EOFError:
+                    result = None
+                process.join()
+
+                if result is None:
+                    result = ProcessingResult(success=False, threads_processed=0, messages_processed=0,
+                                              errors=[f"Shard {shard} exited with code {process.exitcode} without a result"])
+                logger.info(
+                    f"Shard {shard}: {'ok' if result.success else 'failed'}, {result.new_threads} new threads, "
+                    f"{result.updated_threads} updated, {result.failed_threads} LLM failures, {len(result.errors)} errors"
+                )
+                results.append(result)
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+        return ProcessingResult.merge(results)
@@ -0,0 +1,186 @@
+import os
+import fcntl
+import random
+import signal
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
+
+from .config import Config
+from .database.models import ProcessingResult
+
+if TYPE_CHECKING:
+    from .main import EmailCollector
+
+logger = logging.getLogger(__name__)
+
+class CollectorDaemon:
+    """
+    Long-running scheduler around a single, warm EmailCollector
+
+    The Gmail service, Supabase client and LLM backend are built once and reused by
+    every cycle. Cycles run one at a time on a fixed cadence of DAEMON_INTERVAL_SECONDS
+    plus up to DAEMON_JITTER_SECONDS of random delay; a cycle that overruns its slot
+    makes the scheduler skip the missed slots instead of starting back-to-back runs.
+    Each cycle only searches Gmail for messages received since the previous successful
+    cycle (minus DAEMON_SYNC_OVERLAP_SECONDS), with a full-range search every
+    DAEMON_FULL_SYNC_HOURS to pick up anything an incremental window missed. Open
+    threads are re-leveled by a priority refresh every DAEMON_PRIORITY_REFRESH_HOURS.
+
+    SIGTERM/SIGINT let the running cycle finish, flush local state and exit. A lock
+    file keeps a second daemon on the same host from collecting concurrently.
+    """
+
+    # Only the most recent cycle errors are kept on the running totals
+    MAX_KEPT_ERRORS = 50
+
+    def __init__(self, collector: "EmailCollector", dry_run: bool = False,
+                 interval_seconds: Optional[float] = None, jitter_seconds: Optional[float] = None):
+        self.collector = collector
+        self.dry_run = dry_run
+        self.interval_seconds = max(interval_seconds if interval_seconds is not None else Config.DAEMON_INTERVAL_SECONDS, 1.0)
+        self.jitter_seconds = max(jitter_seconds if jitter_seconds is not None else Config.DAEMON_JITTER_SECONDS, 0.0)
+
+        self.cycles = 0
+        self.totals = ProcessingResult(success=True, threads_processed=0, messages_processed=0)
+        self.error_count = 0
+        self._stop: Optional[asyncio.Event] = None
+        self._last_sync_started: Optional[datetime] = None
+        self._last_full_sync: Optional[datetime] = None
+        self._last_priority_refresh: Optional[datetime] = None
+        self._lock_file = None
+
+    def request_stop(self) -> None:
+        """Ask the daemon to exit after the current cycle"""
+        if self._stop and not self._stop.is_set():
+            logger.info("Shutdown requested; finishing the current cycle")
+            self._stop.set()
+
+    def _acquire_lock(self) -> bool:
+        """Take the host-wide daemon lock (non-blocking)"""
+        # Append mode: truncating before the lock is held would wipe the running daemon's PID
+        self._lock_file = open(Config.DAEMON_LOCK_PATH, "a+")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _sync_window(self, now: datetime) -> Optional[datetime]:
+        """Start of the incremental search window, or None when a full sync is due"""
+        full_sync_interval = timedelta(hours=Config.DAEMON_FULL_SYNC_HOURS)
+        if (self._last_sync_started is None or self._last_full_sync is None
+                or now - self._last_full_sync >= full_sync_interval):
+            return None
+        return self._last_sync_started - timedelta(seconds=Config.DAEMON_SYNC_OVERLAP_SECONDS)
+
+    async def _run_cycle(self) -> ProcessingResult:
+        started = datetime.now(timezone.utc)
+        since = self._sync_window(started)
+        self.cycles += 1
+        logger.info(f"Daemon cycle {self.cycles}: " + (f"incremental sync since {since.isoformat()}" if since else "full sync"))
+
+        try:
+            result = await self.collector.run_full_pipeline(self.dry_run, since=since)
+        except Exception as e:
+            logger.error(f"Daemon cycle {self.cycles} failed: {e}")
+            result = ProcessingResult(success=False, threads_processed=0, messages_processed=0, errors=[f"Cycle error: {str(e)}"])
+
+        # Only a successful cycle advances the window, so failed ranges are searched again
+        if result.success:
+            self._last_sync_started = started
+            if since is None:
+                self._last_full_sync = started
+
+        if self._priority_refresh_due(started):
+            refresh_result = await self.collector.refresh_priorities(self.dry_run)
+            if refresh_result.success:
+                self._last_priority_refresh = started
+            result.errors.extend(refresh_result.errors)
+        return result
+
+    def _priority_refresh_due(self, now: datetime) -> bool:
+        """Whether the periodic priority refresh should run after this cycle"""
+        if Config.DAEMON_PRIORITY_REFRESH_HOURS <= 0:
+            return False
+        return (self._last_priority_refresh is None
+                or now - self._last_priority_refresh >= timedelta(hours=Config.DAEMON_PRIORITY_REFRESH_HOURS))
+
+    def _flush(self) -> None:
+        """Persist local state that normally survives between one-shot runs"""
+        dedup_index = self.collector.dedup_index
+        if dedup_index is not None and dedup_index.dirty and not self.dry_run:
+            dedup_index.sync(Config.DEDUP_INDEX_PATH)
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep until the next slot or until shutdown is requested"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=max(seconds, 0.0))
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> ProcessingResult:
+        """
+        Run cycles until SIGTERM/SIGINT
+
+        Returns:
+            ProcessingResult merged over every cycle of this daemon's lifetime
+        """
+        if not self._acquire_lock():
+            logger.error(f"Another collector daemon holds {Config.DAEMON_LOCK_PATH}; exiting")
+            return ProcessingResult(success=False, threads_processed=0, messages_processed=0,
+                                    errors=["Daemon lock held by another process"])
+
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_stop)
+
+        logger.info(f"Collector daemon started (every {self.interval_seconds:.0f}s + up to {self.jitter_seconds:.0f}s jitter)")
+        loop_clock = loop.time
+        next_slot = loop_clock()
+
+        try:
+            while not self._stop.is_set():
+                cycle_started = time.time()
+                cycle_result = await self._run_cycle()
+                self.totals = ProcessingResult.merge([self.totals, cycle_result])
+                self.error_count += len(cycle_result.errors)
+                del self.totals.errors[:-self.MAX_KEPT_ERRORS]
+                # Per-cycle duration, not daemon uptime
+                self.collector.write_run_report(cycle_result, "daemon", cycle_started)
+
+                # Fixed cadence; slots that passed while the cycle ran are skipped, not queued
+                next_slot += self.interval_seconds
+                now = loop_clock()
+                if now > next_slot:
+                    skipped = int((now - next_slot) // self.interval_seconds) + 1
+                    next_slot += skipped * self.interval_seconds
+                    logger.warning(f"Cycle overran its slot; skipped {skipped} scheduled run(s)")
+
+                await self._sleep(next_slot - now + random.uniform(0, self.jitter_seconds))
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+            self._flush()
+            self._release_lock()
+
+        logger.info(
+            f"Collector daemon stopped after {self.cycles} cycles: {self.totals.new_threads} new threads, "
+            f"{self.totals.updated_threads} threads updated with LLM, {self.error_count} errors"
+        )
+        return self.totals
@@ -1,17 +1,87 @@
+import time
 import logging
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from datetime import datetime, timezone
-from supabase import create_client, Client
-from .models import EmailThread, EmailMessage, ProcessingResult
+from .models import EmailThread, EmailMessage, MailboxAccount, ProcessingResult, OrganizationSync, SponsorOrganization
 from email_collector.config import Config
+from email_collector.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from supabase import Client
+    from email_collector.utils.sharding import Shard
 
 logger = logging.getLogger(__name__)
 
 class SupabaseClient:
-    def __init__(self):
-        self.client: Client = create_client(
+    # Thread columns owned by later stages or the message batch; never reset by save_thread
+    THREAD_SAVE_EXCLUDED_FIELDS = {
+        "id", "created_at", "updated_at",
+        "llm_failure_count", "llm_transient_failure_count", "llm_last_error", "organization_id",
+        "last_message_sender_name", "last_message_sender_email", "last_message_subject",
+        "last_message_snippet", "last_message_from_user", "last_received_date",
+    }
+    # Columns that identify the row's own Gmail thread; a merged near-duplicate never overwrites them
+    THREAD_MERGE_EXCLUDED_FIELDS = {"gmail_thread_id", "account_email", "gmail_thread_url"}
+    # RPCs that can safely run twice (skip existing rows / set absolute values); retried like reads
+    RETRY_SAFE_RPCS = {
+        "save_thread_messages", "claim_thread_for_processing", "renew_thread_leases", "bulk_update_thread_priorities",
+        "bulk_update_thread_values", "sync_thread_organization", "update_organization_value",
+        "search_threads",
+    }
+
+    def __init__(self, client: Optional["Client"] = None):
+        """
+        Args:
+            client: Preconfigured supabase client (or a compatible local fake for
+                benchmarks); created from Config when omitted
+        """
+        if client is not None:
+            self.client = client
+            return
+
+        # Imported here: the supabase SDK is the slowest import in the CLI
+        import httpx
+        from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+        from supabase import ClientOptions, create_client
+        from .transport import ResilientTransport
+
+        # Retries, deadlines and the circuit breaker sit below postgrest's APIError
+        # handling. postgrest sends absolute URLs and its own headers on every
+        # request, so the client only carries what its default session would.
+        http_client = httpx.Client(
+            transport=ResilientTransport(httpx.HTTPTransport(http2=True), self.RETRY_SAFE_RPCS),
+            timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+            follow_redirects=True,
+            event_hooks={
+                "request": [self._start_request_timer],
+                "response": [self._record_response_metrics],
+            },
+        )
+        self.client: "Client" = create_client(
             Config.SUPABASE_URL,
-            Config.SUPABASE_SERVICE_KEY
+            Config.SUPABASE_SERVICE_KEY,
+            options=ClientOptions(httpx_client=http_client)
+        )
+
+    @staticmethod
+    def _start_request_timer(request) -> None:
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    @staticmethod
+    def _record_response_metrics(response) -> None:
+        """httpx response hook: latency, bytes and errors per table / RPC ("supabase.rpc.search_threads")"""
+        response.read()
+        request = response.request
+        path = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+        stage = f"supabase.{path.replace('/', '.')}"
+        if not path.startswith("rpc/"):
+            stage = f"{stage}.{request.method.lower()}"
+        started = request.extensions.get("metrics_started")
+        metrics.observe(
+            stage,
+            time.perf_counter() - started if started is not None else 0.0,
+            nbytes=len(request.content) + len(response.content),
+            error=response.status_code >= 400
         )
     
     def _serialize_datetimes(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -34,22 +104,45 @@ class SupabaseClient:
                 serialized_data[key] = value
         return serialized_data
 
-    async def save_thread(self, thread: EmailThread) -> Optional[str]:
-        """Save or update an email thread with deduplication"""
+    @staticmethod
+    def _apply_saved_row(thread: EmailThread, row: Dict[str, Any]) -> str:
+        """Copy database-owned fields of a just-written row onto the in-memory thread"""
+        thread.id = row["id"]
+        thread.llm_failure_count = row.get("llm_failure_count") or 0
+        thread.llm_transient_failure_count = row.get("llm_transient_failure_count") or 0
+        thread.organization_id = row.get("organization_id")
+        return row["id"]
+
+    async def save_thread(self, thread: EmailThread, duplicate_of: Optional[str] = None) -> Optional[str]:
+        """
+        Save or update an email thread with deduplication
+
+        Args:
+            thread: Thread to save
+            duplicate_of: Row id of a near-duplicate thread found by the local
+                NearDuplicateIndex (or the row an earlier run merged it into, see
+                get_thread_aliases); the thread is merged into that row when it has
+                no row of its own yet. The row keeps its own Gmail thread id and the
+                merged id is recorded in email_thread_aliases.
+
+        The stored row's id and LLM failure count are copied onto ``thread`` so it
+        can be handed straight to the LLM stage without re-reading it.
+        """
         try:
             # First check if thread already exists by Gmail Thread ID
             existing_by_id = self.client.table("email_threads").select("id").eq(
                 "gmail_thread_id", thread.gmail_thread_id
             ).execute()
 
-            # Then check if thread exists by participant signature (for deduplication)
-            existing_by_participants = None
-            if thread.participant_signature:
+            # Without the local index, fall back to exact participant-signature matching
+            if duplicate_of is None and not Config.DEDUP_ENABLED and thread.participant_signature:
                 existing_by_participants = self.client.table("email_threads").select("id").eq(
                     "participant_signature", thread.participant_signature
                 ).execute()
+                if existing_by_participants.data:
+                    duplicate_of = existing_by_participants.data[0]["id"]
 
-            thread_data = thread.model_dump(exclude={"id", "created_at", "updated_at"})
+            thread_data = thread.model_dump(exclude=self.THREAD_SAVE_EXCLUDED_FIELDS)
             
             # Convert datetime objects to ISO strings for Supabase
             thread_data = self._serialize_datetimes(thread_data)
@@ -63,25 +156,33 @@ class SupabaseClient:
 
                 if result.data:
                     logger.info(f"Updated thread by Gmail ID {thread.gmail_thread_id}")
-                    return result.data[0]["id"]
+                    return self._apply_saved_row(thread, result.data[0])
                     
-            elif existing_by_participants and existing_by_participants.data:
-                # Update by participant signature (same participants, different thread)
-                existing_id = existing_by_participants.data[0]["id"]
-                result = self.client.table("email_threads").update(
-                    thread_data
-                ).eq("id", existing_id).execute()
-
-                if result.data:
-                    logger.info(f"Updated thread by participants {thread.participant_signature}")
-                    return existing_id
             else:
+                if duplicate_of:
+                    # Merge into the near-duplicate thread (same conversation, different Gmail thread)
+                    merge_data = {key: value for key, value in thread_data.items()
+                                  if key not in self.THREAD_MERGE_EXCLUDED_FIELDS}
+                    result = self.client.table("email_threads").update(
+                        merge_data
+                    ).eq("id", duplicate_of).execute()
+
+                    if result.data:
+                        self.client.table("email_thread_aliases").upsert({
+                            "gmail_thread_id": thread.gmail_thread_id,
+                            "thread_id": duplicate_of,
+                            "account_email": thread.account_email,
+                        }, on_conflict="gmail_thread_id").execute()
+                        logger.info(f"Merged thread {thread.gmail_thread_id} into near-duplicate {duplicate_of}")
+                        return self._apply_saved_row(thread, result.data[0])
+                    logger.warning(f"Near-duplicate {duplicate_of} no longer exists, inserting {thread.gmail_thread_id}")
+
                 # Insert new thread
                 result = self.client.table("email_threads").insert(thread_data).execute()
 
                 if result.data:
                     logger.info(f"Created new thread {thread.gmail_thread_id}")
-                    return result.data[0]["id"]
+                    return self._apply_saved_row(thread, result.data[0])
 
         except Exception as e:
             logger.error(f"Error saving thread {thread.gmail_thread_id}: {e}")
@@ -114,15 +215,61 @@ class SupabaseClient:
             logger.error(f"Error saving message {message.gmail_message_id}: {e}")
             return None
 
+    async def save_thread_messages(self, thread_id: str, messages: List[EmailMessage]) -> Optional[int]:
+        """
+        Store a thread's messages and refresh its last-message columns in one batch
+
+        Uses the save_thread_messages RPC: already-stored messages are skipped and the
+        denormalized last sender/snippet/direction/date are written in the same
+        transaction. Returns the number of new messages, or None on failure.
+        """
+        try:
+            payload = [
+                self._serialize_datetimes(message.model_dump(exclude={"id", "thread_id", "created_at"}))
+                for message in messages
+            ]
+            result = self.client.rpc("save_thread_messages", {
+                "p_thread_id": str(thread_id),
+                "p_messages": payload,
+            }).execute()
+
+            inserted = result.data or 0
+            logger.info(f"Stored {inserted} new of {len(messages)} messages for thread {thread_id}")
+            return inserted
+        except Exception as e:
+            logger.error(f"Error saving messages for thread {thread_id}: {e}")
+            return None
+
     async def get_existing_thread_ids(self) -> List[str]:
-        """Get list of existing Gmail thread IDs"""
+        """Get list of existing Gmail thread IDs, including threads merged into another row"""
         try:
             result = self.client.table("email_threads").select("gmail_thread_id").execute()
-            return [row["gmail_thread_id"] for row in result.data]
+            aliases = await self.get_thread_aliases()
+            return [row["gmail_thread_id"] for row in result.data] + list(aliases)
         except Exception as e:
             logger.error(f"Error fetching existing thread IDs: {e}")
             return []
+
+    async def get_thread_aliases(self) -> Dict[str, str]:
+        """Gmail thread id -> row id for threads merged into a near-duplicate row (sql/add_thread_aliases.sql)"""
+        try:
+            result = self.client.table("email_thread_aliases").select("gmail_thread_id, thread_id").execute()
+            return {row["gmail_thread_id"]: row["thread_id"] for row in result.data}
+        except Exception as e:
+            logger.error(f"Error fetching thread aliases: {e}")
+            return {}
     
+    async def get_mailbox_accounts(self, table: str) -> List[MailboxAccount]:
+        """Enabled Gmail accounts for multi-mailbox collection (sql/add_mailbox_accounts.sql)"""
+        try:
+            result = self.client.table(table).select(
+                "email, name, refresh_token, client_id, client_secret, enabled"
+            ).eq("enabled", True).execute()
+            return [MailboxAccount(**{**row, "name": row.get("name") or ""}) for row in result.data]
+        except Exception as e:
+            logger.error(f"Error getting mailbox accounts from {table}: {e}")
+            return []
+
     async def get_existing_participant_signatures(self) -> List[str]:
         """Get list of existing participant signatures for deduplication"""
         try:
@@ -146,18 +293,111 @@ class SupabaseClient:
             logger.error(f"Error finding thread by participant signature: {e}")
             return None
 
-    async def get_threads_for_processing(self, limit: int = 100) -> List[EmailThread]:
-        """Get threads that need LLM processing"""
+    async def get_dedup_index_rows(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Load id, Gmail thread id, participants and subject for every thread (paginated)"""
+        rows: List[Dict[str, Any]] = []
+        try:
+            start = 0
+            while True:
+                result = self.client.table("email_threads").select(
+                    "id, gmail_thread_id, participants, subject"
+                ).order("id").range(start, start + page_size - 1).execute()
+
+                rows.extend(result.data or [])
+                if not result.data or len(result.data) < page_size:
+                    break
+                start += page_size
+
+            return rows
+        except Exception as e:
+            logger.error(f"Error loading threads for the dedup index: {e}")
+            return rows
+
+    async def get_threads_for_processing(self, limit: int = 100, shard: Optional["Shard"] = None) -> List[EmailThread]:
+        """
+        Get threads that need LLM processing (read-only; use claim_threads_for_processing to take work)
+
+        With a shard, over-fetches by the shard count and keeps the shard's own threads.
+        """
         try:
             result = self.client.table("email_threads").select("*").eq(
                 "llm_processed", False
-            ).limit(limit).execute()
+            ).lt("llm_failure_count", Config.LLM_MAX_FAILURES).order(
+                "last_message_date", desc=True
+            ).limit(limit * (shard.count if shard else 1)).execute()
 
-            return [EmailThread(**row) for row in result.data]
+            rows = [row for row in result.data if shard is None or shard.owns(row["gmail_thread_id"])]
+            return [EmailThread(**row) for row in rows[:limit]]
         except Exception as e:
             logger.error(f"Error fetching threads for processing: {e}")
             return []
 
+    async def claim_threads_for_processing(self, worker_id: str, limit: int = 100, lease_seconds: int = 600,
+                                           shard: Optional["Shard"] = None) -> List[EmailThread]:
+        """
+        Atomically claim unprocessed threads with a lease so concurrent workers never overlap
+
+        With a shard, only that shard's threads are claimed (sql/add_sharded_processing.sql).
+        """
+        try:
+            params = {
+                "p_worker_id": worker_id,
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds,
+                "p_max_failures": Config.LLM_MAX_FAILURES
+            }
+            if shard and shard.count > 1:
+                params.update(p_shard_index=shard.index, p_shard_count=shard.count)
+            result = self.client.rpc("claim_threads_for_processing", params).execute()
+
+            return [EmailThread(**row) for row in result.data or []]
+        except Exception as e:
+            logger.error(f"Error claiming threads for processing: {e}")
+            return []
+
+    async def claim_thread_for_processing(self, thread_id: str, worker_id: str, lease_seconds: int = 600) -> Optional[EmailThread]:
+        """Lease one specific thread (pipelined hand-off); None when another worker holds it or it needs no processing"""
+        try:
+            result = self.client.rpc("claim_thread_for_processing", {
+                "p_thread_id": str(thread_id),
+                "p_worker_id": worker_id,
+                "p_lease_seconds": lease_seconds,
+                "p_max_failures": Config.LLM_MAX_FAILURES
+            }).execute()
+
+            rows = result.data or []
+            return EmailThread(**rows[0]) if rows else None
+        except Exception as e:
+            logger.error(f"Error claiming thread {thread_id} for processing: {e}")
+            return None
+
+    async def renew_thread_leases(self, worker_id: str, thread_ids: List[str], lease_seconds: int = 600) -> int:
+        """Extend the leases this worker still holds; returns the number renewed"""
+        if not thread_ids:
+            return 0
+        try:
+            result = self.client.rpc("renew_thread_leases", {
+                "p_worker_id": worker_id,
+                "p_thread_ids": [str(thread_id) for thread_id in thread_ids],
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return result.data or 0
+        except Exception as e:
+            logger.error(f"Error renewing thread leases for {worker_id}: {e}")
+            return 0
+
+    async def release_thread_lease(self, thread_id: str, worker_id: str) -> bool:
+        """Release a lease so another worker can pick the thread up immediately"""
+        try:
+            result = self.client.table("email_threads").update({
+                "lease_owner": None,
+                "lease_expires_at": None
+            }).eq("id", str(thread_id)).eq("lease_owner", worker_id).execute()
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error releasing lease on thread {thread_id}: {e}")
+            return False
+
     async def get_thread_messages(self, thread_id: str) -> List[EmailMessage]:
         """Get all messages for a thread"""
         try:
@@ -176,7 +416,10 @@ class SupabaseClient:
             update_data = {
                 **llm_data,
                 "llm_processed": True,
-                "llm_processed_at": datetime.now(timezone.utc).isoformat()
+                "llm_processed_at": datetime.now(timezone.utc).isoformat(),
+                # Processing is done - drop any work-queue lease
+                "lease_owner": None,
+                "lease_expires_at": None
             }
             
             # Serialize any datetime objects in llm_data
@@ -195,6 +438,207 @@ class SupabaseClient:
             logger.error(f"Error updating thread {thread_id} with LLM data: {e}")
             return False
 
+    async def record_llm_failure(self, thread: EmailThread, error: str) -> bool:
+        """Record a failed LLM extraction so the thread is not retried forever"""
+        try:
+            failure_count = thread.llm_failure_count + 1
+            result = self.client.table("email_threads").update({
+                "llm_failure_count": failure_count,
+                "llm_transient_failure_count": 0,
+                "llm_last_error": error[:1000] if error else None,
+                "lease_owner": None,
+                "lease_expires_at": None
+            }).eq("id", str(thread.id)).execute()
+
+            if failure_count >= Config.LLM_MAX_FAILURES:
+                logger.warning(f"Thread {thread.gmail_thread_id} reached {failure_count} LLM failures - excluded from processing")
+
+            return bool(result.data)
+
+        except Exception as e:
+            logger.error(f"Error recording LLM failure for thread {thread.id}: {e}")
+            return False
+
+    async def record_transient_llm_failure(self, thread: EmailThread, error: str) -> bool:
+        """
+        Record an LLM outage or timeout for a thread
+
+        The thread goes back to the queue without using up a failure, unless
+        this makes LLM_MAX_TRANSIENT_FAILURES in a row - then it is recorded as
+        one regular failure (see record_llm_failure).
+        """
+        transient_count = thread.llm_transient_failure_count + 1
+        if transient_count >= Config.LLM_MAX_TRANSIENT_FAILURES:
+            logger.warning(f"Thread {thread.gmail_thread_id} failed transiently {transient_count} times in a row - counting a failure")
+            return await self.record_llm_failure(thread, error)
+
+        try:
+            result = self.client.table("email_threads").update({
+                "llm_transient_failure_count": transient_count,
+                "llm_last_error": error[:1000] if error else None,
+                "lease_owner": None,
+                "lease_expires_at": None
+            }).eq("id", str(thread.id)).execute()
+            return bool(result.data)
+
+        except Exception as e:
+            logger.error(f"Error recording transient LLM failure for thread {thread.id}: {e}")
+            return False
+
+    async def get_priority_refresh_rows(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Load cached priority inputs for every open, LLM-processed thread (paginated)"""
+        columns = (
+            "id, priority_level, last_message_date, last_message_from_user, "
+            "content_priority_level, content_priority_reasoning, "
+            "sender_priority_level, sender_priority_reasoning"
+        )
+        rows: List[Dict[str, Any]] = []
+        try:
+            start = 0
+            while True:
+                result = self.client.table("email_threads").select(columns).neq(
+                    "status", "closed"
+                ).eq("llm_processed", True).not_.is_(
+                    "content_priority_level", "null"
+                ).order("id").range(start, start + page_size - 1).execute()
+
+                rows.extend(result.data or [])
+                if not result.data or len(result.data) < page_size:
+                    break
+                start += page_size
+
+            return rows
+        except Exception as e:
+            logger.error(f"Error loading threads for priority refresh: {e}")
+            return rows
+
+    async def bulk_update_thread_priorities(self, updates: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Write changed priority levels in bulk through the bulk_update_thread_priorities RPC"""
+        updated = 0
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start:start + batch_size]
+            try:
+                result = self.client.rpc("bulk_update_thread_priorities", {"p_updates": batch}).execute()
+                updated += result.data or 0
+            except Exception as e:
+                logger.error(f"Error writing priority batch at offset {start}: {e}")
+        return updated
+
+    async def get_value_backfill_rows(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Threads with a value string but no parsed value columns yet (paginated)"""
+        rows: List[Dict[str, Any]] = []
+        try:
+            start = 0
+            while True:
+                result = self.client.table("email_threads").select(
+                    "id, estimated_value_amount"
+                ).not_.is_("estimated_value_amount", "null").is_(
+                    "estimated_value_currency", "null"
+                ).order("id").range(start, start + page_size - 1).execute()
+
+                rows.extend(result.data or [])
+                if not result.data or len(result.data) < page_size:
+                    break
+                start += page_size
+
+            return rows
+        except Exception as e:
+            logger.error(f"Error loading threads for value backfill: {e}")
+            return rows
+
+    async def bulk_update_thread_values(self, updates: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Write parsed value columns in bulk through the bulk_update_thread_values RPC"""
+        updated = 0
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start:start + batch_size]
+            try:
+                result = self.client.rpc("bulk_update_thread_values", {"p_updates": batch}).execute()
+                updated += result.data or 0
+            except Exception as e:
+                logger.error(f"Error writing value batch at offset {start}: {e}")
+        return updated
+
+    async def sync_thread_organization(self, thread_id: str, sync: OrganizationSync) -> Optional[str]:
+        """Link a thread to its organization and upsert its contacts (sync_thread_organization RPC)"""
+        try:
+            payload = self._serialize_datetimes({
+                "p_thread_id": str(thread_id),
+                "p_domain": sync.domain,
+                "p_name": sync.name,
+                "p_last_contact": sync.last_contact_at,
+            })
+            payload["p_contacts"] = [self._serialize_datetimes(contact) for contact in sync.contacts]
+
+            result = self.client.rpc("sync_thread_organization", payload).execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error syncing organization {sync.domain} for thread {thread_id}: {e}")
+            return None
+
+    async def update_organization_value(self, thread_id: str, org_name: Optional[str], value: Optional[float]) -> bool:
+        """Apply a thread's extracted org name and value to its organization's aggregates"""
+        try:
+            self.client.rpc("update_organization_value", {
+                "p_thread_id": str(thread_id),
+                "p_org_name": org_name,
+                "p_value": value,
+            }).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error updating organization value for thread {thread_id}: {e}")
+            return False
+
+    async def get_sponsor_organizations(self, limit: int = 100) -> List[SponsorOrganization]:
+        """Organizations ordered by most recent contact (indexed lookup, no thread scan)"""
+        try:
+            result = self.client.table("sponsor_organizations").select("*").order(
+                "last_contact_at", desc=True
+            ).limit(limit).execute()
+            return [SponsorOrganization(**row) for row in result.data]
+        except Exception as e:
+            logger.error(f"Error fetching sponsor organizations: {e}")
+            return []
+
+    # search_threads filter name -> RPC parameter
+    SEARCH_FILTERS = {
+        "status": "p_status",
+        "priority_level": "p_priority_level",
+        "sponsor_only": "p_sponsor_only",
+        "since": "p_since",
+    }
+
+    async def search_threads(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                             limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Full-text search over message subjects and bodies, one ranked row per thread
+
+        Args:
+            query: Web-search style query ("exact phrase", OR, -excluded)
+            filters: Optional status, priority_level, sponsor_only and since (datetime)
+            limit: Page size
+            offset: Number of ranked results to skip (pagination)
+
+        Returns:
+            Rows with thread_id, subject, sponsor_org_name, rank, matched_messages and a
+            highlighted headline, best match first
+        """
+        if not query or not query.strip():
+            return []
+
+        unknown = set(filters or {}) - set(self.SEARCH_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+
+        params = {"p_query": query, "p_limit": limit, "p_offset": offset}
+        params.update({self.SEARCH_FILTERS[name]: value for name, value in (filters or {}).items()})
+
+        try:
+            result = self.client.rpc("search_threads", self._serialize_datetimes(params)).execute()
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error searching threads for '{query}': {e}")
+            return []
+
     async def get_thread_statistics(self) -> Dict[str, Any]:
         """Get basic statistics about stored threads"""
         try:
@@ -13,6 +13,7 @@ class EmailMessage(BaseModel):
     subject: str
     body_text: str
     snippet: str
+    search_text: Optional[str] = None  # Stripped body for the full-text index
     received_date: datetime
     is_from_user: bool = False
     created_at: Optional[datetime] = None
@@ -26,6 +27,14 @@ class EmailThread(BaseModel):
     first_message_date: datetime
     last_message_date: datetime
     message_count: int = 0
+
+    # Denormalized from the newest message by save_thread_messages
+    last_message_sender_name: Optional[str] = None
+    last_message_sender_email: Optional[str] = None
+    last_message_subject: Optional[str] = None
+    last_message_snippet: Optional[str] = None
+    last_message_from_user: bool = False
+    last_received_date: Optional[datetime] = None
     
     # Gemini-Extracted CRM Fields
     last_action_summary: Optional[str] = None
@@ -38,14 +47,26 @@ class EmailThread(BaseModel):
     sponsor_poc_name: Optional[str] = None
     sponsor_org_name: Optional[str] = None
     estimated_value_amount: Optional[str] = None
+    estimated_value_min_cents: Optional[int] = None  # Parsed by ValueNormalizer
+    estimated_value_max_cents: Optional[int] = None
+    estimated_value_currency: Optional[str] = None
     value_type: Optional[Literal['monetary', 'in-kind', 'catering', 'equipment', 'other']] = None
     value_description: Optional[str] = None
     sponsor_confidence_score: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+    # Local triage audit trail
+    triage_score: Optional[float] = None
+    triage_reasoning: Optional[str] = None
     
     # Metadata
+    account_email: Optional[str] = None  # Mailbox the thread was collected from (multi-mailbox runs)
     gmail_thread_url: Optional[str] = None
     llm_processed: bool = False
     llm_processed_at: Optional[datetime] = None
+    llm_failure_count: int = 0
+    llm_transient_failure_count: int = 0  # Consecutive; reset by any non-transient outcome
+    llm_last_error: Optional[str] = None
+    organization_id: Optional[UUID] = None  # Maintained by the sponsor directory sync
     status: Literal['new', 'in_progress', 'responded', 'closed'] = 'new'
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -70,6 +91,15 @@ class SponsorInfo(BaseModel):
     )
     next_action_description: Optional[str] = Field(None, description="Specific description for 'other' actions")
 
+class MailboxAccount(BaseModel):
+    """Gmail inbox collected by a multi-mailbox run"""
+    email: str
+    name: str = ""
+    refresh_token: Optional[str] = None
+    client_id: Optional[str] = None  # OAuth client; defaults to GMAIL_CLIENT_ID / GMAIL_CLIENT_SECRET
+    client_secret: Optional[str] = None
+    enabled: bool = True
+
 class ThreadInfo(BaseModel):
     """Gmail thread information"""
     thread_id: str
@@ -79,6 +109,24 @@ class ThreadInfo(BaseModel):
     first_message_date: datetime
     last_message_date: datetime
 
+class ValueEstimate(BaseModel):
+    """Normalized sponsorship value; an open-ended bound is None"""
+    min_cents: Optional[int] = None
+    max_cents: Optional[int] = None
+    currency: Optional[str] = None  # ISO 4217 code
+
+    @property
+    def representative_cents(self) -> Optional[int]:
+        """Lower bound, or the upper bound for 'up to' values"""
+        return self.min_cents if self.min_cents is not None else self.max_cents
+
+class TriageResult(BaseModel):
+    """Outcome of the local pre-LLM relevance gate"""
+    send_to_llm: bool
+    keyword_score: float = 0.0
+    spam_flagged: bool = False
+    reasoning: str = ""
+
 class FulfillmentTask(BaseModel):
     """Fulfillment task for sponsor obligations"""
     id: Optional[UUID] = None
@@ -95,6 +143,34 @@ class FulfillmentTask(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+class SponsorOrganization(BaseModel):
+    """Sponsor organization keyed by normalized sender domain, with incremental aggregates"""
+    id: Optional[UUID] = None
+    domain: str
+    name: str
+    thread_count: int = 0
+    last_contact_at: Optional[datetime] = None
+    total_value: float = 0.0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class Contact(BaseModel):
+    """Individual sender at a sponsor organization"""
+    id: Optional[UUID] = None
+    email: str
+    name: Optional[str] = None
+    organization_id: Optional[UUID] = None
+    last_contact_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class OrganizationSync(BaseModel):
+    """Directory update for one ingested thread (see utils/directory.py)"""
+    domain: str
+    name: str
+    last_contact_at: datetime
+    contacts: List[dict] = Field(default_factory=list)  # {email, name, last_contact_at}
+
 class ProcessingResult(BaseModel):
     """Result of email processing"""
     success: bool
@@ -102,4 +178,18 @@ class ProcessingResult(BaseModel):
     messages_processed: int
     errors: List[str] = Field(default_factory=list)
     new_threads: int = 0
-    updated_threads: int = 0
\ No newline at end of file
+    updated_threads: int = 0
+    triaged_threads: int = 0  # Resolved locally without an LLM call
+    failed_threads: int = 0  # LLM extraction failed and was recorded
+    llm_calls: int = 0
+
+    @classmethod
+    def merge(cls, results: List["ProcessingResult"]) -> "ProcessingResult":
+        """Sum the counters of several results (success only if all succeeded)"""
+        merged = cls(success=all(result.success for result in results), threads_processed=0, messages_processed=0)
+        for result in results:
+            for field in ("threads_processed", "messages_processed", "new_threads", "updated_threads",
+                          "triaged_threads", "failed_threads", "llm_calls"):
+                setattr(merged, field, getattr(merged, field) + getattr(result, field))
+            merged.errors.extend(result.errors)
+        return merged
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import Iterable, Optional
+
+import httpx
+
+from ..utils.resilience import clamp_timeout, get_policy
+
+class ResilientTransport(httpx.BaseTransport):
+    """
+    httpx transport wrapper that runs every PostgREST request through the shared
+    "supabase" ResiliencePolicy
+
+    Transient statuses (429, 5xx) and connection errors are retried with backoff,
+    per-request timeouts shrink to the caller's deadline(), the circuit breaker
+    fails fast while Supabase is down and slow reads can be hedged. Reads,
+    PATCH/DELETE by filter, upserts and the RPCs listed in `idempotent_rpcs` are
+    retried on any transient failure; plain inserts and other RPCs only when the
+    request was rejected before PostgREST acted on it, so a lost response never
+    writes a row twice. After the last attempt the error response is returned
+    and postgrest raises its usual APIError.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PATCH", "PUT", "DELETE"})
+
+    def __init__(self, transport: httpx.BaseTransport, idempotent_rpcs: Optional[Iterable[str]] = None):
+        self.transport = transport
+        self.idempotent_rpcs = frozenset(idempotent_rpcs or ())
+
+    def _is_idempotent(self, request: httpx.Request) -> bool:
+        if request.method in self.IDEMPOTENT_METHODS:
+            return True
+        if "resolution=" in request.headers.get("prefer", ""):
+            return True  # upsert (on_conflict merge / ignore)
+        path = request.url.path
+        return "/rpc/" in path and path.rsplit("/", 1)[-1] in self.idempotent_rpcs
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        timeouts = dict(request.extensions.get("timeout") or {})
+
+        def attempt() -> httpx.Response:
+            if timeouts:
+                request.extensions["timeout"] = {key: clamp_timeout(value) for key, value in timeouts.items()}
+            else:
+                clamp_timeout(None)
+            return self.transport.handle_request(request)
+
+        return get_policy("supabase").call(
+            attempt, idempotent=self._is_idempotent(request),
+            result_status=lambda response: response.status_code,
+            discard=lambda response: response.close()
+        )
+
+    def close(self) -> None:
+        self.transport.close()
@@ -0,0 +1,78 @@
+import os
+import time
+import uuid
+import socket
+import logging
+from typing import List, Optional, Set
+from .client import SupabaseClient
+from .models import EmailThread
+from email_collector.config import Config
+from email_collector.utils.sharding import Shard
+
+logger = logging.getLogger(__name__)
+
+class ThreadWorkQueue:
+    """
+    Lease-based work queue over email_threads for LLM processing
+
+    Threads are claimed with a lease expiry, the lease is renewed on a heartbeat
+    while the worker is busy, and released on failure. A crashed worker's threads
+    become claimable again once its leases expire. A sharded queue only claims
+    threads of its shard.
+    """
+
+    def __init__(self, db_client: SupabaseClient, worker_id: str = None, shard: Optional[Shard] = None):
+        self.db_client = db_client
+        self.shard = shard
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if shard:
+            self.worker_id = f"{self.worker_id}:shard-{shard.index}-of-{shard.count}"
+        self.lease_seconds = Config.LLM_LEASE_SECONDS
+        self.heartbeat_seconds = Config.LLM_LEASE_HEARTBEAT_SECONDS
+        self.held: Set[str] = set()
+        self._last_heartbeat = 0.0
+
+    async def claim(self, limit: int = 100) -> List[EmailThread]:
+        """Claim up to ``limit`` threads for this worker"""
+        threads = await self.db_client.claim_threads_for_processing(self.worker_id, limit, self.lease_seconds, self.shard)
+        self.held.update(str(thread.id) for thread in threads)
+        self._last_heartbeat = time.monotonic()
+
+        logger.info(f"Worker {self.worker_id} claimed {len(threads)} threads (lease {self.lease_seconds}s)")
+        return threads
+
+    async def claim_one(self, thread_id: str) -> Optional[EmailThread]:
+        """Claim one specific thread (e.g. handed off by the collector); None if it is not available"""
+        thread = await self.db_client.claim_thread_for_processing(str(thread_id), self.worker_id, self.lease_seconds)
+        if thread:
+            self.held.add(str(thread.id))
+        return thread
+
+    async def heartbeat(self, force: bool = False) -> None:
+        """Renew held leases if the heartbeat interval has elapsed"""
+        if not self.held:
+            return
+        if not force and time.monotonic() - self._last_heartbeat < self.heartbeat_seconds:
+            return
+
+        renewed = await self.db_client.renew_thread_leases(self.worker_id, list(self.held), self.lease_seconds)
+        self._last_heartbeat = time.monotonic()
+
+        if renewed < len(self.held):
+            logger.warning(f"Worker {self.worker_id} renewed {renewed}/{len(self.held)} leases - some were lost or completed")
+        else:
+            logger.debug(f"Worker {self.worker_id} renewed {renewed} leases")
+
+    def complete(self, thread_id: str) -> None:
+        """Forget a thread whose lease was cleared by the final database update"""
+        self.held.discard(str(thread_id))
+
+    async def release(self, thread_id: str) -> None:
+        """Give a thread back to the queue after a failure"""
+        self.held.discard(str(thread_id))
+        await self.db_client.release_thread_lease(str(thread_id), self.worker_id)
+
+    async def release_all(self) -> None:
+        """Release every lease still held (end of run or shutdown)"""
+        for thread_id in list(self.held):
+            await self.release(thread_id)
@@ -0,0 +1,150 @@
+import os
+import json
+import queue
+import logging
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple
+from ..config import Config
+from ..database.models import MailboxAccount, ThreadInfo
+from ..utils.keywords import KeywordMatcher
+from ..utils.participants import ParticipantProcessor
+from ..utils.sharding import Shard
+from .client import GmailClient
+from .search import EmailSearcher
+
+if TYPE_CHECKING:
+    from ..database.client import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+def _account_from_entry(entry: Dict[str, Any]) -> MailboxAccount:
+    """File entry -> account; "refresh_token_env" names an env var so the file can hold no secrets"""
+    entry = dict(entry)
+    token_env = entry.pop("refresh_token_env", None)
+    if token_env and not entry.get("refresh_token"):
+        entry["refresh_token"] = os.getenv(token_env)
+    return MailboxAccount(**entry)
+
+async def load_mailbox_accounts(db_client: Optional["SupabaseClient"] = None) -> List[MailboxAccount]:
+    """
+    Enabled accounts from GMAIL_ACCOUNTS_FILE and/or GMAIL_ACCOUNTS_TABLE
+
+    The file is a JSON list (or {"accounts": [...]}) of MailboxAccount entries:
+
+        [{"email": "sponsorships@club.org", "name": "Sponsorships",
+          "refresh_token_env": "GMAIL_REFRESH_TOKEN_SPONSORSHIPS"}]
+
+    Accounts listed in both sources are taken from the file.
+    """
+    accounts: Dict[str, MailboxAccount] = {}
+
+    if Config.GMAIL_ACCOUNTS_TABLE and db_client is not None:
+        for account in await db_client.get_mailbox_accounts(Config.GMAIL_ACCOUNTS_TABLE):
+            accounts[account.email.lower()] = account
+
+    if Config.GMAIL_ACCOUNTS_FILE:
+        try:
+            with open(Config.GMAIL_ACCOUNTS_FILE, encoding='utf-8') as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                entries = entries.get("accounts", [])
+            for entry in entries:
+                account = _account_from_entry(entry)
+                accounts[account.email.lower()] = account
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading mailbox accounts from {Config.GMAIL_ACCOUNTS_FILE}: {e}")
+
+    enabled = []
+    for account in accounts.values():
+        if not account.enabled:
+            continue
+        if not account.refresh_token:
+            logger.warning(f"Skipping mailbox {account.email}: no refresh token")
+            continue
+        enabled.append(account)
+
+    logger.info(f"Loaded {len(enabled)} mailbox accounts")
+    return enabled
+
+class MailboxPool:
+    """
+    One Gmail worker thread per mailbox account, feeding a single consumer
+
+    Each worker owns its account's GmailClient (credentials, pooled HTTP session
+    and quota limiter) and runs that mailbox's search and thread fetches, so N
+    inboxes are fetched concurrently while the collector stays the only database
+    writer. Fetched threads reach the consumer through a bounded queue.
+    """
+
+    def __init__(self, accounts: List[MailboxAccount], keyword_matcher: Optional[KeywordMatcher] = None):
+        self.accounts = accounts
+        self.keyword_matcher = keyword_matcher or KeywordMatcher()
+        # account email -> searcher, built on first use by that account's worker
+        self._searchers: Dict[str, EmailSearcher] = {}
+
+        # Messages sent from any of the team's mailboxes count as the user's own
+        ParticipantProcessor.add_user_identities(
+            [account.email for account in accounts],
+            [account.name for account in accounts]
+        )
+
+    def searcher(self, account: MailboxAccount) -> EmailSearcher:
+        searcher = self._searchers.get(account.email)
+        if searcher is None:
+            searcher = EmailSearcher(self.keyword_matcher, GmailClient(account=account))
+            self._searchers[account.email] = searcher
+        return searcher
+
+    def iter_thread_infos(self, existing_thread_ids: Set[str], since: Optional[datetime] = None,
+                          errors: Optional[List[str]] = None,
+                          shard: Optional[Shard] = None) -> Iterator[Tuple[ThreadInfo, bool, EmailSearcher]]:
+        """
+        Yield (thread_info, is_new, searcher) from all mailboxes as workers fetch them
+
+        Errors that stop a mailbox's worker are logged and appended to `errors`;
+        the other mailboxes carry on. Closing the iterator early stops the workers.
+        """
+        results: queue.Queue = queue.Queue(maxsize=Config.ACCOUNT_QUEUE_SIZE)
+        stop = threading.Event()
+        finished = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def work(account: MailboxAccount):
+            try:
+                searcher = self.searcher(account)
+                for thread_info, is_new in searcher.iter_thread_infos(existing_thread_ids, since=since, shard=shard):
+                    if not put((thread_info, is_new, searcher)):
+                        return
+            except Exception as e:
+                logger.error(f"Error collecting mailbox {account.email}: {e}")
+                if errors is not None:
+                    errors.append(f"Mailbox {account.email}: {str(e)}")
+            finally:
+                put(finished)
+
+        workers = [
+            threading.Thread(target=work, args=(account,), name=f"gmail-{account.email}", daemon=True)
+            for account in self.accounts
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = results.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            stop.set()
@@ -1,34 +1,72 @@
+import re
 import logging
 import base64
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
 from ..auth.supabase_auth import SupabaseAuthClient
-from ..database.models import ThreadInfo, EmailMessage
+from ..config import Config
+from ..database.models import ThreadInfo, EmailMessage, MailboxAccount
+from ..utils.metrics import metrics
+from ..utils.participants import ParticipantProcessor
+from .quota import GmailQuotaLimiter
+from .transport import PooledHttp
 
 logger = logging.getLogger(__name__)
 
 class GmailClient:
     """Gmail API client for fetching emails and threads"""
     
-    def __init__(self):
-        self.auth_client = SupabaseAuthClient()
-        self.service = None
-        self._initialize_service()
+    # Start of quoted history or a signature block (cut from the full-text search text)
+    _SEARCH_CUTOFF_REGEX = re.compile(r'^[ \t]*>|^On .{0,200}wrote:[ \t]*\r?$|^-- ?\r?$', re.MULTILINE)
+    # Upper bound on indexed characters per message (keeps tsvectors small)
+    SEARCH_TEXT_MAX_CHARS = 20000
+    
+    def __init__(self, service: Any = None, account: Optional[MailboxAccount] = None,
+                 quota: Optional[GmailQuotaLimiter] = None):
+        """
+        Args:
+            service: Prebuilt Gmail resource (e.g. a local fake for benchmarks);
+                skips OAuth and the HTTP session when given
+            account: Mailbox to read (multi-mailbox runs); the inbox configured
+                through GMAIL_REFRESH_TOKEN when omitted
+            quota: Limiter for this mailbox's Gmail quota; a fresh one by default
+        """
+        self.account = account
+        self.auth_client = SupabaseAuthClient(account)
+        self.quota = quota or GmailQuotaLimiter()
+        self.service = service
+        self.http: Optional[PooledHttp] = None
+        if service is None:
+            self._initialize_service()
     
     def _initialize_service(self):
-        """Initialize Gmail API service"""
+        """Initialize Gmail API service over a pooled, auto-refreshing HTTP session"""
         try:
             credentials = self.auth_client.get_gmail_credentials()
             if credentials:
-                self.service = build('gmail', 'v1', credentials=credentials)
+                self.http = PooledHttp(credentials)
+                self.service = self._build_service(self.http)
                 logger.info("Gmail service initialized successfully")
             else:
                 logger.error("Failed to initialize Gmail service - no valid credentials")
         except Exception as e:
             logger.error(f"Error initializing Gmail service: {e}")
     
+    @staticmethod
+    def _build_service(http: PooledHttp):
+        """
+        Build the Gmail resource without fetching the discovery document
+
+        Uses the document pinned at GMAIL_DISCOVERY_DOCUMENT when configured, otherwise
+        the copy bundled with google-api-python-client.
+        """
+        if Config.GMAIL_DISCOVERY_DOCUMENT:
+            with open(Config.GMAIL_DISCOVERY_DOCUMENT, encoding='utf-8') as f:
+                return build_from_document(f.read(), http=http)
+        return build('gmail', 'v1', http=http, static_discovery=True, cache_discovery=False)
+    
     def search_messages(self, query: str, max_results: int = 500) -> List[Dict[str, Any]]:
         """
         Search for messages using Gmail query syntax
@@ -42,12 +80,14 @@ class GmailClient:
             page_token = None
             
             while len(messages) < max_results:
-                results = self.service.users().messages().list(
-                    userId='me',
-                    q=query,
-                    maxResults=min(500, max_results - len(messages)),
-                    pageToken=page_token
-                ).execute()
+                self.quota.acquire("messages.list")
+                with metrics.timer("gmail.messages.list"):
+                    results = self.service.users().messages().list(
+                        userId='me',
+                        q=query,
+                        maxResults=min(500, max_results - len(messages)),
+                        pageToken=page_token
+                    ).execute()
                 
                 if 'messages' in results:
                     messages.extend(results['messages'])
@@ -72,11 +112,13 @@ class GmailClient:
             return None
         
         try:
-            message = self.service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format='full'
-            ).execute()
+            self.quota.acquire("messages.get")
+            with metrics.timer("gmail.messages.get"):
+                message = self.service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='full'
+                ).execute()
             
             return message
             
@@ -93,11 +135,13 @@ class GmailClient:
             return None
         
         try:
-            thread = self.service.users().threads().get(
-                userId='me',
-                id=thread_id,
-                format='full'
-            ).execute()
+            self.quota.acquire("threads.get")
+            with metrics.timer("gmail.threads.get"):
+                thread = self.service.users().threads().get(
+                    userId='me',
+                    id=thread_id,
+                    format='full'
+                ).execute()
             
             return thread
             
@@ -120,6 +164,48 @@ class GmailClient:
         
         return headers
     
+    @staticmethod
+    def get_message_timestamp_ms(message: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """
+        Get a message's timestamp as epoch milliseconds
+        
+        Uses Gmail's internalDate (already an epoch-ms integer, and what Gmail itself
+        sorts by). The RFC 2822 Date header is only parsed when internalDate is missing.
+        """
+        internal_date = message.get('internalDate')
+        if internal_date:
+            try:
+                return int(internal_date)
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid internalDate '{internal_date}' on message {message.get('id', 'unknown')}")
+        
+        date_str = (headers or {}).get('date', '')
+        if date_str:
+            try:
+                from email.utils import parsedate_to_datetime
+                parsed = parsedate_to_datetime(date_str)
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                return int(parsed.timestamp() * 1000)
+            except Exception as e:
+                logger.warning(f"Error parsing date '{date_str}': {e}")
+        
+        return None
+    
+    @staticmethod
+    def timestamp_ms_to_datetime(timestamp_ms: int) -> datetime:
+        """Convert epoch milliseconds to a UTC datetime"""
+        return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+    
+    @staticmethod
+    def build_search_text(body_text: str) -> str:
+        """Body text without quoted replies or signature, whitespace-collapsed, for the FTS index"""
+        if not body_text:
+            return ""
+        cutoff = GmailClient._SEARCH_CUTOFF_REGEX.search(body_text)
+        text = body_text[:cutoff.start()] if cutoff else body_text
+        return " ".join(text.split())[:GmailClient.SEARCH_TEXT_MAX_CHARS]
+    
     def extract_message_body(self, message: Dict[str, Any]) -> str:
         """Extract text content from message body"""
         def get_body_from_parts(parts):
@@ -162,19 +248,12 @@ class GmailClient:
             headers = self.parse_message_headers(message)
             body_text = self.extract_message_body(message)
             
-            # Parse date with timezone handling
-            date_str = headers.get('date', '')
-            try:
-                # Gmail date format parsing
-                from email.utils import parsedate_to_datetime
-                received_date = parsedate_to_datetime(date_str)
-                
-                # Ensure timezone info is present
-                if received_date.tzinfo is None:
-                    received_date = received_date.replace(tzinfo=timezone.utc)
-                    
-            except Exception as e:
-                logger.warning(f"Error parsing date '{date_str}': {e}")
+            # Gmail internalDate (epoch ms), Date header only as a fallback
+            timestamp_ms = self.get_message_timestamp_ms(message, headers)
+            if timestamp_ms is not None:
+                received_date = self.timestamp_ms_to_datetime(timestamp_ms)
+            else:
+                logger.warning(f"No usable date on message {message.get('id', 'unknown')}, using current time")
                 received_date = datetime.now(timezone.utc)
             
             # Extract sender info
@@ -203,8 +282,9 @@ class GmailClient:
                 subject=headers.get('subject', 'No Subject'),
                 body_text=body_text,
                 snippet=message.get('snippet', ''),
+                search_text=self.build_search_text(body_text),
                 received_date=received_date,
-                is_from_user=False  # Will be determined by sender email comparison
+                is_from_user=ParticipantProcessor.is_user_address(sender_email)
             )
             
         except Exception as e:
@@ -1,5 +1,6 @@
 import logging
-from typing import List, Dict, Any, Set
+from urllib.parse import quote
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 from datetime import datetime, timezone
 from collections import defaultdict
 from .client import GmailClient
@@ -7,18 +8,32 @@ from ..database.models import ThreadInfo, EmailMessage, EmailThread
 from ..config import Config
 from ..utils.keywords import KeywordMatcher
 from ..utils.participants import ParticipantProcessor
+from ..utils.resilience import deadline
+from ..utils.sharding import Shard
 
 logger = logging.getLogger(__name__)
 
 class EmailSearcher:
     """Handles searching and organizing Gmail threads for sponsorship emails"""
 
-    def __init__(self):
-        self.gmail_client = GmailClient()
-        self.keyword_matcher = KeywordMatcher()
+    def __init__(self, keyword_matcher: Optional[KeywordMatcher] = None, gmail_client: Optional[GmailClient] = None):
+        self.gmail_client = gmail_client or GmailClient()
+        self.keyword_matcher = keyword_matcher or KeywordMatcher()
 
-    def build_search_query(self) -> str:
-        """Build Gmail search query for sponsorship-related emails - focusing on subject lines"""
+    @property
+    def account_email(self) -> str:
+        """Address of the mailbox this searcher reads"""
+        account = self.gmail_client.account
+        return account.email if account else Config.USER_EMAIL
+
+    def build_search_query(self, since: Optional[datetime] = None) -> str:
+        """
+        Build Gmail search query for sponsorship-related emails - focusing on subject lines
+
+        Args:
+            since: Only match messages received after this instant (incremental
+                syncs); defaults to the collection start date
+        """
         # Create subject-specific searches for better precision
         subject_terms = []
         for keyword in Config.SPONSORSHIP_KEYWORDS:
@@ -27,8 +42,11 @@ class EmailSearcher:
         # Combine with OR - search only in subject lines
         keyword_query = ' OR '.join(subject_terms)
 
-        # Date filter (after July 14, 2024)
-        date_filter = Config.COLLECTION_START_DATE.strftime("%Y/%m/%d")
+        # Date filter (after July 14, 2024); Gmail accepts epoch seconds for sub-day precision
+        if since is not None:
+            date_filter = str(int(since.timestamp()))
+        else:
+            date_filter = Config.COLLECTION_START_DATE.strftime("%Y/%m/%d")
 
         # Combine query parts - focus on subject line to reduce noise
         query = f'({keyword_query}) after:{date_filter}'
@@ -36,12 +54,12 @@ class EmailSearcher:
         logger.info(f"Built subject-focused search query: {query}")
         return query
 
-    def search_sponsorship_emails(self, max_results: int = None) -> List[Dict[str, Any]]:
-        """Search for sponsorship-related emails"""
+    def search_sponsorship_emails(self, max_results: int = None, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Search for sponsorship-related emails (optionally only those received after `since`)"""
         if max_results is None:
             max_results = Config.MAX_RESULTS_PER_QUERY
 
-        query = self.build_search_query()
+        query = self.build_search_query(since)
         messages = self.gmail_client.search_messages(query, max_results)
 
         logger.info(f"Found {len(messages)} potential sponsorship messages")
@@ -72,8 +90,7 @@ class EmailSearcher:
 
             # Extract participants and filter user email
             raw_participants = set()
-            first_message_date = None
-            last_message_date = None
+            message_timestamps: List[int] = []
             subject = ""
 
             for message in messages:
@@ -84,41 +101,25 @@ class EmailSearcher:
                     if header_name in headers:
                         raw_participants.add(headers[header_name])
 
-            # Process participants: filter user email and normalize
-            participants_list = ParticipantProcessor.filter_user_emails(list(raw_participants))
-            normalized_participants = ParticipantProcessor.normalize_participants(participants_list)
-
-            # Continue processing messages for dates and subject
-            for message in messages:
-                headers = self.gmail_client.parse_message_headers(message)
-
                 # Get subject from first message
                 if not subject and 'subject' in headers:
                     subject = headers['subject']
 
-                # Track message dates with timezone handling
-                date_str = headers.get('date', '')
-                if date_str:
-                    try:
-                        from email.utils import parsedate_to_datetime
-                        msg_date = parsedate_to_datetime(date_str)
-
-                        # Ensure timezone info
-                        if msg_date.tzinfo is None:
-                            msg_date = msg_date.replace(tzinfo=timezone.utc)
-
-                        if first_message_date is None or msg_date < first_message_date:
-                            first_message_date = msg_date
-                        if last_message_date is None or msg_date > last_message_date:
-                            last_message_date = msg_date
-                    except Exception as e:
-                        logger.warning(f"Error parsing message date '{date_str}': {e}")
-                        pass
-
-            # Fallback dates with timezone
-            if not first_message_date:
+                # Track message timestamps as epoch-ms integers
+                timestamp_ms = self.gmail_client.get_message_timestamp_ms(message, headers)
+                if timestamp_ms is not None:
+                    message_timestamps.append(timestamp_ms)
+
+            # Split address lists, filter user email and normalize in one pass
+            normalized_participants = ParticipantProcessor.extract_participants(raw_participants)
+
+            # Thread bounds from integer timestamps; current time only if no message had a date
+            if message_timestamps:
+                first_message_date = self.gmail_client.timestamp_ms_to_datetime(min(message_timestamps))
+                last_message_date = self.gmail_client.timestamp_ms_to_datetime(max(message_timestamps))
+            else:
+                logger.warning(f"No message dates found in thread {thread_id}, using current time")
                 first_message_date = datetime.now(timezone.utc)
-            if not last_message_date:
                 last_message_date = first_message_date
 
             return ThreadInfo(
@@ -137,10 +138,18 @@ class EmailSearcher:
     def convert_to_email_thread(self, thread_info: ThreadInfo) -> EmailThread:
         """Convert ThreadInfo to EmailThread model"""
         try:
-            gmail_thread_url = f"https://mail.google.com/mail/u/1/#all/{thread_info.thread_id}"
+            account = self.gmail_client.account
+            if account:
+                # authuser picks the right signed-in inbox regardless of its /u/N slot
+                gmail_thread_url = f"https://mail.google.com/mail/?authuser={quote(account.email)}#all/{thread_info.thread_id}"
+            else:
+                gmail_thread_url = f"https://mail.google.com/mail/u/1/#all/{thread_info.thread_id}"
 
             # Create participant signature for deduplication
-            participant_signature = ParticipantProcessor.create_participant_signature(thread_info.participants)
+            # thread_info.participants is already normalized by extract_participants
+            participant_signature = ParticipantProcessor.create_participant_signature(
+                thread_info.participants, normalized=True
+            )
 
             return EmailThread(
                 gmail_thread_id=thread_info.thread_id,
@@ -150,6 +159,7 @@ class EmailSearcher:
                 first_message_date=thread_info.first_message_date,
                 last_message_date=thread_info.last_message_date,
                 message_count=len(thread_info.messages),
+                account_email=self.account_email,
                 gmail_thread_url=gmail_thread_url,
                 status='new'
             )
@@ -177,22 +187,31 @@ class EmailSearcher:
         logger.info(f"Filtered {len(thread_ids)} threads: {len(new_thread_ids)} new, {len(existing_thread_ids_found)} existing (potential updates)")
         return new_thread_ids, existing_thread_ids_found
 
-    def search_and_organize_threads(self, existing_thread_ids: Set[str] = None) -> tuple[List[ThreadInfo], List[ThreadInfo]]:
+    def iter_thread_infos(self, existing_thread_ids: Set[str] = None, since: Optional[datetime] = None,
+                          shard: Optional[Shard] = None) -> Iterator[Tuple[ThreadInfo, bool]]:
         """
-        Main method to search for sponsorship emails and organize them into threads
-        Returns: (new_threads, existing_threads_with_updates)
+        Search for sponsorship emails and yield (thread_info, is_new) as each thread's
+        details are fetched, new threads first
+
+        Lets the caller store (and hand off) a thread before the next one is fetched.
+        With `since`, only threads that received a matching message after that
+        instant are fetched (incremental sync). With `shard`, every shard runs the
+        (cheap) search but only fetches the threads it owns.
         """
         if existing_thread_ids is None:
             existing_thread_ids = set()
 
         # Search for messages
-        messages = self.search_sponsorship_emails()
+        messages = self.search_sponsorship_emails(since=since)
         if not messages:
-            logger.warning("No sponsorship messages found")
-            return [], []
+            if since is None:
+                logger.warning("No sponsorship messages found")
+            return
 
         # Group by threads
         thread_groups = self.group_messages_by_thread(messages)
+        if shard:
+            thread_groups = {thread_id: thread_groups[thread_id] for thread_id in shard.filter(thread_groups)}
 
         # Filter into new and existing threads
         new_thread_ids, existing_thread_ids_found = self.filter_existing_threads(
@@ -200,23 +219,24 @@ class EmailSearcher:
             existing_thread_ids
         )
 
-        # Get detailed thread information for new threads
-        new_thread_infos = []
-        for thread_id in new_thread_ids:
-            thread_info = self.get_detailed_thread_info(thread_id)
-            if thread_info:
-                new_thread_infos.append(thread_info)
-            else:
-                logger.warning(f"Could not get details for new thread {thread_id}")
+        for thread_ids, is_new in ((new_thread_ids, True), (existing_thread_ids_found, False)):
+            for thread_id in thread_ids:
+                with deadline(Config.GMAIL_THREAD_DEADLINE_SECONDS):
+                    thread_info = self.get_detailed_thread_info(thread_id)
+                if thread_info:
+                    yield thread_info, is_new
+                else:
+                    logger.warning(f"Could not get details for {'new' if is_new else 'existing'} thread {thread_id}")
 
-        # Get detailed thread information for existing threads (potential updates)
+    def search_and_organize_threads(self, existing_thread_ids: Set[str] = None) -> tuple[List[ThreadInfo], List[ThreadInfo]]:
+        """
+        Main method to search for sponsorship emails and organize them into threads
+        Returns: (new_threads, existing_threads_with_updates)
+        """
+        new_thread_infos = []
         existing_thread_infos = []
-        for thread_id in existing_thread_ids_found:
-            thread_info = self.get_detailed_thread_info(thread_id)
-            if thread_info:
-                existing_thread_infos.append(thread_info)
-            else:
-                logger.warning(f"Could not get details for existing thread {thread_id}")
+        for thread_info, is_new in self.iter_thread_infos(existing_thread_ids):
+            (new_thread_infos if is_new else existing_thread_infos).append(thread_info)
 
         logger.info(f"Successfully processed {len(new_thread_infos)} new threads and {len(existing_thread_infos)} existing threads with potential updates")
         return new_thread_infos, existing_thread_infos
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+from ..config import Config
+from ..utils.metrics import metrics
+from ..utils.resilience import clamp_timeout
+
+logger = logging.getLogger(__name__)
+
+def prompt_key(prompt: str, system_instruction: Optional[str] = None) -> str:
+    """Stable key used to match recorded responses to prompts"""
+    key_source = f"{system_instruction}\n\x00\n{prompt}" if system_instruction else prompt
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token) for offline accounting"""
+    return len(text) // 4 if text else 0
+
+class LLMUsage:
+    """Token accounting accumulated by a backend across calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.instruction_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0, instruction_tokens: int = 0):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.cached_tokens += cached_tokens
+            self.instruction_tokens += instruction_tokens
+
+    def report(self) -> Dict[str, Any]:
+        """Usage summary including how much of the input was served from a cached prefix"""
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "billed_uncached_tokens": self.prompt_tokens - self.cached_tokens,
+            "output_tokens": self.output_tokens,
+            "instruction_tokens": self.instruction_tokens,
+            "cached_fraction": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+        }
+
+class LLMBackend(ABC):
+    """Interface for LLM backends used by GeminiProcessor"""
+
+    name = "base"
+
+    def __init__(self):
+        self.usage = LLMUsage()
+
+    @abstractmethod
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """
+        Return the raw response text for a prompt ("" if the model returned nothing)
+
+        ``system_instruction`` is the static prefix shared by every request; backends
+        that support it send it once (system instruction / cached context) instead
+        of inline with each prompt.
+        """
+
+class GeminiBackend(LLMBackend):
+    """Live Gemini API backend"""
+
+    name = "gemini"
+
+    # Refresh cached contexts this long before they expire
+    CACHE_REFRESH_MARGIN_SECONDS = 60
+
+    def __init__(self, response_schema: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        # Imported here so offline backends work without the SDK configured
+        import google.generativeai as genai
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+        self._genai = genai
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+
+        self.generation_config = {
+            "temperature": Config.GEMINI_TEMPERATURE,
+            "max_output_tokens": Config.GEMINI_MAX_OUTPUT_TOKENS,
+            "response_mime_type": "application/json",
+        }
+        if response_schema:
+            self.generation_config["response_schema"] = response_schema
+
+        self.safety_settings = {
+            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+        }
+
+        # Configure model
+        self.model = genai.GenerativeModel(
+            model_name=Config.GEMINI_MODEL,
+            generation_config=self.generation_config,
+            safety_settings=self.safety_settings
+        )
+
+        # system instruction -> (model, refresh_at or None)
+        self._prefix_models: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._prefix_lock = threading.Lock()
+
+    def _create_cached_model(self, system_instruction: str) -> Tuple[Any, Optional[float]]:
+        """Create a model bound to a cached context for the prefix, falling back to a system instruction"""
+        if Config.GEMINI_CONTEXT_CACHE:
+            try:
+                from google.generativeai import caching
+
+                ttl_seconds = Config.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+                cached_content = caching.CachedContent.create(
+                    model=Config.GEMINI_CACHE_MODEL,
+                    display_name="sponsor-crm-instructions",
+                    system_instruction=system_instruction,
+                    ttl=timedelta(seconds=ttl_seconds)
+                )
+                model = self._genai.GenerativeModel.from_cached_content(
+                    cached_content,
+                    generation_config=self.generation_config,
+                    safety_settings=self.safety_settings
+                )
+                logger.info(f"Created Gemini context cache {cached_content.name} (ttl {ttl_seconds}s)")
+                refresh_at = time.time() + max(ttl_seconds - self.CACHE_REFRESH_MARGIN_SECONDS, 0)
+                return model, refresh_at
+
+            except Exception as e:
+                # Prompts below the model's minimum cacheable size end up here
+                logger.warning(f"Gemini context cache unavailable, using system instruction instead: {e}")
+
+        model = self._genai.GenerativeModel(
+            model_name=Config.GEMINI_MODEL,
+            generation_config=self.generation_config,
+            safety_settings=self.safety_settings,
+            system_instruction=system_instruction
+        )
+        return model, None
+
+    def _model_for(self, system_instruction: Optional[str]):
+        """Return the model to use for a given static prefix, refreshing expired caches"""
+        if not system_instruction:
+            return self.model
+
+        with self._prefix_lock:
+            cached = self._prefix_models.get(system_instruction)
+            if cached and (cached[1] is None or time.time() < cached[1]):
+                metrics.incr("llm.prefix_model.hit")
+                return cached[0]
+
+            metrics.incr("llm.prefix_model.miss")
+
+            if cached:
+                logger.info("Gemini context cache about to expire - refreshing")
+            self._prefix_models[system_instruction] = self._create_cached_model(system_instruction)
+            return self._prefix_models[system_instruction][0]
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        timeout = clamp_timeout(Config.LLM_REQUEST_TIMEOUT_SECONDS)
+        response = self._model_for(system_instruction).generate_content(
+            prompt, request_options={"timeout": timeout}
+        )
+
+        usage_metadata = getattr(response, "usage_metadata", None)
+        if usage_metadata:
+            self.usage.record(
+                prompt_tokens=usage_metadata.prompt_token_count,
+                output_tokens=usage_metadata.candidates_token_count,
+                cached_tokens=getattr(usage_metadata, "cached_content_token_count", 0) or 0,
+                instruction_tokens=estimate_tokens(system_instruction)
+            )
+
+        try:
+            return response.text or ""
+        except ValueError as e:
+            # Raised when the candidate was blocked or has no text parts
+            logger.warning(f"Gemini returned no text: {e}")
+            return ""
+
+class RecordingBackend(LLMBackend):
+    """Wraps another backend and appends every prompt->response pair to a JSONL file"""
+
+    name = "record"
+
+    def __init__(self, inner: LLMBackend, path: str):
+        super().__init__()
+        self.inner = inner
+        self.usage = inner.usage
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        started = time.perf_counter()
+        response_text = self.inner.generate(prompt, system_instruction)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        record = {
+            "key": prompt_key(prompt, system_instruction),
+            "system_instruction": system_instruction,
+            "prompt": prompt,
+            "response": response_text,
+            "latency_ms": round(latency_ms, 1),
+        }
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+
+        return response_text
+
+class ReplayBackend(LLMBackend):
+    """Serves recorded responses with configurable synthetic latency"""
+
+    name = "replay"
+
+    def __init__(self, path: str, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self.responses: Dict[str, str] = {}
+        self.misses = 0
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    # Last recording for a prompt wins
+                    self.responses[record["key"]] = record["response"]
+
+        logger.info(f"Loaded {len(self.responses)} recorded LLM responses from {path}")
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        delay_ms = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        key = prompt_key(prompt, system_instruction)
+        response_text = self.responses.get(key)
+        if response_text is None:
+            self.misses += 1
+            raise KeyError(f"No recorded response for prompt {key[:12]}")
+
+        self.usage.record(
+            prompt_tokens=estimate_tokens(prompt) + estimate_tokens(system_instruction),
+            output_tokens=estimate_tokens(response_text),
+            instruction_tokens=estimate_tokens(system_instruction)
+        )
+        return response_text
+
+class StubBackend(LLMBackend):
+    """Deterministic offline backend that fabricates schema-valid JSON from the prompt hash"""
+
+    name = "stub"
+
+    def __init__(self, response_schema: Optional[Dict[str, Any]] = None, latency_ms: float = 0.0):
+        super().__init__()
+        self.response_schema = response_schema or {"type": "object", "properties": {}}
+        self.latency_ms = latency_ms
+
+    def _value_for(self, name: str, schema: Dict[str, Any], rng: random.Random) -> Any:
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        schema_type = schema.get("type")
+        if schema_type == "number":
+            return round(rng.random(), 2)
+        if schema_type == "integer":
+            return rng.randint(0, 100)
+        if schema_type == "boolean":
+            return rng.random() < 0.5
+        if schema_type == "array":
+            return []
+        if schema.get("nullable") and rng.random() < 0.2:
+            return None
+        return f"stub {name} {rng.randint(0, 999)}"
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        rng = random.Random(prompt_key(prompt, system_instruction))
+        data = {
+            name: self._value_for(name, schema, rng)
+            for name, schema in self.response_schema.get("properties", {}).items()
+        }
+        response_text = json.dumps(data)
+
+        self.usage.record(
+            prompt_tokens=estimate_tokens(prompt) + estimate_tokens(system_instruction),
+            output_tokens=estimate_tokens(response_text),
+            instruction_tokens=estimate_tokens(system_instruction)
+        )
+        return response_text
+
+def create_backend(response_schema: Optional[Dict[str, Any]] = None, backend_name: str = None) -> LLMBackend:
+    """Build the LLM backend selected by Config.LLM_BACKEND"""
+    backend_name = (backend_name or Config.LLM_BACKEND).lower()
+
+    if backend_name == "gemini":
+        return GeminiBackend(response_schema)
+    if backend_name == "record":
+        return RecordingBackend(GeminiBackend(response_schema), Config.LLM_RECORDINGS_PATH)
+    if backend_name == "replay":
+        return ReplayBackend(
+            Config.LLM_RECORDINGS_PATH,
+            latency_ms=Config.LLM_SYNTHETIC_LATENCY_MS,
+            jitter_ms=Config.LLM_SYNTHETIC_JITTER_MS
+        )
+    if backend_name == "stub":
+        return StubBackend(response_schema, latency_ms=Config.LLM_SYNTHETIC_LATENCY_MS)
+
+    raise ValueError(f"Unknown LLM backend '{backend_name}' (expected gemini, record, replay or stub)")
@@ -1,11 +1,13 @@
 import logging
-import json
+import threading
 from typing import List, Optional
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from ..database.models import EmailMessage, EmailThread, SponsorInfo
 from ..config import Config
 from .prompts import SponsorshipPrompts
+from .schema import build_response_schema, parse_model_response
+from .backends import create_backend
+from ..utils.metrics import metrics
+from ..utils.resilience import CallDeadlineExceeded, get_policy, is_transient, remaining
 
 logger = logging.getLogger(__name__)
 
@@ -14,33 +16,41 @@ class GeminiProcessor:
     
     def __init__(self):
         self.prompts = SponsorshipPrompts()
+        # last_error is per calling thread so concurrent pipeline workers don't mix reasons
+        self._local = threading.local()
+
+        # Call accounting - calls per extracted thread should stay close to 1.0
+        self.call_count = 0
+        self.extraction_count = 0
+        self._count_lock = threading.Lock()
         self._initialize_gemini()
     
+    @property
+    def last_error(self) -> Optional[str]:
+        """Reason the calling thread's most recent extraction failed (None on success)"""
+        return getattr(self._local, "last_error", None)
+    
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self._local.last_error = value
+    
+    @property
+    def last_error_transient(self) -> bool:
+        """Whether the calling thread's last failure was an outage/overload worth retrying later"""
+        return getattr(self._local, "last_error_transient", False)
+    
+    @last_error_transient.setter
+    def last_error_transient(self, value: bool):
+        self._local.last_error_transient = value
+    
     def _initialize_gemini(self):
-        """Initialize Gemini AI client"""
+        """Initialize the configured LLM backend (live Gemini, record, replay or stub)"""
         try:
-            genai.configure(api_key=Config.GEMINI_API_KEY)
-            
-            # Configure model
-            self.model = genai.GenerativeModel(
-                model_name=Config.GEMINI_MODEL,
-                generation_config={
-                    "temperature": Config.GEMINI_TEMPERATURE,
-                    "max_output_tokens": Config.GEMINI_MAX_OUTPUT_TOKENS,
-                    "response_mime_type": "application/json"
-                },
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                }
-            )
-            
-            logger.info("Gemini client initialized successfully")
+            self.backend = create_backend(build_response_schema(SponsorInfo))
+            logger.info(f"LLM backend '{self.backend.name}' initialized successfully")
             
         except Exception as e:
-            logger.error(f"Error initializing Gemini client: {e}")
+            logger.error(f"Error initializing LLM backend: {e}")
             raise
     
     def format_thread_for_analysis(self, thread: EmailThread, messages: List[EmailMessage]) -> str:
@@ -80,41 +90,86 @@ CONTENT:
             return f"Error formatting thread: {str(e)}"
     
     def extract_sponsor_info(self, thread: EmailThread, messages: List[EmailMessage]) -> Optional[SponsorInfo]:
-        """Extract sponsor information from thread using Gemini"""
+        """
+        Extract sponsor information from thread using Gemini
+
+        Near-miss responses are repaired locally; the request is only re-sent
+        (up to GEMINI_PARSE_RETRIES times) when repair fails. On failure the
+        reason is left in ``last_error`` so the caller can record it, and
+        ``last_error_transient`` tells outages (retries through the "llm"
+        ResiliencePolicy exhausted, circuit open) apart from failures of the
+        thread itself. Running out of the thread's own deadline counts as a
+        failure of the thread: retrying it would hit the same deadline.
+        """
+        self.last_error = None
+        self.last_error_transient = False
         try:
             # Format thread for analysis
             thread_content = self.format_thread_for_analysis(thread, messages)
             
-            # Get prompt
-            prompt = self.prompts.get_sponsor_extraction_prompt(thread_content)
-            
-            # Call Gemini
-            response = self.model.generate_content(prompt)
-            
-            if not response.text:
-                logger.warning(f"Empty response from Gemini for thread {thread.gmail_thread_id}")
-                return None
-            
-            # Parse JSON response
-            try:
-                result_data = json.loads(response.text)
-                sponsor_info = SponsorInfo(**result_data)
+            # Static instructions go out once as a system instruction / cached context
+            instructions = self.prompts.get_sponsor_extraction_instructions()
+            payload = self.prompts.get_thread_payload(thread_content)
+            
+            for attempt in range(1 + Config.GEMINI_PARSE_RETRIES):
+                # Call Gemini
+                with self._count_lock:
+                    self.call_count += 1
+                with metrics.timer("llm.generate") as timer:
+                    response_text = get_policy("llm").call(
+                        lambda: self.backend.generate(payload, system_instruction=instructions)
+                    )
+                    timer.bytes = len(payload) + len(response_text or "")
                 
-                logger.info(f"Successfully extracted sponsor info for thread {thread.gmail_thread_id}")
-                return sponsor_info
+                if not response_text:
+                    self.last_error = "Empty response from Gemini"
+                    logger.warning(f"Empty response from Gemini for thread {thread.gmail_thread_id} (attempt {attempt + 1})")
+                    continue
                 
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini JSON response: {e}")
-                logger.debug(f"Raw response: {response.text}")
-                return None
-            except Exception as e:
-                logger.error(f"Failed to create SponsorInfo model: {e}")
-                return None
+                # Parse JSON response, repairing near-misses before re-requesting
+                try:
+                    sponsor_info = parse_model_response(SponsorInfo, response_text)
+                    with self._count_lock:
+                        self.extraction_count += 1
+                    
+                    logger.info(f"Successfully extracted sponsor info for thread {thread.gmail_thread_id}")
+                    return sponsor_info
+                    
+                except ValueError as e:
+                    self.last_error = str(e)
+                    logger.error(f"Failed to parse Gemini response for thread {thread.gmail_thread_id} (attempt {attempt + 1}): {e}")
+                    logger.debug(f"Raw response: {response_text}")
+            
+            return None
                 
         except Exception as e:
+            self.last_error = str(e)
+            # A request timeout clamped to the thread deadline is the deadline too
+            left = remaining()
+            out_of_time = isinstance(e, CallDeadlineExceeded) or (left is not None and left <= 0)
+            self.last_error_transient = is_transient(e) and not out_of_time
             logger.error(f"Error extracting sponsor info for thread {thread.gmail_thread_id}: {e}")
             return None
     
+    def get_usage_report(self) -> dict:
+        """Token usage for this processor, including input tokens served from the cached prefix"""
+        return self.backend.usage.report()
+    
+    def publish_usage_metrics(self):
+        """Copy token usage and call accounting into the run metrics"""
+        usage = self.get_usage_report()
+        metrics.set_counter("llm.tokens.prompt", usage["prompt_tokens"])
+        metrics.set_counter("llm.tokens.cached", usage["cached_tokens"])
+        metrics.set_counter("llm.tokens.output", usage["output_tokens"])
+        metrics.set_counter("llm.calls", self.call_count)
+        metrics.set_counter("llm.extractions", self.extraction_count)
+    
+    def get_calls_per_extraction(self) -> float:
+        """Gemini calls made per successfully extracted thread"""
+        if not self.extraction_count:
+            return float(self.call_count)
+        return self.call_count / self.extraction_count
+    
     def analyze_priority(self, thread: EmailThread, messages: List[EmailMessage]) -> str:
         """Analyze thread priority and return reasoning"""
         try:
@@ -1,20 +1,22 @@
 class SponsorshipPrompts:
-    """Prompts for Gemini AI to extract sponsorship information"""
+    """
+    Prompts for Gemini AI to extract sponsorship information
 
-    def get_sponsor_extraction_prompt(self, thread_content: str) -> str:
-        """Get prompt for extracting sponsor information from email thread"""
+    Each prompt is split into a static instruction prefix (sent once as a system
+    instruction / cached context) and a per-thread payload.
+    """
 
-        return f"""
-You are an AI assistant specialized in analyzing business email threads to extract sponsorship and partnership information.
+    def get_sponsor_extraction_instructions(self) -> str:
+        """Static instruction prefix for sponsor extraction (identical for every thread)"""
 
-Analyze the following email thread and extract structured information about potential sponsorship opportunities.
+        return """
+You are an AI assistant specialized in analyzing business email threads to extract sponsorship and partnership information.
 
-EMAIL THREAD:
-{thread_content}
+Analyze the email thread provided and extract structured information about potential sponsorship opportunities.
 
 Extract the following information and return it as valid JSON with exactly these fields:
 
-{{
+{
     "poc_name": "Name of the point of contact at the SPONSOR's organisation (usually a person's name from email signature or content)",
     "org_name": "Name of the organization or company **that is being asked to sponsor**",
     "estimated_value_amount": "Estimated monetary value like '$5000' or 'TBD' if not mentioned",
@@ -26,7 +28,7 @@ Extract the following information and return it as valid JSON with exactly these
     "last_action_summary": "Summary of the most recent action (e.g., 'Sarah from TechCorp replied 2 hours ago')",
     "next_action_status": "Recommended next action: 'read', 'reply', or 'other'",
     "next_action_description": "Specific description for 'other' actions, null otherwise"
-}}
+}
 
 ANALYSIS GUIDELINES:
 
@@ -70,14 +72,16 @@ ANALYSIS GUIDELINES:
 Return ONLY the JSON object, no additional text or formatting.
 """
 
-    def get_priority_analysis_prompt(self, thread_content: str) -> str:
-        """Get prompt for analyzing thread priority"""
+    def get_sponsor_extraction_prompt(self, thread_content: str) -> str:
+        """Get prompt for extracting sponsor information from email thread"""
 
-        return f"""
-Analyze this email thread and determine the priority level and reasoning.
+        return self.get_sponsor_extraction_instructions() + self.get_thread_payload(thread_content)
 
-EMAIL THREAD:
-{thread_content}
+    def get_priority_analysis_instructions(self) -> str:
+        """Static instruction prefix for priority analysis"""
+
+        return """
+Analyze the email thread provided and determine the priority level and reasoning.
 
 Consider:
 - How long since the last message
@@ -86,27 +90,42 @@ Consider:
 - Business importance of the opportunity
 
 Return JSON with:
-{{
+{
     "priority_level": "READ_NOW|REPLY_NOW|NORMAL|LOW",
     "reasoning": "Explanation for the priority assignment"
-}}
+}
 """
 
-    def get_sponsor_info_prompt(self, thread_content: str) -> str:
-        """Get prompt for extracting basic sponsor information"""
+    def get_priority_analysis_prompt(self, thread_content: str) -> str:
+        """Get prompt for analyzing thread priority"""
 
-        return f"""
-Extract sponsor information from this email thread:
+        return self.get_priority_analysis_instructions() + self.get_thread_payload(thread_content)
 
-EMAIL THREAD:
-{thread_content}
+    def get_sponsor_info_instructions(self) -> str:
+        """Static instruction prefix for basic sponsor information"""
+
+        return """
+Extract sponsor information from the email thread provided.
 
 Return JSON with:
-{{
+{
     "poc_name": "Contact person name",
     "org_name": "Organization name",
     "estimated_value": "Estimated value of sponsorship",
     "value_type": "monetary|in-kind|catering|equipment|other",
     "confidence": 0.0-1.0
-}}
+}
 """
+
+    def get_sponsor_info_prompt(self, thread_content: str) -> str:
+        """Get prompt for extracting basic sponsor information"""
+
+        return self.get_sponsor_info_instructions() + self.get_thread_payload(thread_content)
+
+    def get_thread_payload(self, thread_content: str) -> str:
+        """Per-thread part of every prompt, sent after the static instructions"""
+
+        return f"""
+EMAIL THREAD:
+{thread_content}
+"""
\ No newline at end of file
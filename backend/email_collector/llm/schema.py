@@ -0,0 +1,148 @@
+import re
+import json
+import logging
+from typing import Any, Dict, Type, get_args, get_origin, Literal, Union
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Python annotation -> Gemini (OpenAPI subset) schema type
+_TYPE_MAP = {
+    str: "string",
+    float: "number",
+    int: "integer",
+    bool: "boolean",
+}
+
+def _annotation_to_schema(annotation: Any) -> Dict[str, Any]:
+    """Convert a single field annotation into a Gemini schema fragment"""
+    nullable = False
+    origin = get_origin(annotation)
+
+    # Optional[X] -> X with nullable
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        nullable = len(args) < len(get_args(annotation))
+        annotation = args[0]
+        origin = get_origin(annotation)
+
+    if origin is Literal:
+        schema = {"type": "string", "enum": [str(value) for value in get_args(annotation)]}
+    elif origin in (list, tuple):
+        item_type = get_args(annotation)[0] if get_args(annotation) else str
+        schema = {"type": "array", "items": _annotation_to_schema(item_type)}
+    else:
+        schema = {"type": _TYPE_MAP.get(annotation, "string")}
+
+    if nullable:
+        schema["nullable"] = True
+    return schema
+
+def build_response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Derive a Gemini response_schema from a pydantic model
+
+    Only the keys Gemini accepts (type, enum, nullable, description, properties,
+    required) are emitted, so defaults and numeric bounds are left to pydantic.
+    """
+    properties = {}
+    for name, field in model.model_fields.items():
+        schema = _annotation_to_schema(field.annotation)
+        if field.description:
+            schema["description"] = field.description
+        properties[name] = schema
+
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties.keys()),
+    }
+
+def repair_json_text(text: str) -> str:
+    """Fix common near-miss JSON: code fences, surrounding prose and trailing commas"""
+    repaired = text.strip()
+
+    # Strip ```json ... ``` fences
+    repaired = re.sub(r'^```(?:json)?\s*|\s*```$', '', repaired)
+
+    # Keep only the outermost JSON object
+    start = repaired.find('{')
+    end = repaired.rfind('}')
+    if start != -1 and end > start:
+        repaired = repaired[start:end + 1]
+
+    # Remove trailing commas before closing braces/brackets
+    repaired = re.sub(r',\s*([}\]])', r'\1', repaired)
+
+    return repaired
+
+def coerce_model_fields(model: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce values the model commonly gets slightly wrong into valid field values"""
+    coerced = {}
+    for name, value in data.items():
+        field = model.model_fields.get(name)
+        if field is None:
+            continue  # Drop unknown keys
+
+        annotation = field.annotation
+        if get_origin(annotation) is Union:
+            annotation = [arg for arg in get_args(annotation) if arg is not type(None)][0]
+
+        if isinstance(value, str) and value.strip().lower() in ("", "null", "none", "n/a"):
+            value = field.get_default(call_default_factory=True)
+
+        if annotation is float and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            # Same rule for strings and numbers: "0.8", 0.8, "80%", 80 -> 0.8 for scores
+            percent = isinstance(value, str) and '%' in value
+            if isinstance(value, str):
+                match = re.search(r'-?\d+(?:\.\d+)?', value)
+                value = float(match.group()) if match else field.get_default(call_default_factory=True)
+            if isinstance(value, (int, float)):
+                value = float(value)
+                if name.endswith("score"):
+                    if percent or value > 1:
+                        value /= 100
+                    value = min(max(value, 0.0), 1.0)
+                elif percent:
+                    value /= 100
+
+        if get_origin(annotation) is Literal and value is not None:
+            allowed = [str(option) for option in get_args(annotation)]
+            normalized = str(value).strip()
+            matches = [option for option in allowed if option.lower() == normalized.lower()]
+            value = matches[0] if matches else field.get_default(call_default_factory=True)
+
+        coerced[name] = value
+
+    return coerced
+
+def parse_model_response(model: Type[BaseModel], text: str) -> BaseModel:
+    """
+    Parse an LLM response into the given model, repairing near-misses locally
+
+    Raises:
+        ValueError: if the response cannot be repaired into a valid model
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(repair_json_text(text))
+            logger.debug("Repaired malformed JSON response locally")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Unparseable JSON response: {e}") from e
+
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        data = data[0]
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+
+    try:
+        return model(**data)
+    except ValidationError:
+        pass
+
+    try:
+        return model(**coerce_model_fields(model, data))
+    except ValidationError as e:
+        raise ValueError(f"Response failed {model.__name__} validation: {e.error_count()} errors") from e
@@ -6,21 +6,42 @@ This script collects sponsorship-related emails from Gmail, processes them with
 and stores the structured data in Supabase.
 
 Usage:
-    python main.py [--collect-only] [--process-only] [--dry-run]
+    python main.py [--collect-only] [--process-only] [--refresh-priorities] [--backfill-values] [--sequential] [--daemon] [--dry-run]
+                   [--profile [DIR]] [--profile-memory] [--shard I/N | --shards N]
 """
 
+import time
+import queue
 import asyncio
 import logging
 import argparse
+import threading
+from collections import Counter
 from datetime import datetime
-from typing import List, Set
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from email_collector.config import Config
-from email_collector.database.client import SupabaseClient
-from email_collector.database.models import ProcessingResult, EmailThread, EmailMessage
-from email_collector.gmail.search import EmailSearcher
-from email_collector.llm.gemini_client import GeminiProcessor
+from email_collector.daemon import CollectorDaemon
+from email_collector.database.models import ProcessingResult, EmailThread, EmailMessage, ThreadInfo
+from email_collector.database.work_queue import ThreadWorkQueue
+from email_collector.utils.directory import SponsorDirectory
+from email_collector.utils.keywords import KeywordMatcher
+from email_collector.utils.metrics import metrics
 from email_collector.utils.priority import PriorityCalculator
+from email_collector.utils.resilience import deadline
+from email_collector.utils.sharding import Shard, configure_shard
+from email_collector.utils.triage import RelevanceTriage
+from email_collector.utils.values import ValueNormalizer
+
+# SDK-backed modules (supabase, googleapiclient, google.generativeai, numpy) are
+# imported where first used so short invocations only load what they need
+if TYPE_CHECKING:
+    import numpy as np
+    from email_collector.database.client import SupabaseClient
+    from email_collector.gmail.accounts import MailboxPool
+    from email_collector.gmail.search import EmailSearcher
+    from email_collector.llm.gemini_client import GeminiProcessor
+    from email_collector.utils.dedup import NearDuplicateIndex
 
 # Configure logging
 logging.basicConfig(
@@ -29,20 +50,132 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Called by the collector with each stored thread and its parsed messages; messages is
+# None when the thread was merged into an existing row, whose full history must be re-read
+ThreadHandoff = Callable[[EmailThread, Optional[List[EmailMessage]]], Awaitable[None]]
+
 class EmailCollector:
     """Main orchestrator for email collection and processing"""
 
-    def __init__(self):
-        self.db_client = SupabaseClient()
-        self.email_searcher = EmailSearcher()
-        self.gemini_processor = GeminiProcessor()
-
-    async def collect_new_emails(self, dry_run: bool = False) -> ProcessingResult:
+    def __init__(self, db_client: Optional["SupabaseClient"] = None,
+                 email_searcher: Optional["EmailSearcher"] = None,
+                 gemini_processor: Optional["GeminiProcessor"] = None,
+                 shard: Optional[Shard] = None):
+        # Clients are built on first use: --process-only never touches Gmail and
+        # --collect-only never configures the LLM backend. Passing them in (the
+        # benchmarks inject local fakes) skips construction entirely.
+        self._db_client = db_client
+        self._email_searcher = email_searcher
+        self._gemini_processor = gemini_processor
+        self._client_lock = threading.Lock()
+        # Per-account Gmail workers when several mailboxes are configured
+        self._mailbox_pool: Optional["MailboxPool"] = None
+        # --shard i/N: collect and process only this hash partition of the threads
+        self.shard = shard
+
+        self.keyword_matcher = KeywordMatcher()
+        self.triage = RelevanceTriage(self.keyword_matcher) if Config.TRIAGE_ENABLED else None
+        self.dedup_index: Optional["NearDuplicateIndex"] = None
+        # Gmail thread id -> row id of threads merged into a near-duplicate row
+        self.thread_aliases: Dict[str, str] = {}
+
+    @property
+    def db_client(self) -> "SupabaseClient":
+        """Supabase client, created on first use"""
+        if self._db_client is None:
+            with self._client_lock:
+                if self._db_client is None:
+                    from email_collector.database.client import SupabaseClient
+                    self._db_client = SupabaseClient()
+        return self._db_client
+
+    @property
+    def email_searcher(self) -> "EmailSearcher":
+        """Gmail searcher (OAuth refresh + service build), created on first use"""
+        if self._email_searcher is None:
+            with self._client_lock:
+                if self._email_searcher is None:
+                    from email_collector.gmail.search import EmailSearcher
+                    self._email_searcher = EmailSearcher(self.keyword_matcher)
+        return self._email_searcher
+
+    @property
+    def gemini_processor(self) -> "GeminiProcessor":
+        """LLM processor, created on first use"""
+        if self._gemini_processor is None:
+            with self._client_lock:
+                if self._gemini_processor is None:
+                    from email_collector.llm.gemini_client import GeminiProcessor
+                    self._gemini_processor = GeminiProcessor()
+        return self._gemini_processor
+
+    async def _get_mailbox_pool(self) -> Optional["MailboxPool"]:
+        """Workers for the accounts in GMAIL_ACCOUNTS_FILE / GMAIL_ACCOUNTS_TABLE (None: single inbox)"""
+        if self._mailbox_pool is None and self._email_searcher is None and (
+                Config.GMAIL_ACCOUNTS_FILE or Config.GMAIL_ACCOUNTS_TABLE):
+            from email_collector.gmail.accounts import MailboxPool, load_mailbox_accounts
+
+            accounts = await load_mailbox_accounts(self.db_client)
+            if accounts:
+                self._mailbox_pool = MailboxPool(accounts, self.keyword_matcher)
+        return self._mailbox_pool
+
+    async def _load_dedup_index(self) -> Optional["NearDuplicateIndex"]:
+        """Load the persisted near-duplicate index, bootstrapping it from the database when empty"""
+        if not Config.DEDUP_ENABLED:
+            return None
+        if self.dedup_index is not None:
+            return self.dedup_index
+
+        from email_collector.utils.dedup import NearDuplicateIndex
+        index = NearDuplicateIndex.load(Config.DEDUP_INDEX_PATH, Config.DEDUP_SIMILARITY_THRESHOLD)
+        if not len(index):
+            # Stored threads have no body text here; their signatures are replaced
+            # with full ones the next time the thread is collected
+            for row in await self.db_client.get_dedup_index_rows():
+                shingles = index.build_shingles(row.get("participants") or [], row.get("subject") or "")
+                index.add(row["id"], row["gmail_thread_id"], index.compute_signature(shingles))
+            logger.info(f"Bootstrapped near-duplicate index with {len(index)} threads from the database")
+
+        self.dedup_index = index
+        return index
+
+    def _find_near_duplicate(self, email_thread: EmailThread, messages: List[EmailMessage]) -> Tuple[Optional["np.ndarray"], Optional[str]]:
+        """Return the thread's MinHash signature and the row id of a near-duplicate, if any"""
+        if self.dedup_index is None:
+            return None, None
+
+        # Other shards / processes sharing the index file may have saved new rows
+        self.dedup_index.refresh(Config.DEDUP_INDEX_PATH)
+        signature = self.dedup_index.signature_for_thread(email_thread, messages)
+        match = self.dedup_index.find_duplicate(signature)
+        if not match:
+            return signature, None
+
+        duplicate_of, similarity = match
+        logger.info(f"Thread {email_thread.gmail_thread_id} is a near-duplicate of {duplicate_of} (similarity {similarity:.2f})")
+        return signature, duplicate_of
+
+    async def _sync_directory(self, thread_id: str, email_thread: EmailThread, messages: List[EmailMessage]) -> None:
+        """Link a saved thread to its sponsor organization and upsert its contacts"""
+        sync = SponsorDirectory.build_thread_sync(email_thread, messages)
+        if sync:
+            await self.db_client.sync_thread_organization(thread_id, sync)
+
+    @metrics.timed("stage.collect")
+    async def collect_new_emails(self, dry_run: bool = False,
+                                 on_thread_saved: Optional[ThreadHandoff] = None,
+                                 since: Optional[datetime] = None) -> ProcessingResult:
         """
         Collect new sponsorship emails from Gmail
 
         Args:
             dry_run: If True, don't save to database
+            on_thread_saved: Optional coroutine called with (thread, messages) as soon
+                as each thread is stored, used by the pipelined full run (see
+                ThreadHandoff for merged threads)
+            since: Only fetch threads with matching messages received after this
+                instant (incremental daemon syncs); None searches the full range
 
         Returns:
             ProcessingResult with collection statistics
@@ -63,110 +196,49 @@ class EmailCollector:
 
             # Get existing thread IDs to avoid duplicates
             existing_thread_ids: Set[str] = set(await self.db_client.get_existing_thread_ids())
+            self.thread_aliases = await self.db_client.get_thread_aliases()
             logger.info(f"Found {len(existing_thread_ids)} existing threads in database")
 
-            # Search for new and existing sponsorship threads
-            new_thread_infos, existing_thread_infos = self.email_searcher.search_and_organize_threads(existing_thread_ids)
-
-            if not new_thread_infos and not existing_thread_infos:
-                logger.info("No new or updated sponsorship threads found")
-                result.success = True
-                return result
-
-            logger.info(f"Found {len(new_thread_infos)} new threads and {len(existing_thread_infos)} existing threads to process")
-
-            # Process new threads
-            for thread_info in new_thread_infos:
+            dedup_index = await self._load_dedup_index()
+
+            # Search for new and existing sponsorship threads; details are fetched lazily
+            # so each thread is stored before the next one is requested. With several
+            # mailboxes, one worker per account fetches concurrently and this loop
+            # remains the only database writer.
+            mailbox_pool = await self._get_mailbox_pool()
+            if mailbox_pool:
+                logger.info(f"Collecting {len(mailbox_pool.accounts)} mailboxes with one Gmail worker each")
+                thread_source = mailbox_pool.iter_thread_infos(existing_thread_ids, since=since, errors=result.errors,
+                                                               shard=self.shard)
+            else:
+                searcher = self.email_searcher
+                thread_source = (
+                    (thread_info, is_new, searcher)
+                    for thread_info, is_new in searcher.iter_thread_infos(existing_thread_ids, since=since, shard=self.shard)
+                )
+
+            threads_found = 0
+            threads_by_account: Counter = Counter()
+            for thread_info, is_new, searcher in thread_source:
+                threads_found += 1
+                threads_by_account[searcher.account_email] += 1
                 try:
-                    # Convert to EmailThread model
-                    email_thread = self.email_searcher.convert_to_email_thread(thread_info)
-                    if not email_thread:
-                        logger.warning(f"Failed to convert thread {thread_info.thread_id}")
-                        continue
-
-                    # Parse messages
-                    messages = self.email_searcher.parse_thread_messages(thread_info)
-                    if not messages:
-                        logger.warning(f"No valid messages in thread {thread_info.thread_id}")
-                        continue
-
-                    # Determine which messages are from user vs external
-                    # This is a simple heuristic - you may need to adjust based on your email
-                    user_email_domains = set()  # You can configure this
-                    for message in messages:
-                        # Simple check - if sender domain matches recipient domain pattern
-                        # This needs to be customized for your specific setup
-                        message.is_from_user = False  # Default to external
-
-                    if not dry_run:
-                        # Save thread to database
-                        thread_id = await self.db_client.save_thread(email_thread)
-                        if thread_id:
-                            result.new_threads += 1
-
-                            # Save messages
-                            for message in messages:
-                                message.thread_id = thread_id
-                                message_id = await self.db_client.save_message(message)
-                                if message_id:
-                                    result.messages_processed += 1
-
-                        logger.info(f"Saved thread {email_thread.gmail_thread_id} with {len(messages)} messages")
-                    else:
-                        logger.info(f"[DRY RUN] Would save thread {email_thread.gmail_thread_id} with {len(messages)} messages")
-                        result.new_threads += 1
-                        result.messages_processed += len(messages)
-
-                    result.threads_processed += 1
-
+                    with deadline(Config.COLLECT_THREAD_DEADLINE_SECONDS):
+                        await self._collect_thread(thread_info, is_new, result, dry_run, on_thread_saved, searcher)
                 except Exception as e:
-                    logger.error(f"Error processing new thread {thread_info.thread_id}: {e}")
-                    result.errors.append(f"New thread {thread_info.thread_id}: {str(e)}")
+                    kind = "New" if is_new else "Existing"
+                    logger.error(f"Error processing {kind.lower()} thread {thread_info.thread_id}: {e}")
+                    result.errors.append(f"{kind} thread {thread_info.thread_id}: {str(e)}")
 
-            # Process existing threads (potential updates)
-            for thread_info in existing_thread_infos:
-                try:
-                    # Convert to EmailThread model
-                    email_thread = self.email_searcher.convert_to_email_thread(thread_info)
-                    if not email_thread:
-                        logger.warning(f"Failed to convert existing thread {thread_info.thread_id}")
-                        continue
-
-                    # Parse messages
-                    messages = self.email_searcher.parse_thread_messages(thread_info)
-                    if not messages:
-                        logger.warning(f"No valid messages in existing thread {thread_info.thread_id}")
-                        continue
-
-                    # Determine which messages are from user vs external
-                    user_email_domains = set()  # You can configure this
-                    for message in messages:
-                        message.is_from_user = False  # Default to external
-
-                    if not dry_run:
-                        # Update existing thread in database (this will update with new message count, dates, etc.)
-                        thread_id = await self.db_client.save_thread(email_thread)
-                        if thread_id:
-                            result.updated_threads += 1
-
-                            # Check for new messages and save them
-                            for message in messages:
-                                message.thread_id = thread_id
-                                message_id = await self.db_client.save_message(message)
-                                if message_id:
-                                    result.messages_processed += 1
-
-                        logger.info(f"Updated existing thread {email_thread.gmail_thread_id} with {len(messages)} messages")
-                    else:
-                        logger.info(f"[DRY RUN] Would update existing thread {email_thread.gmail_thread_id} with {len(messages)} messages")
-                        result.updated_threads += 1
-                        result.messages_processed += len(messages)
+            if not threads_found:
+                logger.info("No new or updated sponsorship threads found")
+            elif mailbox_pool:
+                logger.info("Threads per mailbox: " + ", ".join(
+                    f"{account} {count}" for account, count in threads_by_account.most_common()
+                ))
 
-                    result.threads_processed += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing existing thread {thread_info.thread_id}: {e}")
-                    result.errors.append(f"Existing thread {thread_info.thread_id}: {str(e)}")
+            if dedup_index is not None and dedup_index.dirty and not dry_run:
+                dedup_index.sync(Config.DEDUP_INDEX_PATH)
 
             result.success = True
             logger.info(f"Collection complete: {result.new_threads} new threads, {result.updated_threads} updated threads, {result.messages_processed} messages")
@@ -177,13 +249,94 @@ class EmailCollector:
 
         return result
 
-    async def process_with_llm(self, dry_run: bool = False, limit: int = 100) -> ProcessingResult:
+    @metrics.timed("collect.thread")
+    async def _collect_thread(self, thread_info: ThreadInfo, is_new: bool, result: ProcessingResult,
+                              dry_run: bool, on_thread_saved: Optional[ThreadHandoff] = None,
+                              searcher: Optional["EmailSearcher"] = None) -> None:
+        """Convert, deduplicate and store one Gmail thread with its messages (fetched by `searcher`'s mailbox)"""
+        kind = "new" if is_new else "existing"
+        searcher = searcher or self.email_searcher
+
+        # Convert to EmailThread model
+        email_thread = searcher.convert_to_email_thread(thread_info)
+        if not email_thread:
+            logger.warning(f"Failed to convert {kind} thread {thread_info.thread_id}")
+            return
+
+        # Parse messages
+        messages = searcher.parse_thread_messages(thread_info)
+        if not messages:
+            logger.warning(f"No valid messages in {kind} thread {thread_info.thread_id}")
+            return
+
+        # Only threads without a row of their own can be merged into a near-duplicate;
+        # existing threads merged by an earlier run go back into the same row
+        if is_new:
+            signature, duplicate_of = self._find_near_duplicate(email_thread, messages)
+        else:
+            signature, duplicate_of = None, self.thread_aliases.get(email_thread.gmail_thread_id)
+
+        if not dry_run:
+            # Save thread to database (merged into its near-duplicate if one was found)
+            thread_id = await self.db_client.save_thread(email_thread, duplicate_of=duplicate_of)
+            if thread_id:
+                merged = bool(duplicate_of) and thread_id == duplicate_of
+                if is_new and not merged:
+                    result.new_threads += 1
+                else:
+                    result.updated_threads += 1
+
+                if merged:
+                    # The row keeps its own Gmail thread and signature
+                    self.thread_aliases[email_thread.gmail_thread_id] = thread_id
+                elif self.dedup_index is not None:
+                    # Existing threads replace bootstrap signatures with ones that include the body
+                    if signature is None:
+                        signature = self.dedup_index.signature_for_thread(email_thread, messages)
+                    self.dedup_index.add(thread_id, email_thread.gmail_thread_id, signature)
+                await self._sync_directory(thread_id, email_thread, messages)
+
+                # Save messages and the thread's last-message columns in one batch
+                for message in messages:
+                    message.thread_id = thread_id
+                if await self.db_client.save_thread_messages(thread_id, messages) is not None:
+                    result.messages_processed += len(messages)
+
+                if on_thread_saved:
+                    # A merged thread's messages are only part of the row's history
+                    await on_thread_saved(email_thread, None if merged else messages)
+
+            if is_new:
+                logger.info(f"Saved thread {email_thread.gmail_thread_id} with {len(messages)} messages")
+            else:
+                logger.info(f"Updated existing thread {email_thread.gmail_thread_id} with {len(messages)} messages")
+        else:
+            if duplicate_of:
+                logger.info(f"[DRY RUN] Would merge thread {email_thread.gmail_thread_id} into {duplicate_of} with {len(messages)} messages")
+                result.updated_threads += 1
+            elif is_new:
+                logger.info(f"[DRY RUN] Would save thread {email_thread.gmail_thread_id} with {len(messages)} messages")
+                result.new_threads += 1
+            else:
+                logger.info(f"[DRY RUN] Would update existing thread {email_thread.gmail_thread_id} with {len(messages)} messages")
+                result.updated_threads += 1
+            result.messages_processed += len(messages)
+
+            if on_thread_saved and not duplicate_of:
+                await on_thread_saved(email_thread, messages)
+
+        result.threads_processed += 1
+
+    @metrics.timed("stage.llm")
+    async def process_with_llm(self, dry_run: bool = False, limit: int = 100,
+                               skip_thread_ids: Optional[Set[str]] = None) -> ProcessingResult:
         """
         Process unprocessed threads with Gemini AI
 
         Args:
             dry_run: If True, don't save results to database
             limit: Maximum number of threads to process
+            skip_thread_ids: Row ids of threads already handled earlier in this run
 
         Returns:
             ProcessingResult with processing statistics
@@ -197,9 +350,17 @@ class EmailCollector:
             updated_threads=0
         )
 
+        llm_calls_before = self.gemini_processor.call_count
+
+        # Dry runs only read; real runs claim threads through the leased work queue
+        work_queue = None if dry_run else ThreadWorkQueue(self.db_client, shard=self.shard)
+
         try:
             # Get unprocessed threads
-            unprocessed_threads = await self.db_client.get_threads_for_processing(limit)
+            if work_queue:
+                unprocessed_threads = await work_queue.claim(limit)
+            else:
+                unprocessed_threads = await self.db_client.get_threads_for_processing(limit, self.shard)
 
             if not unprocessed_threads:
                 logger.info("No threads need LLM processing")
@@ -207,86 +368,191 @@ class EmailCollector:
                 return result
 
             logger.info(f"Processing {len(unprocessed_threads)} threads with LLM")
+            if self.triage:
+                logger.info(f"Local triage enabled ({self.triage.describe_thresholds()})")
 
             for thread in unprocessed_threads:
                 try:
+                    if skip_thread_ids and str(thread.id) in skip_thread_ids:
+                        if work_queue:
+                            await work_queue.release(thread.id)
+                        continue
+
+                    if work_queue:
+                        await work_queue.heartbeat()
+
                     # Get thread messages
                     messages = await self.db_client.get_thread_messages(thread.id)
                     if not messages:
                         logger.warning(f"No messages found for thread {thread.id}")
+                        if work_queue:
+                            await self.db_client.record_llm_failure(thread, "No messages found for thread")
+                            work_queue.complete(thread.id)
                         continue
 
-                    # Extract sponsor information with Gemini
-                    sponsor_info = self.gemini_processor.extract_sponsor_info(thread, messages)
-
-                    if sponsor_info:
-                        # Calculate additional metrics
-                        priority_level, priority_reasoning = PriorityCalculator.calculate_overall_priority(thread, messages)
-
-                        # Generate action summary
-                        action_summary = self.gemini_processor.generate_action_summary(thread, messages)
-
-                        # Prepare update data
-                        llm_data = {
-                            "sponsor_poc_name": sponsor_info.poc_name,
-                            "sponsor_org_name": sponsor_info.org_name,
-                            "estimated_value_amount": sponsor_info.estimated_value_amount,
-                            "value_type": sponsor_info.value_type,
-                            "value_description": sponsor_info.value_description,
-                            "sponsor_confidence_score": sponsor_info.confidence_score,
-                            "priority_level": priority_level,
-                            "auto_priority_reasoning": priority_reasoning,
-                            "last_action_summary": action_summary,
-                            "next_action_status": sponsor_info.next_action_status,
-                            "next_action_description": sponsor_info.next_action_description,
-                        }
-
-                        if not dry_run:
-                            # Update thread in database
-                            success = await self.db_client.update_thread_llm_data(thread.id, llm_data)
-                            if success:
-                                result.updated_threads += 1
-                                logger.info(f"Updated thread {thread.gmail_thread_id} with LLM data")
-                            else:
-                                logger.error(f"Failed to update thread {thread.gmail_thread_id}")
-                        else:
-                            logger.info(f"[DRY RUN] Would update thread {thread.gmail_thread_id} with LLM data")
-                            result.updated_threads += 1
-                    else:
-                        logger.warning(f"Failed to extract sponsor info for thread {thread.gmail_thread_id}")
+                    with deadline(Config.LLM_THREAD_DEADLINE_SECONDS):
+                        completed = await self._process_thread_with_llm(thread, messages, result, dry_run)
 
-                    result.threads_processed += 1
+                    if work_queue:
+                        if completed:
+                            work_queue.complete(thread.id)
+                        else:
+                            await work_queue.release(thread.id)
 
                 except Exception as e:
                     logger.error(f"Error processing thread {thread.id} with LLM: {e}")
                     result.errors.append(f"Thread {thread.id}: {str(e)}")
+                    if work_queue:
+                        await work_queue.release(thread.id)
 
             result.success = True
-            logger.info(f"LLM processing complete: {result.updated_threads} threads updated")
+            result.llm_calls = self.gemini_processor.call_count - llm_calls_before
+            logger.info(f"LLM processing complete: {result.updated_threads} threads updated, {result.triaged_threads} triaged without LLM")
+            if result.updated_threads:
+                logger.info(f"Gemini calls per extracted thread: {result.llm_calls / result.updated_threads:.2f} ({result.failed_threads} failures recorded)")
+            usage = self.gemini_processor.get_usage_report()
+            logger.info(
+                f"LLM token usage: {usage['prompt_tokens']} input ({usage['cached_tokens']} served from cache, "
+                f"{usage['instruction_tokens']} in shared instruction prefix), {usage['output_tokens']} output"
+            )
 
         except Exception as e:
             logger.error(f"Error in LLM processing: {e}")
             result.errors.append(f"LLM processing error: {str(e)}")
 
+        finally:
+            if work_queue:
+                await work_queue.release_all()
+
         return result
 
-    async def run_full_pipeline(self, dry_run: bool = False) -> ProcessingResult:
+    @metrics.timed("llm.thread")
+    async def _process_thread_with_llm(self, thread: EmailThread, messages: List[EmailMessage],
+                                       result: ProcessingResult, dry_run: bool) -> bool:
+        """
+        Triage, extract and store LLM data for a single thread
+
+        Returns:
+            True if the thread reached a final state in the database (processed or
+            failure recorded), False if it should go back to the work queue
+        """
+        completed = dry_run
+
+        # Cheap local triage - obvious non-sponsorship threads skip Gemini
+        triage_result = self.triage.evaluate(thread, messages) if self.triage else None
+        if triage_result and not triage_result.send_to_llm:
+            llm_data = self.triage.build_local_llm_data(thread, messages, triage_result)
+            llm_data["last_action_summary"] = self.gemini_processor.generate_action_summary(thread, messages)
+
+            if not dry_run:
+                completed = await self.db_client.update_thread_llm_data(thread.id, llm_data)
+                if completed:
+                    result.triaged_threads += 1
+                    # Keyword org hints are too weak to rename the organization
+                    await self.db_client.update_organization_value(thread.id, None, None)
+                    logger.info(f"Triaged thread {thread.gmail_thread_id} locally: {triage_result.reasoning}")
+                else:
+                    logger.error(f"Failed to update triaged thread {thread.gmail_thread_id}")
+            else:
+                logger.info(f"[DRY RUN] Would triage thread {thread.gmail_thread_id} locally: {triage_result.reasoning}")
+                result.triaged_threads += 1
+
+            result.threads_processed += 1
+            return completed
+
+        # Extract sponsor information with Gemini
+        sponsor_info = self.gemini_processor.extract_sponsor_info(thread, messages)
+
+        if sponsor_info:
+            # Calculate additional metrics
+            priority_level, priority_reasoning = PriorityCalculator.calculate_overall_priority(thread, messages)
+
+            # Generate action summary
+            action_summary = self.gemini_processor.generate_action_summary(thread, messages)
+
+            # Normalize the free-text value into numeric cents + currency
+            value_estimate = ValueNormalizer.parse(sponsor_info.estimated_value_amount)
+
+            # Prepare update data
+            llm_data = {
+                "sponsor_poc_name": sponsor_info.poc_name,
+                "sponsor_org_name": sponsor_info.org_name,
+                "estimated_value_amount": sponsor_info.estimated_value_amount,
+                "estimated_value_min_cents": value_estimate.min_cents,
+                "estimated_value_max_cents": value_estimate.max_cents,
+                "estimated_value_currency": value_estimate.currency,
+                "value_type": sponsor_info.value_type,
+                "value_description": sponsor_info.value_description,
+                "sponsor_confidence_score": sponsor_info.confidence_score,
+                "priority_level": priority_level,
+                "auto_priority_reasoning": priority_reasoning,
+                "last_action_summary": action_summary,
+                "next_action_status": sponsor_info.next_action_status,
+                "next_action_description": sponsor_info.next_action_description,
+            }
+            # Cache time-independent priority inputs for the periodic refresh job
+            llm_data.update(PriorityCalculator.calculate_priority_signals(messages))
+            if triage_result:
+                llm_data["triage_score"] = triage_result.keyword_score
+                llm_data["triage_reasoning"] = triage_result.reasoning
+
+            if not dry_run:
+                # Update thread in database
+                completed = await self.db_client.update_thread_llm_data(thread.id, llm_data)
+                if completed:
+                    result.updated_threads += 1
+                    await self.db_client.update_organization_value(
+                        thread.id, sponsor_info.org_name, SponsorDirectory.organization_value(value_estimate)
+                    )
+                    logger.info(f"Updated thread {thread.gmail_thread_id} with LLM data")
+                else:
+                    logger.error(f"Failed to update thread {thread.gmail_thread_id}")
+            else:
+                logger.info(f"[DRY RUN] Would update thread {thread.gmail_thread_id} with LLM data")
+                result.updated_threads += 1
+        elif self.gemini_processor.last_error_transient:
+            # Gemini outage or overload: back to the queue; only LLM_MAX_TRANSIENT_FAILURES
+            # in a row use up one of LLM_MAX_FAILURES
+            logger.warning(f"Transient LLM failure for thread {thread.gmail_thread_id}, will retry: {self.gemini_processor.last_error}")
+            result.errors.append(f"Thread {thread.gmail_thread_id}: {self.gemini_processor.last_error}")
+            if not dry_run:
+                completed = await self.db_client.record_transient_llm_failure(thread, self.gemini_processor.last_error or "Transient LLM failure")
+        else:
+            logger.warning(f"Failed to extract sponsor info for thread {thread.gmail_thread_id}")
+            result.failed_threads += 1
+            if not dry_run:
+                completed = await self.db_client.record_llm_failure(thread, self.gemini_processor.last_error or "Unknown extraction failure")
+
+        result.threads_processed += 1
+        return completed
+
+    @metrics.timed("stage.pipeline")
+    async def run_full_pipeline(self, dry_run: bool = False, pipelined: Optional[bool] = None,
+                                since: Optional[datetime] = None) -> ProcessingResult:
         """
         Run the complete email collection and processing pipeline
 
         Args:
             dry_run: If True, don't save to database
+            pipelined: Overlap collection and LLM processing (defaults to Config.PIPELINED_FULL_RUN)
+            since: Incremental collection window start (see collect_new_emails)
 
         Returns:
             Combined ProcessingResult
         """
         logger.info("Starting full email processing pipeline...")
 
-        # Step 1: Collect new emails
-        collection_result = await self.collect_new_emails(dry_run)
+        if pipelined is None:
+            pipelined = Config.PIPELINED_FULL_RUN
+
+        if pipelined:
+            collection_result, processing_result = await self._run_overlapped(dry_run, since)
+        else:
+            # Step 1: Collect new emails
+            collection_result = await self.collect_new_emails(dry_run, since=since)
 
-        # Step 2: Process with LLM
-        processing_result = await self.process_with_llm(dry_run)
+            # Step 2: Process with LLM
+            processing_result = await self.process_with_llm(dry_run)
 
         # Combine results
         combined_result = ProcessingResult(
@@ -295,6 +561,9 @@ class EmailCollector:
             messages_processed=collection_result.messages_processed,
             new_threads=collection_result.new_threads,
             updated_threads=processing_result.updated_threads,
+            triaged_threads=processing_result.triaged_threads,
+            failed_threads=processing_result.failed_threads,
+            llm_calls=processing_result.llm_calls,
             errors=collection_result.errors + processing_result.errors
         )
 
@@ -305,6 +574,7 @@ class EmailCollector:
         logger.info(f"New threads collected: {combined_result.new_threads}")
         logger.info(f"Messages processed: {combined_result.messages_processed}")
         logger.info(f"Threads updated with LLM: {combined_result.updated_threads}")
+        logger.info(f"Threads triaged without LLM: {combined_result.triaged_threads}")
         logger.info(f"Total errors: {len(combined_result.errors)}")
 
         if combined_result.errors:
@@ -314,6 +584,295 @@ class EmailCollector:
 
         return combined_result
 
+    async def _run_overlapped(self, dry_run: bool, since: Optional[datetime] = None) -> Tuple[ProcessingResult, ProcessingResult]:
+        """
+        Collect and process concurrently
+
+        Every thread the collector stores is put on a bounded in-process queue together
+        with its parsed messages and picked up by LLM worker threads, so nothing is
+        re-read from Supabase. Both stages draw from one budget of
+        PIPELINE_CONCURRENCY slots: the collector holds one while it runs and each
+        worker holds one per thread. Unprocessed threads left from earlier runs, and
+        rows a near-duplicate was merged into (their full history is only in the
+        database), are handled afterwards by the regular work-queue pass.
+
+        Returns:
+            (collection_result, processing_result)
+        """
+        concurrency = max(Config.PIPELINE_CONCURRENCY, 2)
+        budget = threading.BoundedSemaphore(concurrency)
+        handoff: queue.Queue = queue.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        handed_off_ids: Set[str] = set()
+        # Rows a thread was merged into: left to the backlog pass, which reads their full history
+        reread_ids: Set[str] = set()
+
+        worker_results = [
+            ProcessingResult(success=True, threads_processed=0, messages_processed=0)
+            for _ in range(concurrency)
+        ]
+        workers = [
+            threading.Thread(
+                target=self._pipeline_llm_worker,
+                args=(handoff, budget, worker_result, dry_run, reread_ids),
+                name=f"llm-worker-{index}",
+                daemon=True
+            )
+            for index, worker_result in enumerate(worker_results)
+        ]
+
+        llm_calls_before = self.gemini_processor.call_count
+        started = time.perf_counter()
+        if self.triage:
+            logger.info(f"Local triage enabled ({self.triage.describe_thresholds()})")
+        logger.info(f"Pipelined run with {concurrency} shared slots ({len(workers)} LLM workers)")
+        for worker in workers:
+            worker.start()
+
+        async def hand_off(thread: EmailThread, messages: Optional[List[EmailMessage]]) -> None:
+            if thread.llm_failure_count >= Config.LLM_MAX_FAILURES:
+                return
+            if messages is None:
+                reread_ids.add(str(thread.id))
+                return
+            if thread.id is not None:
+                # The same row saved twice in one run (re-collected thread) goes once
+                if str(thread.id) in handed_off_ids:
+                    return
+                handed_off_ids.add(str(thread.id))
+            # Blocks when the LLM stage is PIPELINE_QUEUE_SIZE threads behind
+            handoff.put((thread, messages))
+
+        # The collector holds one slot of the shared budget for as long as it runs
+        budget.acquire()
+        try:
+            collection_result = await self.collect_new_emails(dry_run, on_thread_saved=hand_off, since=since)
+        finally:
+            budget.release()
+            collection_seconds = time.perf_counter() - started
+            for _ in workers:
+                handoff.put(None)
+
+        for worker in workers:
+            worker.join()
+        logger.info(
+            f"Pipelined stages: collection {collection_seconds:.1f}s, "
+            f"LLM stage drained {time.perf_counter() - started - collection_seconds:.1f}s later"
+        )
+
+        pipeline_result = ProcessingResult.merge(worker_results)
+        pipeline_result.llm_calls = self.gemini_processor.call_count - llm_calls_before
+
+        # Backlog from earlier runs (retries, threads not seen by this collection)
+        backlog_result = await self.process_with_llm(dry_run, skip_thread_ids=handed_off_ids - reread_ids)
+
+        return collection_result, ProcessingResult.merge([pipeline_result, backlog_result])
+
+    def _pipeline_llm_worker(self, handoff: queue.Queue, budget: threading.BoundedSemaphore,
+                             result: ProcessingResult, dry_run: bool, reread_ids: Set[str]) -> None:
+        """
+        LLM worker thread: process handed-off threads until the None sentinel arrives
+
+        Each thread is leased through the work queue before it is processed, so a
+        concurrent --process-only run or daemon never works on it at the same time;
+        threads leased elsewhere are skipped, and so are rows another thread has
+        since been merged into (`reread_ids`, left to the backlog pass).
+        """
+        work_queue = None if dry_run else ThreadWorkQueue(self.db_client, shard=self.shard)
+
+        async def run():
+            try:
+                while True:
+                    item = handoff.get()
+                    if item is None:
+                        return
+
+                    thread, messages = item
+                    if str(thread.id) in reread_ids:
+                        logger.info(f"Thread {thread.gmail_thread_id} gained a merged near-duplicate; leaving it to the backlog pass")
+                        continue
+                    with budget:
+                        try:
+                            if work_queue:
+                                claimed = await work_queue.claim_one(thread.id)
+                                if claimed is None:
+                                    logger.info(f"Thread {thread.gmail_thread_id} is leased elsewhere or already processed; skipping")
+                                    continue
+                                thread.llm_failure_count = claimed.llm_failure_count
+                                thread.llm_transient_failure_count = claimed.llm_transient_failure_count
+
+                            with deadline(Config.LLM_THREAD_DEADLINE_SECONDS):
+                                completed = await self._process_thread_with_llm(thread, messages, result, dry_run)
+
+                            if work_queue:
+                                if completed:
+                                    work_queue.complete(thread.id)
+                                else:
+                                    await work_queue.release(thread.id)
+                        except Exception as e:
+                            logger.error(f"Error processing thread {thread.gmail_thread_id} with LLM: {e}")
+                            result.errors.append(f"Thread {thread.gmail_thread_id}: {str(e)}")
+                            if work_queue:
+                                await work_queue.release(thread.id)
+            finally:
+                if work_queue:
+                    await work_queue.release_all()
+
+        asyncio.run(run())
+
+    @metrics.timed("stage.refresh_priorities")
+    async def refresh_priorities(self, dry_run: bool = False) -> ProcessingResult:
+        """
+        Recompute time-sensitive priority levels for all open threads without LLM calls
+
+        Args:
+            dry_run: If True, don't write changed levels to the database
+
+        Returns:
+            ProcessingResult where updated_threads is the number of levels changed
+        """
+        logger.info("Starting bulk priority refresh...")
+
+        result = ProcessingResult(
+            success=False,
+            threads_processed=0,
+            messages_processed=0
+        )
+
+        try:
+            from email_collector.utils.priority_refresh import PriorityRefresher
+
+            rows = await self.db_client.get_priority_refresh_rows()
+            updates = PriorityRefresher.compute_updates(rows)
+            result.threads_processed = len(rows)
+
+            if updates and not dry_run:
+                result.updated_threads = await self.db_client.bulk_update_thread_priorities(updates)
+            else:
+                if updates:
+                    logger.info(f"[DRY RUN] Would update priority on {len(updates)} threads")
+                result.updated_threads = len(updates)
+
+            result.success = True
+            logger.info(f"Priority refresh complete: {result.updated_threads} of {result.threads_processed} threads changed")
+
+        except Exception as e:
+            logger.error(f"Error refreshing priorities: {e}")
+            result.errors.append(f"Priority refresh error: {str(e)}")
+
+        return result
+
+    @metrics.timed("stage.backfill_values")
+    async def backfill_values(self, dry_run: bool = False) -> ProcessingResult:
+        """
+        Parse estimated_value_amount into the numeric value columns for rows stored
+        before value normalization existed
+
+        Args:
+            dry_run: If True, don't write parsed values to the database
+
+        Returns:
+            ProcessingResult where updated_threads is the number of rows written
+        """
+        logger.info("Starting estimated value backfill...")
+
+        result = ProcessingResult(
+            success=False,
+            threads_processed=0,
+            messages_processed=0
+        )
+
+        try:
+            rows = await self.db_client.get_value_backfill_rows()
+            updates = [
+                {"id": row["id"], **ValueNormalizer.to_columns(row["estimated_value_amount"])}
+                for row in rows
+            ]
+            result.threads_processed = len(rows)
+
+            if updates and not dry_run:
+                result.updated_threads = await self.db_client.bulk_update_thread_values(updates)
+            else:
+                if updates:
+                    parsed = sum(1 for update in updates if update["estimated_value_currency"])
+                    logger.info(f"[DRY RUN] Would write values for {len(updates)} threads ({parsed} parseable)")
+                result.updated_threads = len(updates)
+
+            result.success = True
+            logger.info(f"Value backfill complete: {result.updated_threads} of {result.threads_processed} threads written")
+
+        except Exception as e:
+            logger.error(f"Error backfilling values: {e}")
+            result.errors.append(f"Value backfill error: {str(e)}")
+
+        return result
+
+    def write_run_report(self, result: ProcessingResult, mode: str, started_at: Optional[float] = None) -> None:
+        """
+        Write per-stage metrics for the run as JSON and, if configured, a Prometheus textfile
+
+        Args:
+            started_at: time.time() when the run (or daemon cycle) began; defaults
+                to process start
+        """
+        if started_at is None:
+            started_at = metrics.started_at.timestamp()
+        if self._gemini_processor is not None:
+            self._gemini_processor.publish_usage_metrics()
+
+        run = {
+            "mode": mode,
+            "shard": str(self.shard) if self.shard else None,
+            "success": result.success,
+            "duration_seconds": round(time.time() - started_at, 3),
+            "threads_processed": result.threads_processed,
+            "messages_processed": result.messages_processed,
+            "new_threads": result.new_threads,
+            "updated_threads": result.updated_threads,
+            "triaged_threads": result.triaged_threads,
+            "failed_threads": result.failed_threads,
+            "llm_calls": result.llm_calls,
+            "error_count": len(result.errors),
+            "error_messages": result.errors[:50],
+            "finished_timestamp": time.time(),
+        }
+
+        try:
+            if Config.METRICS_JSON_PATH:
+                metrics.write_json(Config.METRICS_JSON_PATH, run)
+                logger.info(f"Wrote run metrics to {Config.METRICS_JSON_PATH}")
+            if Config.METRICS_PROMETHEUS_PATH:
+                metrics.write_prometheus(Config.METRICS_PROMETHEUS_PATH, run)
+        except OSError as e:
+            logger.error(f"Error writing run metrics: {e}")
+
+def _run_mode(args: argparse.Namespace) -> str:
+    return next((name for name in ("collect_only", "process_only", "refresh_priorities", "backfill_values")
+                 if getattr(args, name)), "full_pipeline")
+
+async def run_collector(args: argparse.Namespace, shard: Optional[Shard] = None) -> ProcessingResult:
+    """Run the mode selected on the command line, as one shard of N when `shard` is given"""
+    if shard:
+        configure_shard(shard)
+    collector = EmailCollector(shard=shard)
+    started_at = time.time()
+
+    if args.collect_only:
+        result = await collector.collect_new_emails(args.dry_run)
+    elif args.process_only:
+        result = await collector.process_with_llm(args.dry_run)
+    elif args.refresh_priorities:
+        result = await collector.refresh_priorities(args.dry_run)
+    elif args.backfill_values:
+        result = await collector.backfill_values(args.dry_run)
+    elif args.daemon:
+        result = await CollectorDaemon(collector, dry_run=args.dry_run).run()
+    else:
+        result = await collector.run_full_pipeline(args.dry_run, pipelined=False if args.sequential else None)
+
+    if not args.daemon:
+        collector.write_run_report(result, _run_mode(args), started_at)
+    return result
+
 async def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='Email Collector for Sponsorship CRM')
@@ -321,20 +880,59 @@ async def main():
                        help='Only collect emails, skip LLM processing')
     parser.add_argument('--process-only', action='store_true',
                        help='Only run LLM processing on existing threads')
+    parser.add_argument('--refresh-priorities', action='store_true',
+                       help='Recompute time-based priority for open threads (no Gmail or LLM calls)')
+    parser.add_argument('--backfill-values', action='store_true',
+                       help='Parse stored estimated_value_amount text into numeric value columns')
+    parser.add_argument('--sequential', action='store_true',
+                       help='Run collection and LLM processing one after the other instead of pipelined')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Keep running and sync incrementally every DAEMON_INTERVAL_SECONDS until SIGTERM')
     parser.add_argument('--dry-run', action='store_true',
                        help='Run without saving to database')
+    parser.add_argument('--profile', nargs='?', const=Config.PROFILE_OUTPUT_DIR, metavar='DIR',
+                       help='Write per-stage pstats, collapsed stacks and a hot-function summary '
+                            f'(default directory {Config.PROFILE_OUTPUT_DIR})')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='With --profile, also record a tracemalloc allocation snapshot')
+    shard_group = parser.add_mutually_exclusive_group()
+    shard_group.add_argument('--shard', metavar='I/N',
+                             help='Only collect and process hash partition I of N (0-based), e.g. on one of N machines')
+    shard_group.add_argument('--shards', type=int, metavar='N',
+                             help='Coordinator: run N local shard worker processes and merge their results')
 
     args = parser.parse_args()
 
-    collector = EmailCollector()
+    shard = None
+    if args.shard:
+        try:
+            shard = Shard.parse(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.shards is not None and args.shards < 1:
+        parser.error("--shards needs at least 1 worker")
+    if (args.shard or args.shards) and (args.refresh_priorities or args.backfill_values):
+        parser.error("Only collection and LLM processing are sharded")
+    if args.shards and (args.profile or args.profile_memory):
+        parser.error("--profile covers a single process; profile one worker with --shard I/N instead")
+
+    profiler = None
+    if args.profile or args.profile_memory:
+        from email_collector.utils.profiling import StageProfiler
+
+        profiler = StageProfiler(args.profile or Config.PROFILE_OUTPUT_DIR, trace_memory=args.profile_memory)
+        profiler.start()
+        metrics.profiler = profiler
 
     try:
-        if args.collect_only:
-            result = await collector.collect_new_emails(args.dry_run)
-        elif args.process_only:
-            result = await collector.process_with_llm(args.dry_run)
+        if args.shards:
+            from email_collector.coordinator import ShardCoordinator
+
+            started_at = time.time()
+            result = ShardCoordinator(args.shards).run(args)
+            EmailCollector().write_run_report(result, f"{_run_mode(args)}_coordinator", started_at)
         else:
-            result = await collector.run_full_pipeline(args.dry_run)
+            result = await run_collector(args, shard)
 
         # Exit with appropriate code
         exit_code = 0 if result.success else 1
@@ -347,6 +945,10 @@ async def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         return 1
+    finally:
+        if profiler:
+            metrics.profiler = None
+            logger.info(f"Profile summary: {profiler.stop()}")
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
@@ -0,0 +1,112 @@
+-- Full-text search over collected email
+-- Run this after add_last_message_columns.sql
+--
+-- The collector writes search_text (body without quoted history or signature, see
+-- GmailClient.build_search_text); search_vector is generated from it and the subject.
+-- Query through search_threads() / SupabaseClient.search_threads().
+
+ALTER TABLE email_messages ADD COLUMN IF NOT EXISTS search_text TEXT;
+ALTER TABLE email_messages ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(subject, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(search_text, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_email_messages_search_vector ON email_messages USING GIN (search_vector);
+
+-- Backfill messages stored before this migration (approximates build_search_text in SQL;
+-- CRLF bodies are normalized first so the signature marker matches)
+UPDATE email_messages
+SET search_text = LEFT(
+    regexp_replace(
+        regexp_replace(replace(body_text, E'\r\n', E'\n'), E'\\n([ \\t]*>|On [^\\n]{0,200}wrote:|-- ?\\n).*$', ''),
+        E'\\s+', ' ', 'g'
+    ),
+    20000
+)
+WHERE search_text IS NULL;
+
+-- Same as in add_last_message_columns.sql, now also storing search_text
+CREATE OR REPLACE FUNCTION save_thread_messages(p_thread_id UUID, p_messages JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    INSERT INTO email_messages (
+        thread_id, gmail_message_id, sender_email, sender_name, recipients,
+        subject, body_text, snippet, search_text, received_date, is_from_user
+    )
+    SELECT p_thread_id, m.gmail_message_id, m.sender_email, m.sender_name, COALESCE(m.recipients, '{}'),
+           m.subject, m.body_text, m.snippet, m.search_text, m.received_date, COALESCE(m.is_from_user, FALSE)
+    FROM jsonb_to_recordset(p_messages) AS m(
+        gmail_message_id TEXT, sender_email TEXT, sender_name TEXT, recipients TEXT[],
+        subject TEXT, body_text TEXT, snippet TEXT, search_text TEXT,
+        received_date TIMESTAMP WITH TIME ZONE, is_from_user BOOLEAN
+    )
+    ON CONFLICT (gmail_message_id) DO NOTHING;
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    PERFORM refresh_thread_last_message(p_thread_id);
+    RETURN inserted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Ranked thread search. p_query uses web-search syntax ("quoted phrases", OR, -exclude).
+-- Threads are ranked by their best-matching message; the headline comes from that message.
+CREATE OR REPLACE FUNCTION search_threads(
+    p_query TEXT,
+    p_status TEXT DEFAULT NULL,
+    p_priority_level TEXT DEFAULT NULL,
+    p_sponsor_only BOOLEAN DEFAULT FALSE,
+    p_since TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    thread_id UUID,
+    gmail_thread_id TEXT,
+    subject TEXT,
+    sponsor_org_name TEXT,
+    priority_level TEXT,
+    status TEXT,
+    last_message_date TIMESTAMP WITH TIME ZONE,
+    gmail_thread_url TEXT,
+    rank REAL,
+    matched_messages BIGINT,
+    headline TEXT
+) AS $$
+    WITH q AS (
+        SELECT websearch_to_tsquery('english', p_query) AS query
+    ),
+    hits AS (
+        SELECT DISTINCT ON (m.thread_id)
+            m.thread_id,
+            m.id AS message_id,
+            ts_rank_cd(m.search_vector, q.query) AS rank,
+            COUNT(*) OVER (PARTITION BY m.thread_id) AS matched_messages
+        FROM email_messages AS m, q
+        WHERE m.search_vector @@ q.query
+          AND (p_since IS NULL OR m.received_date >= p_since)
+        ORDER BY m.thread_id, ts_rank_cd(m.search_vector, q.query) DESC
+    ),
+    page AS (
+        SELECT h.*, t.gmail_thread_id, t.subject, t.sponsor_org_name, t.priority_level,
+               t.status, t.last_message_date, t.gmail_thread_url
+        FROM hits AS h
+        JOIN email_threads AS t ON t.id = h.thread_id
+        WHERE (p_status IS NULL OR t.status = p_status)
+          AND (p_priority_level IS NULL OR t.priority_level = p_priority_level)
+          AND (NOT p_sponsor_only OR t.sponsor_org_name IS NOT NULL)
+        ORDER BY h.rank DESC, t.last_message_date DESC
+        LIMIT p_limit OFFSET p_offset
+    )
+    -- Headlines are only built for the returned page
+    SELECT p.thread_id, p.gmail_thread_id, p.subject, p.sponsor_org_name, p.priority_level,
+           p.status, p.last_message_date, p.gmail_thread_url, p.rank, p.matched_messages,
+           ts_headline('english', COALESCE(m.search_text, m.snippet), q.query,
+                       'MaxFragments=2, MaxWords=20, MinWords=5')
+    FROM page AS p
+    JOIN email_messages AS m ON m.id = p.message_id
+    CROSS JOIN q
+    ORDER BY p.rank DESC, p.last_message_date DESC;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,90 @@
+-- Denormalized last-message columns on email_threads
+-- Run this after your main database setup
+--
+-- Written by save_thread_messages() in the same statement batch that stores a thread's
+-- messages, so thread listings never need a per-row lookup into email_messages.
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_sender_name TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_sender_email TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_subject TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_snippet TEXT;
+-- Also added by add_priority_refresh.sql; repeated so this migration stands alone
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_from_user BOOLEAN NOT NULL DEFAULT FALSE;
+-- Newest message received from someone other than the user
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_received_date TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_email_messages_thread_received ON email_messages(thread_id, received_date DESC);
+
+-- Recompute the denormalized columns for one thread from its stored messages
+CREATE OR REPLACE FUNCTION refresh_thread_last_message(p_thread_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE email_threads AS t
+    SET last_message_sender_name = m.sender_name,
+        last_message_sender_email = m.sender_email,
+        last_message_subject = m.subject,
+        last_message_snippet = m.snippet,
+        last_message_from_user = m.is_from_user,
+        last_received_date = (
+            SELECT MAX(received_date) FROM email_messages
+            WHERE thread_id = p_thread_id AND NOT is_from_user
+        )
+    FROM (
+        SELECT sender_name, sender_email, subject, snippet, is_from_user
+        FROM email_messages
+        WHERE thread_id = p_thread_id
+        ORDER BY received_date DESC
+        LIMIT 1
+    ) AS m
+    WHERE t.id = p_thread_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Insert a thread's messages (existing gmail_message_ids are skipped) and refresh its
+-- last-message columns in one transaction. Returns the number of new messages.
+CREATE OR REPLACE FUNCTION save_thread_messages(p_thread_id UUID, p_messages JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    INSERT INTO email_messages (
+        thread_id, gmail_message_id, sender_email, sender_name, recipients,
+        subject, body_text, snippet, received_date, is_from_user
+    )
+    SELECT p_thread_id, m.gmail_message_id, m.sender_email, m.sender_name, COALESCE(m.recipients, '{}'),
+           m.subject, m.body_text, m.snippet, m.received_date, COALESCE(m.is_from_user, FALSE)
+    FROM jsonb_to_recordset(p_messages) AS m(
+        gmail_message_id TEXT, sender_email TEXT, sender_name TEXT, recipients TEXT[],
+        subject TEXT, body_text TEXT, snippet TEXT, received_date TIMESTAMP WITH TIME ZONE, is_from_user BOOLEAN
+    )
+    ON CONFLICT (gmail_message_id) DO NOTHING;
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    PERFORM refresh_thread_last_message(p_thread_id);
+    RETURN inserted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-off backfill for threads collected before this migration
+UPDATE email_threads AS t
+SET last_message_sender_name = m.sender_name,
+    last_message_sender_email = m.sender_email,
+    last_message_subject = m.subject,
+    last_message_snippet = m.snippet,
+    last_message_from_user = m.is_from_user
+FROM (
+    SELECT DISTINCT ON (thread_id) thread_id, sender_name, sender_email, subject, snippet, is_from_user
+    FROM email_messages
+    ORDER BY thread_id, received_date DESC
+) AS m
+WHERE t.id = m.thread_id;
+
+UPDATE email_threads AS t
+SET last_received_date = r.last_received_date
+FROM (
+    SELECT thread_id, MAX(received_date) AS last_received_date
+    FROM email_messages
+    WHERE NOT is_from_user
+    GROUP BY thread_id
+) AS r
+WHERE t.id = r.thread_id;
@@ -0,0 +1,9 @@
+-- Track failed LLM extractions so broken threads are not retried forever
+-- Run this after your main database setup
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS llm_failure_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS llm_last_error TEXT;
+
+-- Matches the work-selection filter in get_threads_for_processing
+CREATE INDEX IF NOT EXISTS idx_email_threads_llm_pending
+    ON email_threads(llm_failure_count) WHERE llm_processed = FALSE;
@@ -0,0 +1,8 @@
+-- Bound retries of threads that keep failing transiently (outages, timeouts)
+-- Run this after add_llm_failure_tracking.sql
+--
+-- Transient LLM failures do not use up llm_failure_count directly; every
+-- LLM_MAX_TRANSIENT_FAILURES consecutive ones count as one failure, so a thread
+-- that always times out is eventually excluded instead of retried forever.
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS llm_transient_failure_count INTEGER NOT NULL DEFAULT 0;
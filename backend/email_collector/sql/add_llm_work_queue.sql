@@ -0,0 +1,57 @@
+-- Lease-based work queue for LLM processing
+-- Run this after add_llm_failure_tracking.sql
+--
+-- Workers claim unprocessed threads with a lease; a claim only succeeds for rows
+-- with no live lease, so overlapping runs never process the same thread twice.
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS lease_owner TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_email_threads_lease_expires_at
+    ON email_threads(lease_expires_at) WHERE llm_processed = FALSE;
+
+-- Atomically claim up to p_limit threads, most recently active first
+CREATE OR REPLACE FUNCTION claim_threads_for_processing(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 100,
+    p_lease_seconds INTEGER DEFAULT 600,
+    p_max_failures INTEGER DEFAULT 3
+)
+RETURNS SETOF email_threads AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE email_threads
+    SET lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id IN (
+        SELECT id FROM email_threads
+        WHERE llm_processed = FALSE
+          AND llm_failure_count < p_max_failures
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+        ORDER BY last_message_date DESC
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Extend the leases a worker still holds (heartbeat)
+CREATE OR REPLACE FUNCTION renew_thread_leases(
+    p_worker_id TEXT,
+    p_thread_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 600
+)
+RETURNS INTEGER AS $$
+DECLARE
+    renewed INTEGER;
+BEGIN
+    UPDATE email_threads
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY(p_thread_ids)
+      AND lease_owner = p_worker_id
+      AND llm_processed = FALSE;
+    GET DIAGNOSTICS renewed = ROW_COUNT;
+    RETURN renewed;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,29 @@
+-- Multi-mailbox collection: Gmail accounts read by the collector and per-thread account tags
+-- Run this after your main database setup
+--
+-- Set GMAIL_ACCOUNTS_TABLE=gmail_accounts to collect every enabled account. The table holds
+-- OAuth refresh tokens, so RLS is enabled without any policies: only the service role key
+-- used by the collector can read it.
+
+CREATE TABLE IF NOT EXISTS gmail_accounts (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    refresh_token TEXT NOT NULL,
+    client_id TEXT,      -- OAuth client, defaults to GMAIL_CLIENT_ID / GMAIL_CLIENT_SECRET
+    client_secret TEXT,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE gmail_accounts ENABLE ROW LEVEL SECURITY;
+
+CREATE TRIGGER update_gmail_accounts_updated_at
+    BEFORE UPDATE ON gmail_accounts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Mailbox each thread was collected from
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS account_email TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_email_threads_account_email ON email_threads(account_email);
@@ -0,0 +1,28 @@
+-- Single-thread leases for the pipelined full run
+-- Run this after add_llm_work_queue.sql
+--
+-- Threads the collector hands straight to the LLM workers are claimed one at a
+-- time with the same lease as claim_threads_for_processing, so a concurrent
+-- --process-only run or daemon never processes them at the same time.
+
+-- Lease one thread if it still needs processing and nobody else holds it;
+-- returns no row when it is leased elsewhere, already processed or failed out
+CREATE OR REPLACE FUNCTION claim_thread_for_processing(
+    p_thread_id UUID,
+    p_worker_id TEXT,
+    p_lease_seconds INTEGER DEFAULT 600,
+    p_max_failures INTEGER DEFAULT 3
+)
+RETURNS SETOF email_threads AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE email_threads
+    SET lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = p_thread_id
+      AND llm_processed = FALSE
+      AND llm_failure_count < p_max_failures
+      AND (lease_expires_at IS NULL OR lease_expires_at < NOW() OR lease_owner = p_worker_id)
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,29 @@
+-- Cached priority inputs for the bulk priority refresh job
+-- Run this after your main database setup
+--
+-- Content and sender signals are computed once at LLM time; only the time-based
+-- component is recomputed by `python -m email_collector.main --refresh-priorities`.
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS content_priority_level TEXT
+    CHECK (content_priority_level IN ('READ_NOW', 'REPLY_NOW', 'NORMAL', 'LOW'));
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS content_priority_reasoning TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS sender_priority_level TEXT
+    CHECK (sender_priority_level IN ('READ_NOW', 'REPLY_NOW', 'NORMAL', 'LOW'));
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS sender_priority_reasoning TEXT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS last_message_from_user BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Apply many {id, priority_level, auto_priority_reasoning} updates in one statement
+CREATE OR REPLACE FUNCTION bulk_update_thread_priorities(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE email_threads AS t
+    SET priority_level = u.priority_level,
+        auto_priority_reasoning = u.auto_priority_reasoning
+    FROM jsonb_to_recordset(p_updates) AS u(id UUID, priority_level TEXT, auto_priority_reasoning TEXT)
+    WHERE t.id = u.id;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,43 @@
+-- Hash-sharded LLM processing (--shard i/N, see utils/sharding.py)
+-- Run this after add_llm_work_queue.sql
+--
+-- A thread belongs to shard md5(gmail_thread_id)[:8] mod N, the same hash the
+-- collector uses for Gmail thread IDs, so each shard claims only its own rows.
+-- Unsharded callers keep the old behaviour through the parameter defaults.
+
+CREATE OR REPLACE FUNCTION thread_shard(p_gmail_thread_id TEXT, p_shard_count INTEGER)
+RETURNS INTEGER AS $$
+    SELECT (('x' || substr(md5(p_gmail_thread_id), 1, 8))::bit(32)::bigint % p_shard_count)::integer;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Replaces the four-argument version; an overload would make PostgREST calls ambiguous
+DROP FUNCTION IF EXISTS claim_threads_for_processing(TEXT, INTEGER, INTEGER, INTEGER);
+
+-- Atomically claim up to p_limit threads of one shard, most recently active first
+CREATE OR REPLACE FUNCTION claim_threads_for_processing(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 100,
+    p_lease_seconds INTEGER DEFAULT 600,
+    p_max_failures INTEGER DEFAULT 3,
+    p_shard_index INTEGER DEFAULT 0,
+    p_shard_count INTEGER DEFAULT 1
+)
+RETURNS SETOF email_threads AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE email_threads
+    SET lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id IN (
+        SELECT id FROM email_threads
+        WHERE llm_processed = FALSE
+          AND llm_failure_count < p_max_failures
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+          AND (p_shard_count <= 1 OR thread_shard(gmail_thread_id, p_shard_count) = p_shard_index)
+        ORDER BY last_message_date DESC
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,149 @@
+-- Sponsor organization / contact directory maintained incrementally by the collector
+-- Run this after your main database setup
+--
+-- Organizations are keyed by normalized sender domain (ParticipantProcessor.normalize_domain).
+-- Threads are linked at ingest through sync_thread_organization(); names and values are
+-- applied after LLM extraction through update_organization_value(). Aggregates are kept
+-- up to date by those functions and the delete trigger, so listings never scan email_threads.
+
+CREATE TABLE IF NOT EXISTS sponsor_organizations (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    domain TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    thread_count INTEGER NOT NULL DEFAULT 0,
+    last_contact_at TIMESTAMP WITH TIME ZONE,
+    total_value NUMERIC NOT NULL DEFAULT 0,  -- In DEFAULT_VALUE_CURRENCY; other currencies are not added
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    organization_id UUID REFERENCES sponsor_organizations(id) ON DELETE SET NULL,
+    last_contact_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Thread -> organization link and the value this thread currently contributes
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS organization_id UUID
+    REFERENCES sponsor_organizations(id) ON DELETE SET NULL;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS organization_value NUMERIC;
+
+CREATE INDEX IF NOT EXISTS idx_sponsor_organizations_last_contact ON sponsor_organizations(last_contact_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sponsor_organizations_total_value ON sponsor_organizations(total_value DESC);
+CREATE INDEX IF NOT EXISTS idx_contacts_organization_id ON contacts(organization_id);
+CREATE INDEX IF NOT EXISTS idx_email_threads_organization_id ON email_threads(organization_id);
+
+DROP TRIGGER IF EXISTS update_sponsor_organizations_updated_at ON sponsor_organizations;
+CREATE TRIGGER update_sponsor_organizations_updated_at
+    BEFORE UPDATE ON sponsor_organizations
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_contacts_updated_at ON contacts;
+CREATE TRIGGER update_contacts_updated_at
+    BEFORE UPDATE ON contacts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Link a thread to the organization for p_domain (creating it if needed) and upsert
+-- p_contacts ([{email, name, last_contact_at}]). Returns the organization id.
+CREATE OR REPLACE FUNCTION sync_thread_organization(
+    p_thread_id UUID,
+    p_domain TEXT,
+    p_name TEXT,
+    p_last_contact TIMESTAMP WITH TIME ZONE,
+    p_contacts JSONB DEFAULT '[]'::JSONB
+)
+RETURNS UUID AS $$
+DECLARE
+    v_org_id UUID;
+    v_old_org_id UUID;
+    v_value NUMERIC;
+BEGIN
+    INSERT INTO sponsor_organizations (domain, name, last_contact_at)
+    VALUES (p_domain, p_name, p_last_contact)
+    ON CONFLICT (domain) DO UPDATE
+        SET last_contact_at = GREATEST(sponsor_organizations.last_contact_at, EXCLUDED.last_contact_at)
+    RETURNING id INTO v_org_id;
+
+    SELECT organization_id, organization_value INTO v_old_org_id, v_value
+    FROM email_threads WHERE id = p_thread_id FOR UPDATE;
+
+    IF v_old_org_id IS DISTINCT FROM v_org_id THEN
+        IF v_old_org_id IS NOT NULL THEN
+            UPDATE sponsor_organizations
+            SET thread_count = thread_count - 1,
+                total_value = total_value - COALESCE(v_value, 0)
+            WHERE id = v_old_org_id;
+        END IF;
+
+        UPDATE sponsor_organizations
+        SET thread_count = thread_count + 1,
+            total_value = total_value + COALESCE(v_value, 0)
+        WHERE id = v_org_id;
+
+        UPDATE email_threads SET organization_id = v_org_id WHERE id = p_thread_id;
+    END IF;
+
+    INSERT INTO contacts (email, name, organization_id, last_contact_at)
+    SELECT c.email, c.name, v_org_id, c.last_contact_at
+    FROM jsonb_to_recordset(p_contacts) AS c(email TEXT, name TEXT, last_contact_at TIMESTAMP WITH TIME ZONE)
+    ON CONFLICT (email) DO UPDATE
+        SET name = COALESCE(NULLIF(EXCLUDED.name, ''), contacts.name),
+            organization_id = EXCLUDED.organization_id,
+            last_contact_at = GREATEST(contacts.last_contact_at, EXCLUDED.last_contact_at);
+
+    RETURN v_org_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Replace the value a thread contributes to its organization's total and adopt the
+-- LLM-extracted organization name
+CREATE OR REPLACE FUNCTION update_organization_value(
+    p_thread_id UUID,
+    p_org_name TEXT,
+    p_value NUMERIC
+)
+RETURNS VOID AS $$
+DECLARE
+    v_org_id UUID;
+    v_old_value NUMERIC;
+BEGIN
+    SELECT organization_id, organization_value INTO v_org_id, v_old_value
+    FROM email_threads WHERE id = p_thread_id FOR UPDATE;
+
+    IF v_org_id IS NOT NULL THEN
+        UPDATE sponsor_organizations
+        SET total_value = total_value - COALESCE(v_old_value, 0) + COALESCE(p_value, 0),
+            name = COALESCE(NULLIF(p_org_name, ''), name)
+        WHERE id = v_org_id;
+    END IF;
+
+    UPDATE email_threads SET organization_value = p_value WHERE id = p_thread_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep aggregates correct when threads are deleted (e.g. from the dashboard)
+CREATE OR REPLACE FUNCTION release_thread_organization()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.organization_id IS NOT NULL THEN
+        UPDATE sponsor_organizations
+        SET thread_count = thread_count - 1,
+            total_value = total_value - COALESCE(OLD.organization_value, 0)
+        WHERE id = OLD.organization_id;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS release_thread_organization ON email_threads;
+CREATE TRIGGER release_thread_organization
+    BEFORE DELETE ON email_threads
+    FOR EACH ROW EXECUTE FUNCTION release_thread_organization();
+
+-- Disable RLS for new tables (matching existing setup)
+ALTER TABLE sponsor_organizations DISABLE ROW LEVEL SECURITY;
+ALTER TABLE contacts DISABLE ROW LEVEL SECURITY;
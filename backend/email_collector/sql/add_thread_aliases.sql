@@ -0,0 +1,18 @@
+-- Gmail threads merged into a near-duplicate thread row
+-- Run this after your main database setup
+--
+-- A thread merged by the near-duplicate index keeps no row of its own; its Gmail
+-- thread id is recorded here so later runs treat it as existing and update the
+-- surviving row instead of inserting an empty duplicate.
+
+CREATE TABLE IF NOT EXISTS email_thread_aliases (
+    gmail_thread_id TEXT PRIMARY KEY,
+    thread_id UUID NOT NULL REFERENCES email_threads(id) ON DELETE CASCADE,
+    account_email TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_thread_aliases_thread_id ON email_thread_aliases(thread_id);
+
+-- Read and written only by the collector (service role)
+ALTER TABLE email_thread_aliases ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,6 @@
+-- Add local triage audit columns to email_threads
+-- Run this after your main database setup
+
+-- Keyword score and decision reasoning from the pre-LLM relevance gate
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS triage_score REAL;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS triage_reasoning TEXT;
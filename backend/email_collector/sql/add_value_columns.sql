@@ -0,0 +1,77 @@
+-- Numeric sponsorship value columns parsed from estimated_value_amount
+-- Run this after your main database setup
+--
+-- Filled by ValueNormalizer (utils/values.py) at extraction time. Rows stored before
+-- this migration are backfilled with `python -m email_collector.main --backfill-values`.
+-- An open-ended value ('up to $5k', '$500+') leaves the missing bound NULL.
+
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS estimated_value_min_cents BIGINT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS estimated_value_max_cents BIGINT;
+ALTER TABLE email_threads ADD COLUMN IF NOT EXISTS estimated_value_currency CHAR(3);
+
+CREATE INDEX IF NOT EXISTS idx_email_threads_value_min
+    ON email_threads(estimated_value_currency, estimated_value_min_cents)
+    WHERE estimated_value_currency IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_email_threads_value_max
+    ON email_threads(estimated_value_currency, estimated_value_max_cents)
+    WHERE estimated_value_currency IS NOT NULL;
+
+-- Apply many {id, estimated_value_min_cents, estimated_value_max_cents, estimated_value_currency}
+-- updates in one statement
+CREATE OR REPLACE FUNCTION bulk_update_thread_values(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE email_threads AS t
+    SET estimated_value_min_cents = u.estimated_value_min_cents,
+        estimated_value_max_cents = u.estimated_value_max_cents,
+        estimated_value_currency = u.estimated_value_currency
+    FROM jsonb_to_recordset(p_updates) AS u(
+        id UUID, estimated_value_min_cents BIGINT, estimated_value_max_cents BIGINT, estimated_value_currency TEXT
+    )
+    WHERE t.id = u.id;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Value totals per currency for sponsor threads, plus counts by value type
+CREATE OR REPLACE FUNCTION sponsor_value_summary()
+RETURNS TABLE (
+    currency TEXT,
+    thread_count BIGINT,
+    total_min_cents BIGINT,
+    total_max_cents BIGINT,
+    monetary_count BIGINT,
+    in_kind_count BIGINT
+) AS $$
+    SELECT
+        t.estimated_value_currency::TEXT,
+        COUNT(*),
+        COALESCE(SUM(COALESCE(t.estimated_value_min_cents, 0)), 0)::BIGINT,
+        COALESCE(SUM(COALESCE(t.estimated_value_max_cents, t.estimated_value_min_cents, 0)), 0)::BIGINT,
+        COUNT(*) FILTER (WHERE t.value_type IN ('monetary', 'equipment')),
+        COUNT(*) FILTER (WHERE t.value_type IS NULL OR t.value_type NOT IN ('monetary', 'equipment'))
+    FROM email_threads AS t
+    WHERE t.sponsor_org_name IS NOT NULL
+      AND t.estimated_value_amount IS NOT NULL
+    GROUP BY t.estimated_value_currency;
+$$ LANGUAGE sql STABLE;
+
+-- Sponsor threads whose value range overlaps [p_min_cents, p_max_cents] in one currency
+CREATE OR REPLACE FUNCTION threads_in_value_range(
+    p_currency TEXT,
+    p_min_cents BIGINT DEFAULT NULL,
+    p_max_cents BIGINT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 100
+)
+RETURNS SETOF email_threads AS $$
+    SELECT *
+    FROM email_threads AS t
+    WHERE t.estimated_value_currency = p_currency
+      AND (p_min_cents IS NULL OR COALESCE(t.estimated_value_max_cents, t.estimated_value_min_cents) >= p_min_cents)
+      AND (p_max_cents IS NULL OR COALESCE(t.estimated_value_min_cents, 0) <= p_max_cents)
+    ORDER BY t.estimated_value_min_cents DESC NULLS LAST
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,239 @@
+import os
+import re
+import zlib
+import fcntl
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from ..database.models import EmailMessage, EmailThread
+
+logger = logging.getLogger(__name__)
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index for near-duplicate thread detection
+
+    Each thread is reduced to a set of shingles (participant addresses, subject
+    word pairs and body word triples from the opening message), summarized as a
+    MinHash signature and bucketed by LSH bands. Candidates that share a band are
+    verified by estimated Jaccard similarity. The index lives in memory, is updated
+    as threads are saved and is persisted to a compressed .npz file between runs.
+
+    Several processes (shards, a daemon next to a one-shot run) can share one
+    file: sync() merges what others wrote before saving, and refresh() picks up
+    their saves before matching. Threads two shards first see in the same pass
+    can still both get rows; they are matched from the next pass on.
+    """
+
+    NUM_PERM = 64
+    BANDS = 16
+    ROWS_PER_BAND = NUM_PERM // BANDS
+
+    # Body shingles are taken from the start of the opening message only
+    BODY_CHARS = 1000
+
+    _MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+    _MAX_HASH = np.uint64((1 << 32) - 1)
+    _SUBJECT_PREFIX_REGEX = re.compile(r'^\s*((re|fwd?|aw)\s*:\s*)+', re.IGNORECASE)
+    _WORD_REGEX = re.compile(r'[a-z0-9]+')
+
+    def __init__(self, threshold: float = 0.7, seed: int = 1):
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._perm_a = rng.randint(1, 1 << 32, size=self.NUM_PERM, dtype=np.uint64)
+        self._perm_b = rng.randint(0, 1 << 32, size=self.NUM_PERM, dtype=np.uint64)
+
+        self.signatures: Dict[str, np.ndarray] = {}  # thread row id -> signature
+        self.gmail_ids: Dict[str, str] = {}  # gmail thread id -> thread row id
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self.dirty = False
+        self._local: Set[str] = set()  # Row ids added here since the last load/sync
+        self._file_version: Optional[Tuple[int, int]] = None  # File as last read or written (see _version)
+
+    # Shingling / signatures
+
+    @classmethod
+    def build_shingles(cls, participants: Iterable[str], subject: str, body: str = "") -> Set[str]:
+        """Participant, subject-bigram and body-trigram shingles for a thread"""
+        shingles = {f"p:{participant}" for participant in participants if participant}
+
+        subject_words = cls._WORD_REGEX.findall(cls._SUBJECT_PREFIX_REGEX.sub('', subject or '').lower())
+        if len(subject_words) == 1:
+            shingles.add(f"s:{subject_words[0]}")
+        shingles.update(f"s:{a} {b}" for a, b in zip(subject_words, subject_words[1:]))
+
+        body_words = cls._WORD_REGEX.findall((body or '')[:cls.BODY_CHARS].lower())
+        shingles.update(f"b:{a} {b} {c}" for a, b, c in zip(body_words, body_words[1:], body_words[2:]))
+
+        return shingles
+
+    def compute_signature(self, shingles: Set[str]) -> np.ndarray:
+        """MinHash signature (NUM_PERM uint64 values) for a shingle set"""
+        if not shingles:
+            return np.full(self.NUM_PERM, self._MAX_HASH, dtype=np.uint64)
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # (a * h + b) mod p, one row per permutation, min over shingles
+        permuted = (np.outer(self._perm_a, hashes) + self._perm_b[:, None]) % self._MERSENNE_PRIME
+        return (permuted & self._MAX_HASH).min(axis=1)
+
+    def signature_for_thread(self, thread: EmailThread, messages: Optional[List[EmailMessage]] = None) -> np.ndarray:
+        """Signature for a thread, using the opening message body when messages are available"""
+        body = ""
+        if messages:
+            body = min(messages, key=lambda m: m.received_date).body_text
+        return self.compute_signature(self.build_shingles(thread.participants, thread.subject, body))
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        rows = self.ROWS_PER_BAND
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.BANDS)]
+
+    # Index maintenance
+
+    def add(self, thread_id: str, gmail_thread_id: str, signature: np.ndarray) -> None:
+        """Insert or replace a thread's signature"""
+        thread_id = str(thread_id)
+        self.remove(thread_id)
+
+        self.signatures[thread_id] = signature
+        self._local.add(thread_id)
+        if gmail_thread_id:
+            self.gmail_ids[gmail_thread_id] = thread_id
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(thread_id)
+        self.dirty = True
+
+    def remove(self, thread_id: str) -> None:
+        signature = self.signatures.pop(str(thread_id), None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(str(thread_id))
+                if not bucket:
+                    del self._buckets[key]
+        self.dirty = True
+
+    def find_duplicate(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """
+        Best near-duplicate above the similarity threshold
+
+        Returns:
+            (thread_id, estimated_jaccard) or None
+        """
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(exclude)
+
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    # Persistence
+
+    def save(self, path: str) -> None:
+        """Persist signatures atomically to a compressed .npz file"""
+        thread_ids = list(self.signatures.keys())
+        row_to_gmail = {row_id: gmail_id for gmail_id, row_id in self.gmail_ids.items()}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            thread_ids=np.array(thread_ids, dtype=str),
+            gmail_ids=np.array([row_to_gmail.get(row_id, "") for row_id in thread_ids], dtype=str),
+            signatures=np.array([self.signatures[row_id] for row_id in thread_ids], dtype=np.uint64).reshape(-1, self.NUM_PERM),
+            threshold=np.array(self.threshold),
+        )
+        os.replace(tmp_path, path)
+        self.dirty = False
+        self._local.clear()
+        self._file_version = self._version(path)
+        logger.info(f"Saved near-duplicate index with {len(thread_ids)} threads to {path}")
+
+    @staticmethod
+    def _version(path: str) -> Tuple[int, int]:
+        # save() replaces the file, so the inode changes even when mtimes are coarse
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def sync(self, path: str) -> None:
+        """Merge entries other processes saved to `path`, then save (under an exclusive file lock)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._merge(path)
+                self.save(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self, path: str) -> None:
+        """Pick up entries other processes saved to `path` since this index last read or wrote it"""
+        try:
+            version = self._version(path)
+        except OSError:
+            return
+        if version != self._file_version:
+            self._merge(path)
+
+    def _merge(self, path: str) -> None:
+        """Add the file's entries, keeping rows this process changed since its last save"""
+        if not path or not os.path.exists(path):
+            return
+        dirty, local = self.dirty, set(self._local)
+        try:
+            version = self._version(path)
+            merged = 0
+            with np.load(path) as data:
+                for thread_id, gmail_id, signature in zip(data["thread_ids"], data["gmail_ids"], data["signatures"]):
+                    thread_id = str(thread_id)
+                    if thread_id in local:
+                        continue
+                    if thread_id not in self.signatures or not np.array_equal(self.signatures[thread_id], signature):
+                        self.add(thread_id, str(gmail_id), signature)
+                        merged += 1
+            self._file_version = version
+            if merged:
+                logger.info(f"Merged {merged} near-duplicate index entries from {path}")
+        except Exception as e:
+            logger.warning(f"Could not merge near-duplicate index from {path}: {e}")
+        self.dirty, self._local = dirty, local
+
+    @classmethod
+    def load(cls, path: str, threshold: float = 0.7) -> "NearDuplicateIndex":
+        """Load a persisted index, or return an empty one if the file is missing or unreadable"""
+        index = cls(threshold=threshold)
+        if not path or not os.path.exists(path):
+            return index
+
+        try:
+            with np.load(path) as data:
+                for thread_id, gmail_id, signature in zip(data["thread_ids"], data["gmail_ids"], data["signatures"]):
+                    index.add(str(thread_id), str(gmail_id), signature)
+            index.dirty = False
+            index._local.clear()
+            index._file_version = cls._version(path)
+            logger.info(f"Loaded near-duplicate index with {len(index)} threads from {path}")
+        except Exception as e:
+            logger.warning(f"Could not load near-duplicate index from {path}, starting empty: {e}")
+            index = cls(threshold=threshold)
+
+        return index
@@ -0,0 +1,72 @@
+import logging
+from typing import Any, Dict, List, Optional
+from ..config import Config
+from ..database.models import EmailMessage, EmailThread, OrganizationSync, ValueEstimate
+from .participants import ParticipantProcessor
+
+logger = logging.getLogger(__name__)
+
+class SponsorDirectory:
+    """
+    Builds incremental updates for the sponsor_organizations / contacts directory
+
+    Organizations are keyed by the normalized sender domain. At ingest a thread is
+    linked to its organization and the external senders are upserted as contacts;
+    after LLM extraction the organization name and value are refreshed. The
+    aggregates themselves are maintained in SQL (see sql/add_sponsor_directory.sql).
+    """
+
+    @staticmethod
+    def display_name_for_domain(domain: str) -> str:
+        """Fallback organization name until the LLM supplies one ('acme-labs.com' -> 'Acme Labs')"""
+        return domain.split('.')[0].replace('-', ' ').replace('_', ' ').title()
+
+    @staticmethod
+    def build_thread_sync(thread: EmailThread, messages: List[EmailMessage]) -> Optional[OrganizationSync]:
+        """
+        Organization link and contact upserts for a freshly ingested thread
+
+        Returns None when no participant belongs to an organization domain
+        (only personal mailboxes or the user's own domain).
+        """
+        sender_emails = [message.sender_email.lower() for message in messages if message.sender_email]
+        domain = ParticipantProcessor.get_organization_domain(sender_emails or thread.participants)
+        if not domain:
+            return None
+
+        contacts: Dict[str, Dict[str, Any]] = {}
+        for message in messages:
+            email = (message.sender_email or "").lower()
+            if not email or ParticipantProcessor.is_user_address(email):
+                continue
+            if ParticipantProcessor.normalize_domain(email) != domain:
+                continue
+
+            contact = contacts.get(email)
+            if contact is None or message.received_date > contact["last_contact_at"]:
+                contacts[email] = {
+                    "email": email,
+                    "name": message.sender_name or email.split('@')[0],
+                    "last_contact_at": message.received_date,
+                }
+
+        return OrganizationSync(
+            domain=domain,
+            name=SponsorDirectory.display_name_for_domain(domain),
+            last_contact_at=thread.last_message_date,
+            contacts=list(contacts.values())
+        )
+
+    @staticmethod
+    def organization_value(estimate: ValueEstimate) -> Optional[float]:
+        """
+        Amount a thread contributes to its organization's total_value (currency units)
+
+        total_value is kept in DEFAULT_VALUE_CURRENCY; amounts in other currencies
+        contribute nothing rather than being added as if they were the same unit
+        (per-currency totals come from sponsor_value_summary).
+        """
+        cents = estimate.representative_cents
+        if cents is None or estimate.currency != Config.DEFAULT_VALUE_CURRENCY:
+            return None
+        return cents / 100
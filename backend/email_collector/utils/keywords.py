@@ -1,10 +1,17 @@
 import re
-from typing import List, Set, Dict
+from bisect import bisect_right
+from typing import List, Set, Dict, Sequence, Tuple
 from ..config import Config
 
 class KeywordMatcher:
     """Handles keyword matching and filtering for sponsorship emails"""
     
+    # Primary keywords get higher weight in get_keyword_score
+    PRIMARY_KEYWORDS = frozenset({'sponsorship', 'partnership', 'sponsor', 'partner'})
+    
+    # Separator used to scan a batch of texts in one pass (non-word, so \b still holds)
+    _BATCH_SEPARATOR = "\n\x00\n"
+    
     def __init__(self):
         self.sponsorship_keywords = set(keyword.lower() for keyword in Config.SPONSORSHIP_KEYWORDS)
         
@@ -15,6 +22,63 @@ class KeywordMatcher:
             'collaborate': ['collaboration', 'collaborative', 'collaborating'],
             'marketing': ['marketing opportunity', 'brand partnership', 'promotional'],
         }
+        
+        self._compile()
+    
+    @staticmethod
+    def _build_trie_pattern(keywords) -> str:
+        """
+        Build a prefix-factored alternation, e.g. sponsor(?:ed|ing|s(?:hip)?)?
+        
+        Sibling branches start with different characters and optional tails are
+        greedy, so the first match at a position is the longest keyword there.
+        """
+        trie: Dict[str, dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        
+        def build(node: Dict[str, dict]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return '(?:' + body + ')?' if '' in node else body
+        
+        return build(trie)
+    
+    def _compile(self):
+        """
+        Build one combined pattern for every keyword
+        
+        A single trie-shaped alternation finds the longest hit at each position in one
+        C-level scan. Overlapping keywords are recovered from the hit itself: shorter
+        keywords that are whole-word prefixes of it, and keywords starting at a word
+        boundary inside it ("partnership" in "brand partnership").
+        """
+        self.all_keywords = frozenset(self.get_all_keywords())
+        
+        self._pattern = re.compile(r'\b(?:' + self._build_trie_pattern(self.all_keywords) + r')\b')
+        
+        def is_word_char(char: str) -> bool:
+            return char.isalnum() or char == '_'
+        
+        self._prefix_keywords: Dict[str, List[str]] = {
+            keyword: [
+                other for other in self.all_keywords
+                if other != keyword and keyword.startswith(other) and not is_word_char(keyword[len(other)])
+            ]
+            for keyword in self.all_keywords
+        }
+        self._inner_word_starts: Dict[str, List[int]] = {
+            keyword: [
+                offset for offset in range(1, len(keyword))
+                if is_word_char(keyword[offset]) and not is_word_char(keyword[offset - 1])
+            ]
+            for keyword in self.all_keywords
+        }
     
     def get_all_keywords(self) -> Set[str]:
         """Get all keywords including variations"""
@@ -25,91 +89,162 @@ class KeywordMatcher:
         
         return all_keywords
     
-    def find_keywords_in_text(self, text: str) -> List[str]:
-        """Find all matching keywords in the given text"""
+    def find_keyword_hits(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Find every keyword occurrence in a single scan
+        
+        Returns:
+            List of (keyword, start, end) tuples ordered by position; offsets refer
+            to ``text.lower()``, which matches ``text`` for ASCII input
+        """
         if not text:
             return []
         
         text_lower = text.lower()
-        found_keywords = []
+        hits = []
+        overlapping = False
+        
+        for match in self._pattern.finditer(text_lower):
+            keyword = match.group()
+            start = match.start()
+            hits.append((keyword, start, match.end()))
+            
+            for prefix in self._prefix_keywords[keyword]:
+                hits.append((prefix, start, start + len(prefix)))
+            
+            # Keywords starting inside this hit (may recurse through nested hits)
+            pending = [start + offset for offset in self._inner_word_starts[keyword]]
+            while pending:
+                inner = self._pattern.match(text_lower, pending.pop())
+                if inner:
+                    overlapping = True
+                    inner_keyword = inner.group()
+                    hits.append((inner_keyword, inner.start(), inner.end()))
+                    for prefix in self._prefix_keywords[inner_keyword]:
+                        hits.append((prefix, inner.start(), inner.start() + len(prefix)))
+                    pending.extend(inner.start() + offset for offset in self._inner_word_starts[inner_keyword])
         
-        for keyword in self.get_all_keywords():
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, text_lower):
-                found_keywords.append(keyword)
+        if overlapping:
+            # Nested expansion can rediscover hits and emit them out of order
+            hits = sorted(set(hits), key=lambda hit: (hit[1], -len(hit[0])))
         
-        return found_keywords
+        return hits
+    
+    def find_keywords_in_text(self, text: str) -> List[str]:
+        """Find all matching keywords in the given text"""
+        # dict preserves first-occurrence order while de-duplicating
+        return list(dict.fromkeys(keyword for keyword, _, _ in self.find_keyword_hits(text)))
+    
+    def find_keywords_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """Find matching keywords for many texts with one scan over the joined batch"""
+        if not texts:
+            return []
+        
+        # Hit offsets refer to lowercased text, which can differ in length (e.g. 'İ')
+        lowered = [(text or "").lower() for text in texts]
+        offsets = []
+        position = 0
+        for text in lowered:
+            offsets.append(position)
+            position += len(text) + len(self._BATCH_SEPARATOR)
+        
+        results: List[Dict[str, None]] = [{} for _ in texts]
+        joined = self._BATCH_SEPARATOR.join(lowered)
+        for keyword, start, _ in self.find_keyword_hits(joined):
+            results[bisect_right(offsets, start) - 1][keyword] = None
+        
+        return [list(found) for found in results]
     
     def is_sponsorship_related(self, subject: str, body: str, snippet: str = "") -> bool:
         """Check if email content is sponsorship-related"""
         # Combine all text for analysis
         combined_text = f"{subject} {body} {snippet}"
         
-        # Find matching keywords
-        found_keywords = self.find_keywords_in_text(combined_text)
-        
-        return len(found_keywords) > 0
+        return self._pattern.search(combined_text.lower()) is not None
     
-    def get_keyword_score(self, subject: str, body: str, snippet: str = "") -> float:
-        """Calculate relevance score based on keyword matches"""
-        combined_text = f"{subject} {body} {snippet}"
-        found_keywords = self.find_keywords_in_text(combined_text)
-        
-        if not found_keywords:
+    def _score_hits(self, hits: List[Tuple[str, int, int]], subject_length: int) -> float:
+        """Score keyword hits from a combined "subject body snippet" scan"""
+        if not hits:
             return 0.0
         
-        # Weight different types of matches
-        score = 0.0
+        found_keywords = set()
+        subject_keywords = set()
+        for keyword, _, end in hits:
+            found_keywords.add(keyword)
+            # Hits that end inside the subject are exactly the subject's own matches
+            if end <= subject_length:
+                subject_keywords.add(keyword)
         
-        # Primary keywords get higher weight
-        primary_keywords = {'sponsorship', 'partnership', 'sponsor', 'partner'}
-        for keyword in found_keywords:
-            if keyword in primary_keywords:
-                score += 1.0
-            else:
-                score += 0.5
+        # Weight different types of matches
+        score = sum(1.0 if keyword in self.PRIMARY_KEYWORDS else 0.5 for keyword in found_keywords)
         
         # Subject line matches get extra weight
-        subject_keywords = self.find_keywords_in_text(subject)
         score += len(subject_keywords) * 0.5
         
         return min(score, 5.0)  # Cap at 5.0
     
-    def filter_spam_patterns(self, subject: str, body: str, sender_email: str) -> bool:
-        """Filter out obvious spam or irrelevant emails"""
+    def get_keyword_score(self, subject: str, body: str, snippet: str = "") -> float:
+        """Calculate relevance score based on keyword matches"""
+        subject = subject or ""
+        combined_text = f"{subject} {body} {snippet}"
+        return self._score_hits(self.find_keyword_hits(combined_text), len(subject.lower()))
+    
+    def get_keyword_scores_batch(self, items: Sequence[Tuple[str, str, str]]) -> List[float]:
+        """Score many (subject, body, snippet) tuples with one scan over the joined batch"""
+        if not items:
+            return []
         
-        # Common spam patterns
-        spam_patterns = [
-            r'unsubscribe',
-            r'click here',
-            r'act now',
-            r'limited time',
-            r'free trial',
-            r'newsletter',
-            r'promotional',
-            r'noreply@',
-            r'do-not-reply@'
-        ]
+        texts = []
+        offsets = []
+        position = 0
+        for subject, body, snippet in items:
+            text = f"{subject or ''} {body} {snippet}".lower()
+            texts.append(text)
+            offsets.append(position)
+            position += len(text) + len(self._BATCH_SEPARATOR)
         
-        combined_text = f"{subject} {body} {sender_email}".lower()
+        per_item_hits: List[List[Tuple[str, int, int]]] = [[] for _ in items]
+        for keyword, start, end in self.find_keyword_hits(self._BATCH_SEPARATOR.join(texts)):
+            index = bisect_right(offsets, start) - 1
+            per_item_hits[index].append((keyword, start - offsets[index], end - offsets[index]))
         
-        # Check for spam patterns
-        for pattern in spam_patterns:
-            if re.search(pattern, combined_text):
-                return False  # Filter out (not sponsorship)
-        
-        # Check for automated emails
-        automated_indicators = [
-            'automated',
-            'auto-generated',
-            'system notification',
-            'donotreply'
+        return [
+            self._score_hits(hits, len((subject or "").lower()))
+            for hits, (subject, _, _) in zip(per_item_hits, items)
         ]
+    
+    # Common spam patterns
+    SPAM_PATTERNS = [
+        r'unsubscribe',
+        r'click here',
+        r'act now',
+        r'limited time',
+        r'free trial',
+        r'newsletter',
+        r'promotional',
+        r'noreply@',
+        r'do-not-reply@'
+    ]
+    
+    # Automated email indicators (plain substrings)
+    AUTOMATED_INDICATORS = [
+        'automated',
+        'auto-generated',
+        'system notification',
+        'donotreply'
+    ]
+    
+    _SPAM_REGEX = re.compile(
+        '|'.join(SPAM_PATTERNS + [re.escape(indicator) for indicator in AUTOMATED_INDICATORS])
+    )
+    
+    def filter_spam_patterns(self, subject: str, body: str, sender_email: str) -> bool:
+        """Filter out obvious spam or irrelevant emails"""
+        combined_text = f"{subject} {body} {sender_email}".lower()
         
-        for indicator in automated_indicators:
-            if indicator in combined_text:
-                return False
+        # One compiled scan for spam patterns and automated indicators
+        if self._SPAM_REGEX.search(combined_text):
+            return False  # Filter out (not sponsorship)
         
         return True  # Keep (potential sponsorship)
     
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import contextlib
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class StageStats:
+    """Call count, errors, wall time, bytes and latency histogram of one stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float, nbytes: int = 0, error: bool = False):
+        self.calls += 1
+        self.errors += int(error)
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes += nbytes
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when unobserved)"""
+        if not self.calls:
+            return None
+        target = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_seconds
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 4),
+            "mean_seconds": round(self.seconds / self.calls, 4) if self.calls else None,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "max_seconds": round(self.max_seconds, 4),
+            "bytes": self.bytes,
+            "histogram": {
+                **{str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "+Inf": self.buckets[-1],
+            },
+        }
+
+class StageTimer:
+    """Context manager returned by MetricsRegistry.timer; set .bytes before it exits"""
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+        self.bytes = 0
+        self.error = False
+        self._started = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.registry.observe(self.stage, time.perf_counter() - self._started,
+                              nbytes=self.bytes, error=self.error or exc_type is not None)
+        return False
+
+class MetricsRegistry:
+    """
+    Process-wide, thread-safe metrics for one collector process
+
+    Stages are dotted names ("gmail.threads.get", "supabase.save_thread",
+    "llm.generate", "collect.thread"); counters hold everything else (cache hits,
+    LLM tokens). At the end of a run the registry is written as a JSON report and,
+    optionally, as a Prometheus textfile for node_exporter's textfile collector.
+    Values are cumulative for the life of the process, so a daemon's textfile
+    behaves like ordinary Prometheus counters.
+    """
+
+    PROMETHEUS_PREFIX = "email_collector"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # StageProfiler installed by --profile mode; it also wraps every timed() stage
+        self.profiler = None
+        # Constant labels on every Prometheus series (e.g. {"shard": "0/4"})
+        self.labels: Dict[str, str] = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages: Dict[str, StageStats] = {}
+            self.counters: Dict[str, float] = {}
+            self.started_at = datetime.now(timezone.utc)
+
+    def observe(self, stage: str, seconds: float, nbytes: int = 0, error: bool = False):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.observe(seconds, nbytes, error)
+
+    def add_bytes(self, stage: str, nbytes: int):
+        """Attribute transferred bytes to a stage without counting a call"""
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.bytes += nbytes
+
+    def incr(self, counter: str, amount: float = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set_counter(self, counter: str, value: float):
+        """Overwrite a counter with a running total kept elsewhere (e.g. LLM token usage)"""
+        with self._lock:
+            self.counters[counter] = value
+
+    def timer(self, stage: str) -> StageTimer:
+        return StageTimer(self, stage)
+
+    def _profiled(self, stage: str):
+        profiler = self.profiler
+        return profiler.stage(stage) if profiler is not None else contextlib.nullcontext()
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator timing every call of a sync or async function as `stage`"""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage), self._profiled(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage), self._profiled(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def hit_rate(self, prefix: str) -> Optional[float]:
+        """hits / (hits + misses) for counters named '<prefix>.hit' / '<prefix>.miss'"""
+        hits = self.counters.get(f"{prefix}.hit", 0)
+        total = hits + self.counters.get(f"{prefix}.miss", 0)
+        return round(hits / total, 4) if total else None
+
+    def report(self, run: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: stats.report() for name, stats in sorted(self.stages.items())}
+            counters = dict(sorted(self.counters.items()))
+
+        cache_prefixes = sorted({name.rsplit(".", 1)[0] for name in counters if name.endswith((".hit", ".miss"))})
+        prompt_tokens = counters.get("llm.tokens.prompt", 0)
+        cache_hit_rates = {prefix: self.hit_rate(prefix) for prefix in cache_prefixes}
+        if prompt_tokens:
+            cache_hit_rates["llm.cached_tokens"] = round(counters.get("llm.tokens.cached", 0) / prompt_tokens, 4)
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "run": run or {},
+            "stages": stages,
+            "counters": counters,
+            "cache_hit_rates": cache_hit_rates,
+        }
+
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def write_json(self, path: str, run: Optional[Dict[str, Any]] = None):
+        self._write_atomic(path, json.dumps(self.report(run), indent=2) + "\n")
+
+    @staticmethod
+    def _metric_name(name: str) -> str:
+        return "".join(ch if ch.isalnum() else "_" for ch in name)
+
+    def prometheus_text(self, run: Optional[Dict[str, Any]] = None) -> str:
+        prefix = self.PROMETHEUS_PREFIX
+        report = self.report(run)
+        lines: List[str] = []
+
+        def labels(**extra: str) -> str:
+            pairs = {**self.labels, **extra}
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs.items()) + "}" if pairs else ""
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        metric("stage_duration_seconds", "histogram", "Latency of pipeline stages and client calls")
+        for stage, stats in report["stages"].items():
+            cumulative = 0
+            for bound, count in stats["histogram"].items():
+                cumulative += count
+                lines.append(f'{prefix}_stage_duration_seconds_bucket{labels(stage=stage, le=bound)} {cumulative}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{labels(stage=stage)} {stats["seconds"]}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{labels(stage=stage)} {stats["calls"]}')
+
+        metric("stage_errors_total", "counter", "Failed calls per stage")
+        lines.extend(f'{prefix}_stage_errors_total{labels(stage=stage)} {stats["errors"]}' for stage, stats in report["stages"].items())
+        metric("stage_bytes_total", "counter", "Bytes sent and received per stage")
+        lines.extend(f'{prefix}_stage_bytes_total{labels(stage=stage)} {stats["bytes"]}' for stage, stats in report["stages"].items() if stats["bytes"])
+
+        for name, value in report["counters"].items():
+            metric_name = f"{self._metric_name(name)}_total"
+            metric(metric_name, "counter", f"Counter {name}")
+            lines.append(f"{prefix}_{metric_name}{labels()} {value}")
+
+        for name, value in (report["run"] or {}).items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                metric_name = f"last_run_{self._metric_name(name)}"
+                metric(metric_name, "gauge", f"{name} of the most recent run")
+                lines.append(f"{prefix}_{metric_name}{labels()} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, run: Optional[Dict[str, Any]] = None):
+        self._write_atomic(path, self.prometheus_text(run))
+
+metrics = MetricsRegistry()
@@ -1,9 +1,50 @@
 import re
-from typing import List, Set
+import sys
+from functools import lru_cache
+from email.utils import getaddresses
+from collections import Counter
+from typing import FrozenSet, Iterable, List, Optional, Set, Tuple
 from ..config import Config
 
 class ParticipantProcessor:
-    """Handles participant extraction and filtering"""
+    """
+    Handles participant extraction and filtering
+
+    Header parsing is memoized in bounded LRU caches and normalized addresses are
+    interned, since the same few hundred addresses repeat across thousands of headers.
+    """
+    
+    # Maximum distinct headers / single addresses kept in each parse cache
+    PARSE_CACHE_SIZE = 8192
+    
+    # Personal mailbox providers - senders here are contacts without an organization
+    FREEMAIL_DOMAINS = frozenset({
+        'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+        'live.com', 'msn.com', 'icloud.com', 'me.com', 'aol.com', 'proton.me',
+        'protonmail.com', 'gmx.com', 'mail.com', 'qq.com', '163.com'
+    })
+    
+    # Second-level suffixes where the organization sits one label further left
+    MULTI_PART_SUFFIXES = frozenset({
+        'co.uk', 'ac.uk', 'org.uk', 'gov.uk', 'com.au', 'edu.au', 'org.au', 'co.jp',
+        'co.in', 'co.nz', 'com.br', 'com.cn', 'com.sg', 'com.hk', 'co.kr', 'com.mx'
+    })
+    
+    # The collecting team: Config.USER_EMAIL / USER_NAME plus every configured
+    # mailbox account (add_user_identities); excluded from participants and contacts
+    USER_EMAILS: FrozenSet[str] = frozenset({Config.USER_EMAIL.lower()})
+    USER_NAMES: FrozenSet[str] = frozenset({Config.USER_NAME.lower()})
+    
+    @classmethod
+    def add_user_identities(cls, emails: Iterable[str], names: Iterable[str] = ()) -> None:
+        """Treat further addresses / display names as the user's own (multi-mailbox collection)"""
+        cls.USER_EMAILS = cls.USER_EMAILS | {email.strip().lower() for email in emails if email}
+        cls.USER_NAMES = cls.USER_NAMES | {name.strip().lower() for name in names if name}
+    
+    @staticmethod
+    def is_user_address(email: str) -> bool:
+        """True if the address belongs to one of the collecting team's mailboxes"""
+        return bool(email) and email.strip().lower() in ParticipantProcessor.USER_EMAILS
     
     @staticmethod
     def extract_email_addresses(text: str) -> List[str]:
@@ -17,6 +58,7 @@ class ParticipantProcessor:
         return list(set(emails))  # Remove duplicates
     
     @staticmethod
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
     def extract_name_from_email_header(header: str) -> tuple[str, str]:
         """
         Extract name and email from email header like 'John Doe <john@example.com>'
@@ -29,33 +71,90 @@ class ParticipantProcessor:
         match = re.match(r'^"?([^"<]+?)"?\s*<([^>]+)>$', header.strip())
         if match:
             name = match.group(1).strip()
-            email = match.group(2).strip().lower()
+            email = sys.intern(match.group(2).strip().lower())
             return name, email
         
         # Just an email address
         if '@' in header:
-            email = header.strip().lower()
+            email = sys.intern(header.strip().lower())
             return email.split('@')[0], email
         
         # Just a name
         return header.strip(), ""
     
+    @staticmethod
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def parse_address_list(header: str) -> Tuple[Tuple[str, str], ...]:
+        """
+        Parse an RFC 5322 address-list header (To/Cc may hold several addresses,
+        with commas inside quoted names) into (name, email) pairs
+        
+        Emails are lowercased and interned; name-only entries have an empty email.
+        """
+        if not header or not header.strip():
+            return ()
+        
+        # A bare display name with no address at all (legacy participant format)
+        if '@' not in header:
+            return ((header.strip(), ""),)
+        
+        pairs = []
+        for name, email in getaddresses([header]):
+            email = email.strip().lower()
+            if '@' in email:
+                pairs.append((name.strip() or email.split('@')[0], sys.intern(email)))
+            elif name.strip():
+                pairs.append((name.strip(), ""))
+        
+        return tuple(pairs)
+    
+    @staticmethod
+    def extract_participants(headers: Iterable[str]) -> List[str]:
+        """
+        Parse From/To/Cc header values in one pass into the normalized participant list
+        
+        Equivalent to filter_user_emails + normalize_participants, but every header is
+        split into individual addresses and parsed at most once per cache lifetime.
+        """
+        user_emails = ParticipantProcessor.USER_EMAILS
+        user_names = ParticipantProcessor.USER_NAMES
+        normalized: Set[str] = set()
+        
+        for header in headers:
+            for name, email in ParticipantProcessor.parse_address_list(header):
+                if email:
+                    if email not in user_emails:
+                        normalized.add(email)
+                elif name.lower() not in user_names and name.lower() not in user_emails:
+                    normalized.add(sys.intern(name.lower()))
+        
+        return sorted(normalized)
+    
     @staticmethod
     def filter_user_emails(participants: List[str]) -> List[str]:
-        """Filter out the user's email from participants"""
+        """Filter out the user's email from participants (multi-address headers are split)"""
         filtered = []
-        user_email_lower = Config.USER_EMAIL.lower()
+        user_emails = ParticipantProcessor.USER_EMAILS
+        user_names = ParticipantProcessor.USER_NAMES
         
         for participant in participants:
-            # Extract email from participant string
-            name, email = ParticipantProcessor.extract_name_from_email_header(participant)
+            addresses = ParticipantProcessor.parse_address_list(participant)
+            if len(addresses) == 1:
+                name, email = addresses[0]
+                # Skip if it's the user's email
+                if email and email not in user_emails:
+                    filtered.append(participant)
+                elif not email and participant.lower() not in user_names and participant.lower() not in user_emails:
+                    # Handle cases where participant is just a name or email
+                    filtered.append(participant)
+                continue
             
-            # Skip if it's the user's email
-            if email and email != user_email_lower:
-                filtered.append(participant)
-            elif not email and participant.lower() not in [Config.USER_NAME.lower(), user_email_lower]:
-                # Handle cases where participant is just a name or email
-                filtered.append(participant)
+            # To/Cc header holding several addresses - keep each non-user address
+            for name, email in addresses:
+                if email and email not in user_emails:
+                    filtered.append(f"{name} <{email}>" if name else email)
+                elif not email and name.lower() not in user_names and name.lower() not in user_emails:
+                    filtered.append(name)
         
         return filtered
     
@@ -63,37 +162,75 @@ class ParticipantProcessor:
     def normalize_participants(participants: List[str]) -> List[str]:
         """Normalize participant list for consistent processing"""
         normalized = set()
+        user_emails = ParticipantProcessor.USER_EMAILS
         
         for participant in participants:
             if not participant:
                 continue
-                
-            # Clean up the participant string
-            participant = participant.strip()
-            
-            # Extract name and email
-            name, email = ParticipantProcessor.extract_name_from_email_header(participant)
             
-            # Skip user's email
-            if email and email.lower() == Config.USER_EMAIL.lower():
-                continue
-            
-            # Use email if available, otherwise use name
-            if email:
-                normalized.add(email)
-            elif name:
-                normalized.add(name.lower())
+            for name, email in ParticipantProcessor.parse_address_list(participant.strip()):
+                # Skip user's email
+                if email and email in user_emails:
+                    continue
+                
+                # Use email if available, otherwise use name
+                if email:
+                    normalized.add(email)
+                elif name:
+                    normalized.add(sys.intern(name.lower()))
         
-        return sorted(list(normalized))
+        return sorted(normalized)
     
     @staticmethod
-    def create_participant_signature(participants: List[str]) -> str:
+    def create_participant_signature(participants: List[str], normalized: bool = False) -> str:
         """
         Create a consistent signature for participant list for deduplication
+        
+        Pass normalized=True when the list already came from extract_participants /
+        normalize_participants to skip re-parsing every entry.
         """
-        normalized = ParticipantProcessor.normalize_participants(participants)
+        if not normalized:
+            participants = ParticipantProcessor.normalize_participants(participants)
         # Sort to ensure consistent ordering
-        return "|".join(sorted(normalized))
+        return "|".join(sorted(participants))
+    
+    @staticmethod
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def normalize_domain(email: str) -> str:
+        """
+        Reduce an address (or host name) to its organization domain
+        
+        'jane@mail.events.acme.com' -> 'acme.com', 'bob@dept.ox.ac.uk' -> 'ox.ac.uk'
+        """
+        domain = email.rsplit('@', 1)[-1].strip().lower().rstrip('.')
+        labels = domain.split('.')
+        if len(labels) <= 2:
+            return sys.intern(domain)
+        
+        keep = 3 if '.'.join(labels[-2:]) in ParticipantProcessor.MULTI_PART_SUFFIXES else 2
+        return sys.intern('.'.join(labels[-keep:]))
+    
+    @staticmethod
+    def is_organization_address(email: str) -> bool:
+        """True for external addresses that can identify a sponsor organization"""
+        if not email or '@' not in email:
+            return False
+        
+        domain = ParticipantProcessor.normalize_domain(email)
+        return (
+            domain not in ParticipantProcessor.FREEMAIL_DOMAINS
+            and domain not in {ParticipantProcessor.normalize_domain(user) for user in ParticipantProcessor.USER_EMAILS}
+        )
+    
+    @staticmethod
+    def get_organization_domain(emails: Iterable[str]) -> Optional[str]:
+        """Most frequent organization domain among the given addresses (None if there is none)"""
+        domains = Counter(
+            ParticipantProcessor.normalize_domain(email)
+            for email in emails
+            if ParticipantProcessor.is_organization_address(email)
+        )
+        return domains.most_common(1)[0][0] if domains else None
     
     @staticmethod
     def get_primary_contact_info(participants: List[str]) -> tuple[str, str]:
@@ -105,7 +242,7 @@ class ParticipantProcessor:
             name, email = ParticipantProcessor.extract_name_from_email_header(participant)
             
             # Skip user's email
-            if email and email.lower() != Config.USER_EMAIL.lower():
+            if email and not ParticipantProcessor.is_user_address(email):
                 return name or email.split('@')[0], email
         
         # Fallback - return first non-user participant
@@ -1,5 +1,6 @@
+import re
 from datetime import datetime, timezone
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 from ..database.models import EmailMessage, EmailThread
 
 class PriorityCalculator:
@@ -42,45 +43,93 @@ class PriorityCalculator:
             else:
                 return "LOW", f"Recently sent message {days_since} day(s) ago"
     
+    # High urgency indicators
+    URGENT_KEYWORDS = [
+        'urgent', 'asap', 'immediately', 'deadline', 'time sensitive',
+        'expires', 'limited time', 'act fast', 'closing soon',
+        'final notice', 'last chance'
+    ]
+    
+    MEDIUM_URGENCY_KEYWORDS = [
+        'soon', 'quickly', 'prompt', 'timely', 'follow up',
+        'waiting', 'response needed', 'please respond'
+    ]
+    
+    # One compiled substring matcher for both tiers (longest first so phrases win)
+    _URGENCY_REGEX = re.compile('|'.join(
+        re.escape(keyword) for keyword in sorted(URGENT_KEYWORDS + MEDIUM_URGENCY_KEYWORDS, key=len, reverse=True)
+    ))
+    _URGENT_SET = frozenset(URGENT_KEYWORDS)
+    
+    # Start of quoted history in a reply ("> ..." lines or "On <date>, <name> wrote:")
+    _QUOTE_START_REGEX = re.compile(r'^[ \t]*>|^On .{0,200}wrote:[ \t]*\r?$', re.MULTILINE)
+    
+    # Recency weighting: newest message 1.0, each older message halves; quoted
+    # history inside a message counts a quarter. Urgent terms only make a thread
+    # READ_NOW at URGENT_MIN_WEIGHT or above (the newest two messages, never quoted
+    # text); older or quoted urgency still lifts it to NORMAL.
+    RECENCY_DECAY = 0.5
+    QUOTED_WEIGHT = 0.25
+    URGENT_MIN_WEIGHT = 0.5
+    
     @staticmethod
     def analyze_content_urgency(messages: List[EmailMessage]) -> Tuple[str, str]:
         """
         Analyze message content for urgency indicators
         
+        Messages are streamed newest first through a single compiled matcher and
+        each hit is weighted by recency and quoting. Segment weights never
+        increase along the scan, so the first segment with a heavy enough urgent
+        term decides READ_NOW and ends the scan.
+        
         Returns:
             Tuple of (priority_level, reasoning)
         """
         if not messages:
             return "NORMAL", "No messages to analyze"
         
-        # Combine all message content
-        all_content = ""
-        for message in messages:
-            all_content += f"{message.subject} {message.body_text} "
-        
-        content_lower = all_content.lower()
+        weak_urgent_found: Dict[str, None] = {}
+        medium_found: Dict[str, float] = {}
+        weight = 1.0
         
-        # High urgency indicators
-        urgent_keywords = [
-            'urgent', 'asap', 'immediately', 'deadline', 'time sensitive',
-            'expires', 'limited time', 'act fast', 'closing soon',
-            'final notice', 'last chance'
-        ]
-        
-        medium_urgency_keywords = [
-            'soon', 'quickly', 'prompt', 'timely', 'follow up',
-            'waiting', 'response needed', 'please respond'
-        ]
+        for message in sorted(messages, key=lambda m: m.received_date, reverse=True):
+            body = message.body_text or ""
+            quote_start = PriorityCalculator._QUOTE_START_REGEX.search(body)
+            split_at = quote_start.start() if quote_start else len(body)
+            
+            segments = [
+                (f"{message.subject} {body[:split_at]}", weight),
+                (body[split_at:], weight * PriorityCalculator.QUOTED_WEIGHT),
+            ]
+            
+            for text, segment_weight in segments:
+                if not text:
+                    continue
+                
+                urgent_found: Dict[str, None] = {}
+                for match in PriorityCalculator._URGENCY_REGEX.finditer(text.lower()):
+                    keyword = match.group()
+                    if keyword not in PriorityCalculator._URGENT_SET:
+                        medium_found.setdefault(keyword, segment_weight)
+                    elif segment_weight >= PriorityCalculator.URGENT_MIN_WEIGHT:
+                        urgent_found.setdefault(keyword, None)
+                    else:
+                        weak_urgent_found.setdefault(keyword, None)
+                
+                if urgent_found:
+                    # Nothing outranks READ_NOW, and later segments only weigh less
+                    where = "" if segment_weight == 1.0 else " (earlier in thread)"
+                    return "READ_NOW", f"Urgent language detected{where}: {', '.join(urgent_found)}"
+            
+            weight *= PriorityCalculator.RECENCY_DECAY
         
-        # Check for urgent keywords
-        urgent_found = [keyword for keyword in urgent_keywords if keyword in content_lower]
-        if urgent_found:
-            return "READ_NOW", f"Urgent language detected: {', '.join(urgent_found)}"
+        if weak_urgent_found:
+            return "NORMAL", f"Urgent language only in older or quoted messages: {', '.join(weak_urgent_found)}"
         
-        # Check for medium urgency
-        medium_found = [keyword for keyword in medium_urgency_keywords if keyword in content_lower]
         if medium_found:
-            return "NORMAL", f"Time-sensitive language detected: {', '.join(medium_found)}"
+            # Insertion order is already strongest first
+            where = "" if max(medium_found.values()) == 1.0 else " (earlier in thread)"
+            return "NORMAL", f"Time-sensitive language detected{where}: {', '.join(medium_found)}"
         
         return "LOW", "No urgency indicators in content"
     
@@ -149,17 +198,36 @@ class PriorityCalculator:
         content_priority, content_reason = PriorityCalculator.analyze_content_urgency(messages)
         sender_priority, sender_reason = PriorityCalculator.analyze_sender_importance(messages)
         
-        # Priority level hierarchy
-        priority_levels = {
-            "READ_NOW": 4,
-            "REPLY_NOW": 3,
-            "NORMAL": 2,
-            "LOW": 1
-        }
+        return PriorityCalculator.combine_priorities(
+            (time_priority, time_reason),
+            (content_priority, content_reason),
+            (sender_priority, sender_reason)
+        )
+    
+    # Priority level hierarchy
+    PRIORITY_RANKS = {
+        "READ_NOW": 4,
+        "REPLY_NOW": 3,
+        "NORMAL": 2,
+        "LOW": 1
+    }
+    
+    @staticmethod
+    def combine_priorities(time_component: Tuple[str, str], content_component: Tuple[str, str],
+                           sender_component: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Combine (level, reason) pairs for time, content and sender into the overall priority
+        
+        Returns:
+            Tuple of (priority_level, reasoning)
+        """
+        time_priority, time_reason = time_component
+        content_priority, content_reason = content_component
+        sender_priority, sender_reason = sender_component
         
         # Take the highest priority level
         all_priorities = [time_priority, content_priority, sender_priority]
-        max_priority = max(all_priorities, key=lambda p: priority_levels.get(p, 0))
+        max_priority = max(all_priorities, key=lambda p: PriorityCalculator.PRIORITY_RANKS.get(p, 0))
         
         # Combine reasoning
         reasons = []
@@ -174,6 +242,24 @@ class PriorityCalculator:
         
         return max_priority, combined_reason
     
+    @staticmethod
+    def calculate_priority_signals(messages: List[EmailMessage]) -> Dict[str, Any]:
+        """
+        Time-independent priority inputs cached on the thread row so the periodic
+        refresh can recompute levels without re-reading messages
+        """
+        content_priority, content_reason = PriorityCalculator.analyze_content_urgency(messages)
+        sender_priority, sender_reason = PriorityCalculator.analyze_sender_importance(messages)
+        latest_message = max(messages, key=lambda m: m.received_date) if messages else None
+        
+        return {
+            "content_priority_level": content_priority,
+            "content_priority_reasoning": content_reason,
+            "sender_priority_level": sender_priority,
+            "sender_priority_reasoning": sender_reason,
+            "last_message_from_user": latest_message.is_from_user if latest_message else False,
+        }
+    
     @staticmethod
     def get_recommended_action(priority_level: str, is_waiting_for_response: bool) -> Tuple[str, str]:
         """
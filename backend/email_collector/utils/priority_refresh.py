@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .priority import PriorityCalculator
+
+logger = logging.getLogger(__name__)
+
+class PriorityRefresher:
+    """
+    Bulk recomputation of priority levels for open threads
+
+    Content and sender signals are cached on each thread at LLM time, so only the
+    time-based component changes between runs. The refresh loads the cached inputs
+    as columnar arrays, recomputes every level with NumPy, and returns only the
+    rows whose level changed.
+    """
+
+    @staticmethod
+    def _ranks(levels: List[Optional[str]]) -> np.ndarray:
+        """Map level names to integer ranks (unknown/missing -> 0)"""
+        ranks = PriorityCalculator.PRIORITY_RANKS
+        return np.fromiter((ranks.get(level, 0) for level in levels), dtype=np.int8, count=len(levels))
+
+    @staticmethod
+    def compute_time_ranks(last_message_ts: np.ndarray, waiting_for_response: np.ndarray, now_ts: float) -> np.ndarray:
+        """Vectorized equivalent of PriorityCalculator.calculate_time_based_priority (levels only)"""
+        hours_since = (now_ts - last_message_ts) / 3600
+        days_since = np.floor(hours_since / 24)
+
+        ranks = PriorityCalculator.PRIORITY_RANKS
+        waiting_ranks = np.where(hours_since > 24, ranks["REPLY_NOW"], ranks["NORMAL"])
+        sent_ranks = np.select(
+            [days_since > 14, days_since > 3],
+            [ranks["READ_NOW"], ranks["NORMAL"]],
+            default=ranks["LOW"]
+        )
+        return np.where(waiting_for_response, waiting_ranks, sent_ranks).astype(np.int8)
+
+    @staticmethod
+    def compute_updates(rows: List[Dict[str, Any]], now: datetime = None) -> List[Dict[str, Any]]:
+        """
+        Recompute priority for the given thread rows
+
+        Args:
+            rows: Dicts with id, priority_level, last_message_date, last_message_from_user
+                and the cached content/sender priority columns
+
+        Returns:
+            List of {"id", "priority_level", "auto_priority_reasoning"} for changed rows only
+        """
+        if not rows:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+
+        last_message_dates = [
+            value if isinstance(value, datetime) else datetime.fromisoformat(value)
+            for value in (row["last_message_date"] for row in rows)
+        ]
+        last_message_ts = np.fromiter(
+            (dt.replace(tzinfo=dt.tzinfo or timezone.utc).timestamp() for dt in last_message_dates),
+            dtype=np.float64, count=len(rows)
+        )
+        waiting_for_response = np.fromiter(
+            (not row.get("last_message_from_user") for row in rows), dtype=bool, count=len(rows)
+        )
+
+        time_ranks = PriorityRefresher.compute_time_ranks(last_message_ts, waiting_for_response, now.timestamp())
+        content_ranks = PriorityRefresher._ranks([row.get("content_priority_level") for row in rows])
+        sender_ranks = PriorityRefresher._ranks([row.get("sender_priority_level") for row in rows])
+        current_ranks = PriorityRefresher._ranks([row.get("priority_level") for row in rows])
+
+        new_ranks = np.maximum(time_ranks, np.maximum(content_ranks, sender_ranks))
+        changed = np.flatnonzero(new_ranks != current_ranks)
+
+        # Reasoning text is only rebuilt for the (few) rows that changed
+        updates = []
+        for index in changed:
+            row = rows[index]
+            time_component = PriorityCalculator.calculate_time_based_priority(
+                last_message_dates[index], bool(waiting_for_response[index])
+            )
+            level, reasoning = PriorityCalculator.combine_priorities(
+                time_component,
+                (row.get("content_priority_level"), row.get("content_priority_reasoning") or ""),
+                (row.get("sender_priority_level"), row.get("sender_priority_reasoning") or "")
+            )
+            updates.append({
+                "id": row["id"],
+                "priority_level": level,
+                "auto_priority_reasoning": reasoning,
+            })
+
+        logger.info(f"Priority refresh: {len(changed)} of {len(rows)} open threads changed level")
+        return updates
@@ -0,0 +1,216 @@
+import os
+import sys
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+class StageProfiler:
+    """
+    Per-stage CPU profiler behind the --profile CLI mode
+
+    Every stage timed with metrics.timed ("stage.collect", "collect.thread",
+    "llm.thread", ...) gets its own deterministic cProfile profiler while it runs.
+    Stages nest exclusively: entering a stage pauses the enclosing stage's
+    profiler, so "stage.collect" shows the Gmail search and fetch loop while the
+    per-thread conversion and storage work lands in "collect.thread". A sampling
+    thread also records the call stack of every thread that is inside a stage
+    every PROFILE_SAMPLE_INTERVAL_MS and files it under that thread's innermost
+    stage, which gives flame graph input (collapsed stacks, one
+    "frame;frame;frame count" line per stack) for flamegraph.pl or speedscope.
+
+    stop() writes into a timestamped directory below output_dir:
+
+    - <stage>.pstats: cProfile statistics merged across threads (snakeviz, pstats)
+    - <stage>.collapsed: sampled collapsed stacks
+    - allocations.tracemalloc: allocation snapshot, when trace_memory is set
+    - summary.txt: top PROFILE_TOP_N functions by own time per stage and overall
+
+    Only one cProfile profiler can be active per process on Python 3.12+, so
+    there stages entered on a second thread while another thread is profiling
+    are covered by the sampler only.
+    """
+
+    def __init__(self, output_dir: str, sample_interval_ms: Optional[float] = None,
+                 top_n: Optional[int] = None, trace_memory: bool = False):
+        self.output_dir = os.path.join(output_dir, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+        self.sample_interval_ms = sample_interval_ms if sample_interval_ms is not None else Config.PROFILE_SAMPLE_INTERVAL_MS
+        self.top_n = top_n or Config.PROFILE_TOP_N
+        self.trace_memory = trace_memory
+
+        self._lock = threading.Lock()
+        # (stage, thread ident) -> profiler; merged per stage when written
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        # thread ident -> stack of (stage, profiler or None) currently entered on that thread
+        self._active: Dict[int, List[Tuple[str, Optional[cProfile.Profile]]]] = {}
+        self._samples: Dict[str, Counter] = defaultdict(Counter)
+        self._sample_count = 0
+        self._frame_labels: Dict[object, str] = {}
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start(Config.PROFILE_TRACEMALLOC_FRAMES)
+        if self.sample_interval_ms > 0:
+            self._sampler = threading.Thread(target=self._sample_loop, name="stage-profiler-sampler", daemon=True)
+            self._sampler.start()
+        logger.info(f"Profiling pipeline stages into {self.output_dir}")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit(name)
+
+    @staticmethod
+    def _enable(profile: Optional[cProfile.Profile]) -> bool:
+        if profile is None:
+            return False
+        try:
+            profile.enable()
+            return True
+        except ValueError:
+            # Another profiler is already active (Python 3.12+ allows only one per process)
+            return False
+
+    def _enter(self, name: str):
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._active.setdefault(ident, [])
+            profile = self._profiles.get((name, ident))
+            if profile is None:
+                profile = self._profiles[(name, ident)] = cProfile.Profile()
+
+        if stack and stack[-1][1] is not None:
+            stack[-1][1].disable()
+        entry = (name, profile if self._enable(profile) else None)
+        with self._lock:
+            stack.append(entry)
+
+    def _exit(self, name: str):
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._active.get(ident, [])
+            position = max((i for i, (stage, _) in enumerate(stack) if stage == name), default=None)
+            if position is None:
+                return
+            _, profile = stack.pop(position)
+            parent = stack[-1] if stack and position == len(stack) else None
+
+        if profile is not None:
+            profile.disable()
+        if parent is not None and parent[1] is not None and not self._enable(parent[1]):
+            with self._lock:
+                stack[-1] = (parent[0], None)
+
+    def _frame_label(self, code) -> str:
+        label = self._frame_labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._frame_labels[code] = label
+        return label
+
+    def _sample_loop(self):
+        interval = self.sample_interval_ms / 1000
+        while not self._stop_sampling.wait(interval):
+            frames = sys._current_frames()
+            with self._lock:
+                innermost = {ident: stack[-1][0] for ident, stack in self._active.items() if stack}
+            for ident, stage in innermost.items():
+                frame = frames.get(ident)
+                labels = []
+                while frame is not None:
+                    labels.append(self._frame_label(frame.f_code))
+                    frame = frame.f_back
+                if labels:
+                    self._samples[stage][";".join(reversed(labels))] += 1
+            self._sample_count += 1
+
+    def _stage_stats(self) -> Dict[str, pstats.Stats]:
+        by_stage: Dict[str, List[cProfile.Profile]] = defaultdict(list)
+        with self._lock:
+            profiles = list(self._profiles.items())
+        for (stage, _), profile in profiles:
+            profile.create_stats()
+            if profile.stats:
+                by_stage[stage].append(profile)
+        return {stage: pstats.Stats(*stage_profiles) for stage, stage_profiles in sorted(by_stage.items())}
+
+    def _hot_function_lines(self, stats: pstats.Stats) -> List[str]:
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_n]
+        lines = [f"  {'own s':>9} {'cum s':>9} {'calls':>9}  function"]
+        for (filename, lineno, function), (_, calls, own_time, cumulative_time, _) in rows:
+            location = f"{_short_path(filename)}:{lineno}" if lineno else filename
+            lines.append(f"  {own_time:>9.4f} {cumulative_time:>9.4f} {calls:>9}  {function} ({location})")
+        return lines
+
+    def stop(self) -> str:
+        """Stop profiling, write all artifacts and return the summary path"""
+        self._stop_sampling.set()
+        if self._sampler:
+            self._sampler.join()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary = [f"Stage profiles ({self._sample_count} stack samples every {self.sample_interval_ms:g}ms)", ""]
+
+        stage_stats = self._stage_stats()
+        for stage, stats in stage_stats.items():
+            stats.dump_stats(os.path.join(self.output_dir, f"{stage}.pstats"))
+            summary.append(f"== {stage}: {stats.total_calls} calls, {stats.total_tt:.3f}s profiled, "
+                           f"{sum(self._samples.get(stage, {}).values())} samples")
+            summary.extend(self._hot_function_lines(stats))
+            summary.append("")
+
+        for stage, stacks in sorted(self._samples.items()):
+            with open(os.path.join(self.output_dir, f"{stage}.collapsed"), "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        if stage_stats:
+            combined = pstats.Stats()
+            combined.add(*stage_stats.values())
+            summary.append(f"== all stages: {combined.total_calls} calls, {combined.total_tt:.3f}s profiled")
+            summary.extend(self._hot_function_lines(combined))
+            summary.append("")
+
+        if self.trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snapshot.dump(os.path.join(self.output_dir, "allocations.tracemalloc"))
+            # Excluding the import machinery and the profiler's own bookkeeping per
+            # line is far cheaper than Snapshot.filter_traces on every trace
+            excluded = {"<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                        tracemalloc.__file__, cProfile.__file__, pstats.__file__, __file__}
+            statistics = [statistic for statistic in snapshot.statistics("lineno")
+                          if statistic.traceback[0].filename not in excluded]
+            summary.append(f"== live allocations at exit (top {self.top_n} by size)")
+            for statistic in statistics[:self.top_n]:
+                frame = statistic.traceback[0]
+                summary.append(f"  {statistic.size / 1024:>10.1f} KiB {statistic.count:>8} blocks  "
+                               f"{_short_path(frame.filename)}:{frame.lineno}")
+            summary.append("")
+
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(summary))
+        logger.info(f"Wrote stage profiles to {self.output_dir}")
+        return summary_path
+
+def _short_path(filename: str) -> str:
+    """Trim a source path to its package-relative part for readable reports"""
+    for marker in ("site-packages" + os.sep, "email_collector" + os.sep):
+        position = filename.rfind(marker)
+        if position != -1:
+            return filename[position + len(marker):] if marker.startswith("site") else filename[position:]
+    return os.path.basename(filename)
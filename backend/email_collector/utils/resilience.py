@@ -0,0 +1,357 @@
+import time
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+from ..config import Config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; every other 4xx/5xx is a permanent failure
+TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Statuses the server returns before doing any work, so even non-idempotent writes can be re-sent
+REJECTED_STATUSES = frozenset({429, 503})
+# Google APIs report per-user rate limits as 403 with one of these reasons
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "RESOURCE_EXHAUSTED")
+# PostgreSQL SQLSTATEs (surfaced by PostgREST) for connection loss, serialization
+# conflicts, resource exhaustion, statement timeout and admin shutdown
+TRANSIENT_SQLSTATE_PREFIXES = ("08", "40001", "40P01", "53", "57014", "57P")
+# Network errors by class name, so SDK exceptions are classified without importing the SDKs
+TRANSIENT_ERROR_NAMES = frozenset({
+    "TimeoutError", "ConnectionError", "ConnectionResetError", "ConnectionRefusedError",
+    "BrokenPipeError", "IncompleteRead", "RemoteDisconnected",
+    "TimeoutException", "ConnectError", "ConnectTimeout", "ReadTimeout", "WriteTimeout",
+    "PoolTimeout", "ReadError", "WriteError", "RemoteProtocolError",  # httpx
+    "Timeout", "ChunkedEncodingError",  # requests
+    "TransportError", "RefreshError",  # google.auth
+    "ServiceUnavailable", "TooManyRequests", "DeadlineExceeded", "InternalServerError",  # google.api_core
+})
+# Failures that happened before the request reached the server
+REJECTED_ERROR_NAMES = frozenset({"ConnectionRefusedError", "ConnectError", "ConnectTimeout", "PoolTimeout",
+                                  "CircuitOpenError"})
+
+class CircuitOpenError(Exception):
+    """Raised without calling the service while its circuit breaker is open"""
+
+class CallDeadlineExceeded(TimeoutError):
+    """The enclosing deadline() ran out before the call could be (re)tried"""
+
+class TransientStatusError(Exception):
+    """Internal marker for a transient HTTP response; the response is returned once retries run out"""
+
+    def __init__(self, status: int, result: Any):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.result = result
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by a googleapiclient, httpx, requests, api_core or postgrest error"""
+    for candidate in (
+        getattr(getattr(exc, "resp", None), "status", None),  # googleapiclient HttpError
+        getattr(getattr(exc, "response", None), "status_code", None),  # httpx / requests
+        getattr(exc, "code", None),  # google.api_core, postgrest APIError for non-JSON bodies
+        getattr(exc, "status_code", None),
+    ):
+        try:
+            status = int(candidate)
+        except (TypeError, ValueError):
+            continue
+        if 100 <= status < 600:
+            return status
+    return None
+
+def _error_names(exc: BaseException):
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+def is_transient(exc: BaseException) -> bool:
+    """True when retrying the same call later can succeed (overload, timeouts, connection loss)"""
+    if isinstance(exc, (TransientStatusError, CircuitOpenError, CallDeadlineExceeded)):
+        return True
+
+    status = error_status(exc)
+    if status is not None:
+        if status in TRANSIENT_STATUSES:
+            return True
+        if status == 403:
+            return any(reason in str(exc) for reason in RATE_LIMIT_REASONS)
+        return False
+
+    sqlstate = getattr(exc, "code", None)
+    if isinstance(sqlstate, str) and sqlstate.startswith(TRANSIENT_SQLSTATE_PREFIXES):
+        return True
+
+    return bool(_error_names(exc) & TRANSIENT_ERROR_NAMES)
+
+def is_rejected(exc: BaseException) -> bool:
+    """True when the service cannot have acted on the request, so retrying a write is safe"""
+    if isinstance(exc, TransientStatusError):
+        return exc.status in REJECTED_STATUSES
+    status = error_status(exc)
+    if status is not None:
+        return status in REJECTED_STATUSES
+    return bool(_error_names(exc) & REJECTED_ERROR_NAMES)
+
+# Absolute time.monotonic() by which the current unit of work has to finish
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("resilience_deadline", default=None)
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound every resilient call made inside the block (and the threads/tasks it
+    starts with a copied context) to `seconds` from now
+
+    Nested deadlines never extend an enclosing one. None or <= 0 adds no bound.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    outer = _deadline.get()
+    expires = time.monotonic() + seconds
+    token = _deadline.set(expires if outer is None else min(outer, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (None without one)"""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Shrink a request timeout to the current deadline; raises once the deadline has passed"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise CallDeadlineExceeded("Deadline exceeded before the request was sent")
+    return left if timeout is None else min(timeout, left)
+
+class ResiliencePolicy:
+    """
+    Retries, circuit breaker and hedging around one external service's calls
+
+    - Transient failures (see is_transient) are retried up to max_attempts with
+      full-jitter exponential backoff, never past the current deadline();
+      non-idempotent calls are only retried when the request was rejected
+      before the service acted on it (is_rejected).
+    - A circuit breaker opens after breaker_threshold consecutive transient
+      failures; calls then fail fast with CircuitOpenError for
+      breaker_reset_seconds, after which one probe call is let through
+      (half-open) and closes the circuit again on success.
+    - Idempotent reads can be hedged: when the first attempt has not answered
+      after hedge_after_seconds, a second identical request is sent and the
+      first response wins. Off when hedge_after_seconds is 0.
+
+    Outcomes are counted as resilience.<service>.{success, retry, transient_failure,
+    permanent_failure, deadline_exceeded, circuit_open, hedge_launched, hedge_won}.
+    """
+
+    def __init__(self, service: str, max_attempts: Optional[int] = None,
+                 base_delay: Optional[float] = None, max_delay: Optional[float] = None,
+                 breaker_threshold: Optional[int] = None, breaker_reset_seconds: Optional[float] = None,
+                 hedge_after_seconds: float = 0.0):
+        self.service = service
+        self.max_attempts = max(1, max_attempts or Config.RETRY_MAX_ATTEMPTS)
+        self.base_delay = Config.RETRY_BASE_DELAY_SECONDS if base_delay is None else base_delay
+        self.max_delay = Config.RETRY_MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.breaker_threshold = breaker_threshold or Config.CIRCUIT_BREAKER_THRESHOLD
+        self.breaker_reset_seconds = (Config.CIRCUIT_BREAKER_RESET_SECONDS
+                                      if breaker_reset_seconds is None else breaker_reset_seconds)
+        self.hedge_after_seconds = hedge_after_seconds
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def state(self) -> str:
+        """closed, open or half-open"""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.breaker_reset_seconds:
+                return "half-open"
+            return "open"
+
+    def _count(self, outcome: str, amount: float = 1):
+        metrics.incr(f"resilience.{self.service}.{outcome}", amount)
+
+    def _admit(self) -> bool:
+        """Whether the breaker lets a call through; True marks it as the half-open probe"""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at >= self.breaker_reset_seconds and not self._probing:
+                self._probing = True
+                return True
+        self._count("circuit_open")
+        raise CircuitOpenError(f"{self.service} circuit open after {self.breaker_threshold} consecutive failures")
+
+    def _record(self, transient_failure: bool, probe: bool):
+        with self._lock:
+            if probe:
+                self._probing = False
+            if not transient_failure:
+                self._consecutive_failures = 0
+                self._opened_at = None
+                return
+            self._consecutive_failures += 1
+            if probe or self._consecutive_failures >= self.breaker_threshold:
+                if self._opened_at is None or probe:
+                    logger.warning(f"Opening {self.service} circuit breaker for {self.breaker_reset_seconds:g}s "
+                                   f"after {self._consecutive_failures} consecutive transient failures")
+                self._opened_at = time.monotonic()
+
+    def _release_probe(self, probe: bool):
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, attempt: Callable[[], Any], idempotent: bool = True,
+             result_status: Optional[Callable[[Any], Optional[int]]] = None,
+             discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Run `attempt` under this policy and return its result or raise its last error
+
+        Args:
+            attempt: Performs one request
+            idempotent: Safe to repeat (reads, upserts, PATCH/DELETE by key); enables
+                retries of any transient failure and hedging
+            result_status: For transports that return error responses instead of
+                raising - maps a result to its HTTP status so transient responses are
+                retried; the last response is returned when retries run out
+            discard: Releases a result that is not returned (superseded responses,
+                losing hedges)
+        """
+        for number in range(1, self.max_attempts + 1):
+            left = remaining()
+            if left is not None and left <= 0:
+                self._count("deadline_exceeded")
+                raise CallDeadlineExceeded(f"{self.service} call deadline exceeded")
+
+            probe = self._admit()
+            try:
+                result = self._attempt(attempt, idempotent, result_status, discard)
+            except TransientStatusError as e:
+                error: BaseException = e
+                transient = True
+            except Exception as e:
+                error = e
+                transient = is_transient(e)
+            else:
+                self._record(False, probe)
+                self._count("success")
+                return result
+
+            if isinstance(error, CallDeadlineExceeded):
+                # Our own budget ran out; says nothing about the service's health
+                self._release_probe(probe)
+                self._count("deadline_exceeded")
+                raise error
+
+            if not transient:
+                # The service answered; a bad request says nothing about its health
+                self._record(False, probe)
+                self._count("permanent_failure")
+                raise error
+
+            self._record(True, probe)
+            self._count("transient_failure")
+
+            delay = self._backoff(number)
+            left = remaining()
+            last = (number == self.max_attempts
+                    or not (idempotent or is_rejected(error))
+                    or (left is not None and left <= delay))
+            if last:
+                if left is not None and left <= delay and number < self.max_attempts:
+                    self._count("deadline_exceeded")
+                if isinstance(error, TransientStatusError):
+                    return error.result
+                raise error
+
+            if isinstance(error, TransientStatusError) and discard:
+                discard(error.result)
+            logger.debug(f"Retrying {self.service} call in {delay:.2f}s after transient failure "
+                         f"(attempt {number}/{self.max_attempts}): {error}")
+            self._count("retry")
+            time.sleep(delay)
+
+    def _once(self, attempt: Callable[[], Any], result_status: Optional[Callable[[Any], Optional[int]]]) -> Any:
+        result = attempt()
+        status = result_status(result) if result_status else None
+        if status in TRANSIENT_STATUSES:
+            raise TransientStatusError(status, result)
+        return result
+
+    def _attempt(self, attempt: Callable[[], Any], idempotent: bool,
+                 result_status: Optional[Callable[[Any], Optional[int]]],
+                 discard: Optional[Callable[[Any], None]]) -> Any:
+        if not (idempotent and self.hedge_after_seconds > 0):
+            return self._once(attempt, result_status)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=Config.HEDGE_MAX_WORKERS,
+                                                    thread_name_prefix=f"hedge-{self.service}")
+        submit = lambda: self._executor.submit(contextvars.copy_context().run, self._once, attempt, result_status)
+
+        first = submit()
+        futures = {first}
+        done, _ = wait(futures, timeout=self.hedge_after_seconds)
+        left = remaining()
+        if not done and (left is None or left > 0):
+            self._count("hedge_launched")
+            futures.add(submit())
+
+        pending = futures
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winners = [future for future in done if future.exception() is None]
+            if not winners:
+                for future in done:
+                    if error is None:
+                        error = future.exception()
+                    elif isinstance(future.exception(), TransientStatusError) and discard:
+                        discard(future.exception().result)
+                continue
+
+            for future in winners[1:]:
+                _discard_future(future, discard)
+            for future in pending:
+                future.add_done_callback(lambda f: _discard_future(f, discard))
+            if winners[0] is not first:
+                self._count("hedge_won")
+            return winners[0].result()
+        raise error
+
+def _discard_future(future: Future, discard: Optional[Callable[[Any], None]]):
+    if discard and not future.cancelled() and future.exception() is None:
+        discard(future.result())
+
+# One policy (and so one circuit breaker) per external service, shared by all its clients
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+def get_policy(service: str) -> ResiliencePolicy:
+    """Shared policy for "gmail", "supabase" or "llm", configured from Config"""
+    with _policies_lock:
+        policy = _policies.get(service)
+        if policy is None:
+            hedge_after = {
+                "gmail": Config.GMAIL_HEDGE_AFTER_SECONDS,
+                "supabase": Config.SUPABASE_HEDGE_AFTER_SECONDS,
+            }.get(service, 0.0)
+            policy = _policies[service] = ResiliencePolicy(service, hedge_after_seconds=hedge_after)
+        return policy
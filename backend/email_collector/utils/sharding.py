@@ -0,0 +1,76 @@
+import os
+import hashlib
+import logging
+from typing import Iterable, List
+from ..config import Config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class Shard:
+    """
+    One of `count` stable hash partitions of the mailbox (--shard index/count)
+
+    A Gmail thread belongs to shard md5(gmail_thread_id)[:8] mod count, so every
+    process (and the claim_threads_for_processing RPC, see
+    sql/add_sharded_processing.sql) agrees on ownership without coordination, and
+    a thread stays in its shard across runs. Indices are 0-based.
+    """
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index}/{count}: expected 0 <= index < count")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """Parse "i/N" as given to --shard"""
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{spec}': expected INDEX/COUNT, e.g. 0/4")
+        return cls(index, count)
+
+    @staticmethod
+    def bucket(key: str, count: int) -> int:
+        """Stable shard number of a key (same result in every process and in SQL)"""
+        return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16) % count
+
+    def owns(self, gmail_thread_id: str) -> bool:
+        return self.count == 1 or self.bucket(gmail_thread_id, self.count) == self.index
+
+    def filter(self, gmail_thread_ids: Iterable[str]) -> List[str]:
+        return [thread_id for thread_id in gmail_thread_ids if self.owns(thread_id)]
+
+    def path(self, path: str) -> str:
+        """Per-shard variant of a local state file: run_metrics.json -> run_metrics.shard-1-of-4.json"""
+        if not path:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.shard-{self.index}-of-{self.count}{ext}"
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}, {self.count})"
+
+def configure_shard(shard: Shard) -> None:
+    """
+    Give this process its shard's own checkpoint files and limiter budget
+
+    Per-process state (daemon lock, run reports) gets a per-shard file so shards
+    on one host never overwrite each other, and the per-mailbox Gmail quota is
+    split evenly because every shard reads the same mailboxes. The near-duplicate
+    index stays shared: near-duplicates hash to different shards, so each shard
+    merges and reloads the one file (NearDuplicateIndex.sync / refresh) to match
+    rows the others stored. Prometheus series carry a shard label so per-shard
+    textfiles don't collide.
+    """
+    Config.DAEMON_LOCK_PATH = shard.path(Config.DAEMON_LOCK_PATH)
+    Config.METRICS_JSON_PATH = shard.path(Config.METRICS_JSON_PATH)
+    Config.METRICS_PROMETHEUS_PATH = shard.path(Config.METRICS_PROMETHEUS_PATH)
+    Config.GMAIL_QUOTA_UNITS_PER_SECOND = Config.GMAIL_QUOTA_UNITS_PER_SECOND / shard.count
+    metrics.labels["shard"] = str(shard)
+    logger.info(f"Running as shard {shard} (Gmail quota {Config.GMAIL_QUOTA_UNITS_PER_SECOND:g} units/s per mailbox)")
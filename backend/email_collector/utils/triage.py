@@ -0,0 +1,87 @@
+import logging
+from typing import List, Dict, Any
+from ..config import Config
+from ..database.models import EmailMessage, EmailThread, TriageResult
+from .keywords import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+class RelevanceTriage:
+    """Cheap local relevance gate that runs before a thread is sent to Gemini"""
+
+    def __init__(self, keyword_matcher: KeywordMatcher = None):
+        self.keyword_matcher = keyword_matcher or KeywordMatcher()
+        self.min_keyword_score = Config.TRIAGE_MIN_KEYWORD_SCORE
+        self.spam_override_score = Config.TRIAGE_SPAM_OVERRIDE_SCORE
+
+    def describe_thresholds(self) -> str:
+        """Human-readable summary of the active thresholds (logged once per run)"""
+        return (
+            f"min_keyword_score={self.min_keyword_score}, "
+            f"spam_override_score={self.spam_override_score}"
+        )
+
+    def evaluate(self, thread: EmailThread, messages: List[EmailMessage]) -> TriageResult:
+        """
+        Score a thread locally and decide whether it needs an LLM call
+
+        A thread is skipped when every external message matches the spam/automated
+        patterns and the keyword score is below the spam override, or when the
+        keyword score is below the minimum. Everything else goes to the model.
+        """
+        if not messages:
+            return TriageResult(send_to_llm=True, reasoning="No messages to triage")
+
+        # Best per-message score so long quoted histories don't inflate the total
+        keyword_score = max(self.keyword_matcher.get_keyword_scores_batch(
+            [(message.subject, message.body_text, message.snippet) for message in messages]
+        ))
+
+        external_messages = [message for message in messages if not message.is_from_user] or messages
+        spam_flagged = all(
+            not self.keyword_matcher.filter_spam_patterns(message.subject, message.body_text, message.sender_email)
+            for message in external_messages
+        )
+
+        if spam_flagged and keyword_score < self.spam_override_score:
+            return TriageResult(
+                send_to_llm=False,
+                keyword_score=keyword_score,
+                spam_flagged=True,
+                reasoning=(
+                    f"Skipped LLM: spam/automated patterns in all external messages and "
+                    f"keyword score {keyword_score:.1f} < {self.spam_override_score}"
+                )
+            )
+
+        if keyword_score < self.min_keyword_score:
+            return TriageResult(
+                send_to_llm=False,
+                keyword_score=keyword_score,
+                spam_flagged=spam_flagged,
+                reasoning=f"Skipped LLM: keyword score {keyword_score:.1f} < {self.min_keyword_score}"
+            )
+
+        return TriageResult(
+            send_to_llm=True,
+            keyword_score=keyword_score,
+            spam_flagged=spam_flagged,
+            reasoning=f"Sent to LLM: keyword score {keyword_score:.1f}" + (" (spam override)" if spam_flagged else "")
+        )
+
+    def build_local_llm_data(self, thread: EmailThread, messages: List[EmailMessage], triage: TriageResult) -> Dict[str, Any]:
+        """Cheap keyword-based extraction used in place of Gemini for skipped threads"""
+        combined_text = " ".join(f"{message.subject} {message.body_text}" for message in messages)
+        org_hints = self.keyword_matcher.extract_organization_hints(combined_text)
+
+        return {
+            "sponsor_org_name": org_hints[0].strip() if org_hints else None,
+            "value_type": self.keyword_matcher.categorize_sponsorship_type(combined_text),
+            "sponsor_confidence_score": 0.0,
+            "priority_level": "LOW",
+            "auto_priority_reasoning": f"Triage: {triage.reasoning}",
+            "next_action_status": "read",
+            "next_action_description": None,
+            "triage_score": triage.keyword_score,
+            "triage_reasoning": triage.reasoning,
+        }
@@ -0,0 +1,171 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import Config
+from ..database.models import ValueEstimate
+
+class ValueNormalizer:
+    """
+    Parses free-text sponsorship values ('$5,000', '2.5k', '€2-5k', 'up to 10k USD')
+    into integer min/max cents and an ISO currency code
+
+    Strings without an amount ('TBD', 'in-kind') or whose numbers clearly count
+    something other than money ('50 t-shirts') parse to an empty estimate.
+    """
+
+    # Checked longest first so 'C$' wins over '$'
+    CURRENCY_SYMBOLS = {
+        'US$': 'USD', 'CA$': 'CAD', 'AU$': 'AUD', 'C$': 'CAD', 'A$': 'AUD',
+        '$': 'USD', '€': 'EUR', '£': 'GBP', '¥': 'JPY', '₹': 'INR',
+    }
+    CURRENCY_WORDS = {
+        'usd': 'USD', 'dollar': 'USD', 'dollars': 'USD',
+        'eur': 'EUR', 'euro': 'EUR', 'euros': 'EUR',
+        'gbp': 'GBP', 'pound': 'GBP', 'pounds': 'GBP',
+        'cad': 'CAD', 'aud': 'AUD', 'chf': 'CHF',
+        'jpy': 'JPY', 'yen': 'JPY', 'inr': 'INR', 'rupees': 'INR',
+    }
+    MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'mm': 1_000_000, 'million': 1_000_000}
+
+    # Words that may surround an amount without making it non-monetary
+    FILLER_WORDS = frozenset({
+        'approx', 'approximately', 'about', 'around', 'roughly', 'estimated', 'est',
+        'up', 'to', 'between', 'and', 'or', 'over', 'under', 'at', 'least', 'max',
+        'maximum', 'min', 'minimum', 'plus', 'total', 'value', 'worth', 'per', 'year',
+        'annual', 'annually', 'cash', 'in', 'funding', 'sponsorship', 'budget',
+    })
+
+    _AMOUNT_REGEX = re.compile(
+        r'(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*(?P<suffix>thousand|million|mm|k|m)?\b',
+        re.IGNORECASE
+    )
+    _RANGE_CONNECTOR_REGEX = re.compile(r'^\s*(?:-|–|—|to|and)\s*[^\d]{0,4}$', re.IGNORECASE)
+    _UPPER_BOUND_REGEX = re.compile(r'\b(?:up\s+to|under|max(?:imum)?|at\s+most|<)\s*[^\d]{0,4}$', re.IGNORECASE)
+    _LOWER_BOUND_REGEX = re.compile(r'\b(?:at\s+least|over|min(?:imum)?|>)\s*[^\d]{0,4}$', re.IGNORECASE)
+    _WORD_REGEX = re.compile(r'[a-z]+', re.IGNORECASE)
+
+    @classmethod
+    def _detect_currency(cls, text: str) -> Tuple[Optional[str], str, List[Tuple[int, int, str]]]:
+        """
+        Return (first currency code, text with currency markers blanked out, markers)
+
+        Markers are replaced by spaces of the same length, so their (start, end,
+        code) spans still line up with amounts found in the stripped text.
+        """
+        markers: List[Tuple[int, int, str]] = []
+        for symbol in sorted(cls.CURRENCY_SYMBOLS, key=len, reverse=True):
+            position = text.find(symbol)
+            while position != -1:
+                markers.append((position, position + len(symbol), cls.CURRENCY_SYMBOLS[symbol]))
+                text = text[:position] + ' ' * len(symbol) + text[position + len(symbol):]
+                position = text.find(symbol, position + len(symbol))
+
+        def replace_word(match):
+            code = cls.CURRENCY_WORDS.get(match.group(0).lower())
+            if code:
+                markers.append((match.start(), match.end(), code))
+                return ' ' * len(match.group(0))
+            return match.group(0)
+
+        stripped = cls._WORD_REGEX.sub(replace_word, text)
+        markers.sort()
+        return (markers[0][2] if markers else None), stripped, markers
+
+    @classmethod
+    def _amounts(cls, text: str) -> List[Tuple[float, Optional[str], re.Match]]:
+        amounts = []
+        for match in cls._AMOUNT_REGEX.finditer(text):
+            value = float(match.group('number').replace(',', ''))
+            suffix = (match.group('suffix') or '').lower() or None
+            amounts.append((value, suffix, match))
+        return amounts
+
+    @staticmethod
+    def _attached_currency(stripped: str, match: re.Match, markers: List[Tuple[int, int, str]]) -> Optional[str]:
+        """Currency of a marker directly before or after an amount ('$5,000', '1,000 euros')"""
+        for start, end, code in markers:
+            if end <= match.start() and not stripped[end:match.start()].strip():
+                return code
+            if start >= match.end() and not stripped[match.end():start].strip():
+                return code
+        return None
+
+    @classmethod
+    def _is_money_tail(cls, text: str) -> bool:
+        """True when only currency or filler words follow an amount (currency markers are already blanked)"""
+        return all(word.lower() in cls.FILLER_WORDS for word in cls._WORD_REGEX.findall(text))
+
+    @classmethod
+    def parse(cls, text: Optional[str]) -> ValueEstimate:
+        """Parse a value string into a ValueEstimate (all fields None when unparseable)"""
+        if not text or not text.strip():
+            return ValueEstimate()
+
+        currency, stripped, markers = cls._detect_currency(text)
+        amounts = cls._amounts(stripped)
+        if not amounts:
+            return ValueEstimate()
+
+        # Without a currency marker, leftover words mean the number counts something else
+        if currency is None:
+            residual = cls._AMOUNT_REGEX.sub(' ', stripped)
+            if any(word.lower() not in cls.FILLER_WORDS for word in cls._WORD_REGEX.findall(residual)):
+                return ValueEstimate()
+            currency = Config.DEFAULT_VALUE_CURRENCY
+
+        # The amount carrying the currency marker wins over stray numbers ('2025 Gold tier: $5,000')
+        first = 0
+        for position, (_, _, match) in enumerate(amounts):
+            attached = cls._attached_currency(stripped, match, markers)
+            if attached:
+                first, currency = position, attached
+                # '2 to 5k euros' - the marker sits on the upper end of a range
+                if position and cls._RANGE_CONNECTOR_REGEX.match(stripped[amounts[position - 1][2].end():match.start()]):
+                    first = position - 1
+                break
+
+        low_value, low_suffix, low_match = amounts[first]
+        high_value, high_suffix = low_value, low_suffix
+
+        is_range = False
+        if len(amounts) > first + 1:
+            next_value, next_suffix, next_match = amounts[first + 1]
+            between = stripped[low_match.end():next_match.start()]
+            if cls._RANGE_CONNECTOR_REGEX.match(between):
+                # 'and' / 'to' join two amounts of money, not '$5000 and 50 t-shirts'
+                is_range = (
+                    not re.search(r'[a-z]', between, re.IGNORECASE)
+                    or cls._attached_currency(stripped, next_match, markers) is not None
+                    or cls._is_money_tail(stripped[next_match.end():])
+                )
+            if is_range:
+                high_value, high_suffix = next_value, next_suffix
+                # '2-5k' -> the suffix applies to both ends
+                if low_suffix is None:
+                    low_suffix = high_suffix
+
+        low = low_value * cls.MULTIPLIERS.get(low_suffix, 1)
+        high = high_value * cls.MULTIPLIERS.get(high_suffix, 1)
+        if low > high:
+            low, high = high, low
+
+        min_cents: Optional[int] = round(low * 100)
+        max_cents: Optional[int] = round(high * 100)
+
+        if not is_range:
+            prefix = stripped[:low_match.start()]
+            if cls._UPPER_BOUND_REGEX.search(prefix):
+                min_cents = None
+            elif cls._LOWER_BOUND_REGEX.search(prefix) or stripped[low_match.end():].lstrip().startswith('+'):
+                max_cents = None
+
+        return ValueEstimate(min_cents=min_cents, max_cents=max_cents, currency=currency)
+
+    @classmethod
+    def to_columns(cls, text: Optional[str]) -> Dict[str, Any]:
+        """Column values for email_threads.estimated_value_{min_cents,max_cents,currency}"""
+        estimate = cls.parse(text)
+        return {
+            "estimated_value_min_cents": estimate.min_cents,
+            "estimated_value_max_cents": estimate.max_cents,
+            "estimated_value_currency": estimate.currency,
+        }
@@ -6,7 +6,7 @@ setup(
     name="email_collector",
     version="0.1.0",
     description="Email Collector for Sponsorship CRM",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
     python_requires=">=3.8",
     install_requires=[
         "google-auth>=2.0.0",
@@ -16,6 +16,7 @@ setup(
         "supabase>=2.0.0",
         "python-dotenv>=1.0.0",
         "google-generativeai>=0.3.0",
+        "numpy>=1.24.0",
     ],
     entry_points={
         "console_scripts": [
@@ -0,0 +1,75 @@
+import os
+
+from email_collector.utils.dedup import NearDuplicateIndex
+
+def signature(index, subject, body="please find our sponsorship proposal attached for the spring event"):
+    return index.compute_signature(index.build_shingles(["partner@brand.com"], subject, body))
+
+def test_shards_match_rows_saved_by_each_other(tmp_path):
+    path = str(tmp_path / "dedup_index.npz")
+    shard_a = NearDuplicateIndex.load(path)
+    shard_b = NearDuplicateIndex.load(path)
+
+    shard_a.add("row-a", "gmail-a", signature(shard_a, "Spring sponsorship"))
+    shard_a.sync(path)
+    assert shard_b.find_duplicate(signature(shard_b, "Re: Spring sponsorship")) is None
+
+    shard_b.refresh(path)
+    assert shard_b.find_duplicate(signature(shard_b, "Re: Spring sponsorship"))[0] == "row-a"
+    assert not shard_b.dirty
+
+def test_sync_keeps_entries_saved_by_other_processes(tmp_path):
+    path = str(tmp_path / "dedup_index.npz")
+    shard_a = NearDuplicateIndex.load(path)
+    shard_b = NearDuplicateIndex.load(path)
+
+    shard_a.add("row-a", "gmail-a", signature(shard_a, "Spring sponsorship", "first"))
+    shard_b.add("row-b", "gmail-b", signature(shard_b, "Autumn sponsorship", "second"))
+    # Both rewrite the same row; each keeps its own newer version
+    shard_a.add("row-c", "gmail-c", signature(shard_a, "Winter", "from a"))
+    shard_b.add("row-c", "gmail-c", signature(shard_b, "Winter", "from b"))
+    shard_a.sync(path)
+    shard_b.sync(path)
+
+    merged = NearDuplicateIndex.load(path)
+    assert set(merged.signatures) == {"row-a", "row-b", "row-c"}
+    assert merged.gmail_ids == {"gmail-a": "row-a", "gmail-b": "row-b", "gmail-c": "row-c"}
+    assert (merged.signatures["row-c"] == signature(merged, "Winter", "from b")).all()
+    assert not os.path.exists(f"{path}.tmp.npz")
+
+def test_refresh_without_file_is_a_no_op(tmp_path):
+    index = NearDuplicateIndex()
+    index.refresh(str(tmp_path / "missing.npz"))
+    assert len(index) == 0
+
+def test_collecting_a_mailbox_twice_keeps_merged_threads_in_their_rows(tmp_path, monkeypatch):
+    import asyncio
+
+    from benchmarks.fakes import FakeSupabase
+    from benchmarks.mailbox import SyntheticMailbox
+    from benchmarks.pipeline_throughput import _build_collector, _configure
+    from email_collector.config import Config
+
+    settings = {"llm_latency_ms": 0, "gmail_quota_units": 1e9, "gmail_latency_ms": 0, "db_latency_ms": 0, "jitter_ms": 0}
+    for name in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "GMAIL_CLIENT_ID", "GMAIL_CLIENT_SECRET", "GMAIL_REFRESH_TOKEN",
+                 "GEMINI_API_KEY", "LLM_BACKEND", "LLM_SYNTHETIC_LATENCY_MS", "GMAIL_QUOTA_UNITS_PER_SECOND",
+                 "MAX_RESULTS_PER_QUERY", "DEDUP_INDEX_PATH", "METRICS_JSON_PATH", "METRICS_PROMETHEUS_PATH"):
+        monkeypatch.setattr(Config, name, getattr(Config, name))  # restored after the test
+    mailbox = SyntheticMailbox(200, seed=1)
+    _configure(settings, str(tmp_path), mailbox.message_total)
+    db = FakeSupabase()
+
+    def collect():
+        collector, _ = _build_collector(settings, mailbox, db)
+        return asyncio.run(collector.collect_new_emails())
+
+    first = collect()
+    merged = first.updated_threads
+    rows = {row["id"]: row["gmail_thread_id"] for row in db.tables["email_threads"]}
+    assert merged and len(rows) == 200 - merged
+    assert len(db.tables["email_thread_aliases"]) == merged
+
+    second = collect()
+    assert (second.new_threads, second.updated_threads) == (0, 200)
+    assert {row["id"]: row["gmail_thread_id"] for row in db.tables["email_threads"]} == rows
+    assert all(db.messages_by_thread.get(row_id) for row_id in rows)
@@ -0,0 +1,16 @@
+from email_collector.utils.keywords import KeywordMatcher
+
+# 'İ'.lower() is two characters, so lowercased offsets drift from the original text
+EXPANDING = "İ" * 50
+
+def test_find_keywords_batch_matches_single_text_results():
+    matcher = KeywordMatcher()
+    texts = [EXPANDING + " x", "sponsorship opportunity", "nothing here", "", None]
+    assert matcher.find_keywords_batch(texts) == [matcher.find_keywords_in_text(text or "") for text in texts]
+    assert matcher.find_keywords_batch(texts)[1] == ["sponsorship"]
+
+def test_keyword_scores_batch_matches_single_item_scores():
+    matcher = KeywordMatcher()
+    items = [(EXPANDING, "x", ""), ("Sponsorship opportunity", "", ""), ("hello", "brand partnership", ""),
+             (EXPANDING + " sponsor", "", "")]
+    assert matcher.get_keyword_scores_batch(items) == [matcher.get_keyword_score(*item) for item in items]
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from email_collector.database.models import EmailMessage
+from email_collector.utils.priority import PriorityCalculator
+
+def thread_of(*bodies):
+    """Messages oldest first, one day apart"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        EmailMessage(gmail_message_id=f"m{index}", sender_email="a@example.com", sender_name="A",
+                     subject="Partnership", body_text=body, snippet="", received_date=start + timedelta(days=index))
+        for index, body in enumerate(bodies)
+    ]
+
+@pytest.mark.parametrize("bodies, level, reasoning", [
+    (["Hello"], "LOW", "No urgency indicators in content"),
+    (["Deadline today"], "READ_NOW", "Urgent language detected: deadline"),
+    (["Please respond soon"], "NORMAL", "Time-sensitive language detected: please respond, soon"),
+    # The previous message still counts in full
+    (["Deadline today", "Thanks"], "READ_NOW", "Urgent language detected (earlier in thread): deadline"),
+    # Old or quoted urgency only lifts the thread to NORMAL
+    (["Deadline today", "Hi", "Thanks", "Sounds good"], "NORMAL", "Urgent language only in older or quoted messages: deadline"),
+    (["Hi", "Thanks", "Sounds good\n\nOn Mon, Jan 1, A wrote:\n> the deadline is today"],
+     "NORMAL", "Urgent language only in older or quoted messages: deadline"),
+    (["Sounds good\n> ASAP please"], "NORMAL", "Urgent language only in older or quoted messages: asap"),
+    (["Sounds good\r\n\r\nOn Mon, Jan 1, A wrote:\r\nThe deadline is today"],
+     "NORMAL", "Urgent language only in older or quoted messages: deadline"),
+    (["Waiting on you", "Hi", "Thanks", "Ok"], "NORMAL", "Time-sensitive language detected (earlier in thread): waiting"),
+    # The strongest segment is the one reported
+    (["Final notice", "ASAP please"], "READ_NOW", "Urgent language detected: asap"),
+])
+def test_analyze_content_urgency(bodies, level, reasoning):
+    assert PriorityCalculator.analyze_content_urgency(thread_of(*bodies)) == (level, reasoning)
+
+def test_analyze_content_urgency_without_messages():
+    assert PriorityCalculator.analyze_content_urgency([]) == ("NORMAL", "No messages to analyze")
@@ -0,0 +1,20 @@
+import pytest
+
+from email_collector.database.models import SponsorInfo
+from email_collector.llm.schema import coerce_model_fields
+
+@pytest.mark.parametrize("raw, expected", [
+    # Strings and numbers follow one rule: percent when '%' is given or above 1
+    (0.85, 0.85), ("0.85", 0.85),
+    (85, 0.85), ("85", 0.85), ("85%", 0.85),
+    (5, 0.05), ("5", 0.05), ("5%", 0.05),
+    (1, 1.0), ("1", 1.0), ("1%", 0.01),
+    (0, 0.0), ("0", 0.0),
+    # Out of range after scaling is clamped
+    (250, 1.0), ("-0.5", 0.0),
+    # No number: field default
+    ("high", 0.0), ("n/a", 0.0),
+])
+def test_confidence_score(raw, expected):
+    coerced = coerce_model_fields(SponsorInfo, {"confidence_score": raw})
+    assert coerced["confidence_score"] == pytest.approx(expected)
@@ -0,0 +1,17 @@
+import pytest
+
+from email_collector.gmail.client import GmailClient
+
+@pytest.mark.parametrize("body, expected", [
+    ("Hi team,\n\nWe'd love to sponsor.", "Hi team, We'd love to sponsor."),
+    ("Hi\n-- \nJohn Smith\nCEO", "Hi"),
+    ("Thanks!\n\nOn Mon, Jan 1, 2024 at 9:00 AM Jane <jane@example.com> wrote:\n> Earlier text", "Thanks!"),
+    ("Sounds good\n> quoted", "Sounds good"),
+    # Gmail text/plain bodies use CRLF line endings
+    ("Hi\r\n-- \r\nJohn Smith\r\nCEO", "Hi"),
+    ("Hi\r\n--\r\nJohn", "Hi"),
+    ("Thanks!\r\n\r\nOn Mon, Jan 1, 2024 at 9:00 AM Jane <jane@example.com> wrote:\r\nEarlier text", "Thanks!"),
+    ("", ""),
+])
+def test_build_search_text(body, expected):
+    assert GmailClient.build_search_text(body) == expected
@@ -0,0 +1,64 @@
+import pytest
+
+from email_collector.config import Config
+from email_collector.utils.directory import SponsorDirectory
+from email_collector.utils.values import ValueNormalizer
+
+@pytest.fixture(autouse=True)
+def default_currency(monkeypatch):
+    monkeypatch.setattr(Config, "DEFAULT_VALUE_CURRENCY", "USD")
+
+@pytest.mark.parametrize("text, min_cents, max_cents, currency", [
+    # Symbols
+    ("$5,000", 500_000, 500_000, "USD"),
+    ("€2-5k", 200_000, 500_000, "EUR"),
+    ("£750", 75_000, 75_000, "GBP"),
+    ("C$ 300", 30_000, 30_000, "CAD"),
+    ("₹50,000", 5_000_000, 5_000_000, "INR"),
+    # Currency words and codes
+    ("1,000 euros", 100_000, 100_000, "EUR"),
+    ("1000 CAD", 100_000, 100_000, "CAD"),
+    ("500 pounds", 50_000, 50_000, "GBP"),
+    ("CHF 2,000", 200_000, 200_000, "CHF"),
+    ("3 million yen", 300_000_000, 300_000_000, "JPY"),
+    ("up to 10k USD", None, 1_000_000, "USD"),
+    # Bare amounts use the default currency
+    ("2.5k", 250_000, 250_000, "USD"),
+    ("approximately 1500", 150_000, 150_000, "USD"),
+    # The amount next to the currency marker wins over other numbers
+    ("2025 Gold tier: $5,000", 500_000, 500_000, "USD"),
+    ("Tier 2: 1,500 euros", 150_000, 150_000, "EUR"),
+    # Ranges joined by words need money on both sides
+    ("$5000 and 50 t-shirts", 500_000, 500_000, "USD"),
+    ("$2,000 to $5,000", 200_000, 500_000, "USD"),
+    ("2 to 5k euros", 200_000, 500_000, "EUR"),
+    ("between 1000 and 2000", 100_000, 200_000, "USD"),
+    # Open-ended bounds
+    ("at least $500", 50_000, None, "USD"),
+    ("1000+", 100_000, None, "USD"),
+    # No monetary amount
+    ("TBD", None, None, None),
+    ("in-kind", None, None, None),
+    ("50 t-shirts", None, None, None),
+    ("", None, None, None),
+    (None, None, None, None),
+])
+def test_parse(text, min_cents, max_cents, currency):
+    estimate = ValueNormalizer.parse(text)
+    assert (estimate.min_cents, estimate.max_cents, estimate.currency) == (min_cents, max_cents, currency)
+
+def test_to_columns():
+    assert ValueNormalizer.to_columns("€2-5k") == {
+        "estimated_value_min_cents": 200_000,
+        "estimated_value_max_cents": 500_000,
+        "estimated_value_currency": "EUR",
+    }
+
+@pytest.mark.parametrize("text, value", [
+    ("$5,000", 5000.0),
+    ("€2-5k", None),  # Organization totals are kept in the default currency only
+    ("500 pounds", None),
+    ("TBD", None),
+])
+def test_organization_value(text, value):
+    assert SponsorDirectory.organization_value(ValueNormalizer.parse(text)) == value
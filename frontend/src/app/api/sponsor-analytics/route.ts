@@ -21,42 +21,39 @@ export async function GET(request: NextRequest) {
 
     const totalSponsors = totalData?.length || 0
 
-    // Get total estimated value (sum of numeric values)
-    const { data: valueData, error: valueError } = await supabase
-      .from('email_threads')
-      .select('estimated_value_amount, value_type')
-      .not('sponsor_org_name', 'is', null)
-      .not('estimated_value_amount', 'is', null)
+    // Value totals are aggregated in SQL over the parsed value columns
+    const { data: valueSummary, error: valueError } = await supabase
+      .rpc('sponsor_value_summary')
 
     if (valueError) {
       console.error('Error getting sponsor values:', valueError)
       return NextResponse.json({ error: valueError.message }, { status: 500 })
     }
 
-    // Calculate total value
-    let totalValue = 0
+    let totalValueCents = 0
     let monetaryCount = 0
     let inKindCount = 0
-    
-    valueData?.forEach((thread: any) => {
-      // Count by value type
-      if (thread.value_type === 'monetary' || thread.value_type === 'equipment') {
-        monetaryCount++
-      } else {
-        inKindCount++
-      }
 
-      // Extract numeric value from estimated_value_amount
-      if (thread.estimated_value_amount) {
-        const numericValue = thread.estimated_value_amount.toString()
-          .replace(/[^0-9.]/g, '') // Remove non-numeric characters except decimal
-        const value = parseFloat(numericValue)
-        if (!isNaN(value)) {
-          totalValue += value
-        }
+    valueSummary?.forEach((row: any) => {
+      monetaryCount += Number(row.monetary_count) || 0
+      inKindCount += Number(row.in_kind_count) || 0
+
+      // Dashboard total is shown in USD; other currencies are reported separately
+      if (row.currency === 'USD') {
+        totalValueCents += Number(row.total_min_cents) || 0
       }
     })
 
+    const totalValue = totalValueCents / 100
+    const valueByCurrency = (valueSummary || [])
+      .filter((row: any) => row.currency)
+      .map((row: any) => ({
+        currency: row.currency,
+        threads: Number(row.thread_count) || 0,
+        minTotal: (Number(row.total_min_cents) || 0) / 100,
+        maxTotal: (Number(row.total_max_cents) || 0) / 100
+      }))
+
     // Get priority breakdown
     const { data: priorityData, error: priorityError } = await supabase
       .from('email_threads')
@@ -80,6 +77,7 @@ export async function GET(request: NextRequest) {
       monetarySponsors: monetaryCount,
       inKindSponsors: inKindCount,
       highPrioritySponsors,
+      valueByCurrency,
       // Additional stats for the dashboard
       otherStat: monetaryCount.toString(),
       anotherStat: inKindCount.toString()
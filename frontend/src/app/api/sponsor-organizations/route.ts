@@ -0,0 +1,70 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { createClient } from '@supabase/supabase-js'
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL!,
+  process.env.SUPABASE_SERVICE_ROLE_KEY!
+)
+
+// Sort keys backed by indexes on sponsor_organizations
+const SORT_COLUMNS: Record<string, string> = {
+  recent: 'last_contact_at',
+  value: 'total_value'
+}
+
+export async function GET(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url)
+    const limit = parseInt(searchParams.get('limit') || '50')
+    const sortColumn = SORT_COLUMNS[searchParams.get('sort') || 'recent'] || SORT_COLUMNS.recent
+
+    // Aggregates are maintained by the collector, so this never scans email_threads
+    const { data: organizations, error } = await supabase
+      .from('sponsor_organizations')
+      .select(`
+        id,
+        domain,
+        name,
+        thread_count,
+        last_contact_at,
+        total_value,
+        contacts (
+          id,
+          email,
+          name,
+          last_contact_at
+        )
+      `)
+      .gt('thread_count', 0)
+      .order(sortColumn, { ascending: false, nullsFirst: false })
+      .limit(limit)
+
+    if (error) {
+      console.error('Supabase error:', error)
+      return NextResponse.json({ error: error.message }, { status: 500 })
+    }
+
+    const result = (organizations || []).map((org: any) => ({
+      id: org.id,
+      domain: org.domain,
+      name: org.name,
+      threadCount: org.thread_count,
+      lastContactAt: org.last_contact_at,
+      totalValue: Number(org.total_value) || 0,
+      contacts: (org.contacts || []).map((contact: any) => ({
+        id: contact.id,
+        email: contact.email,
+        name: contact.name,
+        lastContactAt: contact.last_contact_at
+      }))
+    }))
+
+    return NextResponse.json(result)
+  } catch (error) {
+    console.error('API error:', error)
+    return NextResponse.json(
+      { error: 'Internal server error' },
+      { status: 500 }
+    )
+  }
+}
@@ -50,7 +50,12 @@ export async function GET(request: NextRequest) {
         first_message_date,
         last_message_date,
         message_count,
-        participants
+        participants,
+        last_message_sender_name,
+        last_message_subject,
+        last_message_snippet,
+        last_message_from_user,
+        last_received_date
       `)
       .not('sponsor_org_name', 'is', null) // Only threads with identified sponsors
       .order('created_at', { ascending: false })
@@ -65,31 +70,8 @@ export async function GET(request: NextRequest) {
       return NextResponse.json([])
     }
 
-    // For each thread, get the last message to determine direction
-    const sponsorsWithLastMessage = await Promise.all(
-      threads.map(async (thread: any) => {
-        // Get the most recent message for this thread to determine direction and content
-        const { data: lastMessage } = await supabase
-          .from('email_messages')
-          .select('is_from_user, received_date, sender_email, sender_name, snippet, subject')
-          .eq('thread_id', thread.id)
-          .order('received_date', { ascending: false })
-          .limit(1)
-          .single()
-
-        return {
-          ...thread,
-          lastMessageFromUser: lastMessage?.is_from_user || false,
-          actualLastMessageDate: lastMessage?.received_date || thread.last_message_date,
-          lastMessageSender: lastMessage?.sender_name || 'Unknown',
-          lastMessageSnippet: lastMessage?.snippet || '',
-          lastMessageSubject: lastMessage?.subject || ''
-        }
-      })
-    )
-
-    // Transform email threads to sponsor format
-    const sponsors = sponsorsWithLastMessage.map((thread: any) => ({
+    // Transform email threads to sponsor format (last-message fields are denormalized at ingest)
+    const sponsors = threads.map((thread: any) => ({
       id: thread.id,
       name: thread.sponsor_org_name || 'Unknown Organization',
       type: mapValueTypeToSponsorType(thread.value_type),
@@ -106,11 +88,12 @@ export async function GET(request: NextRequest) {
       messageCount: thread.message_count,
       firstMessageDate: thread.first_message_date,
       lastMessageDate: thread.last_message_date,
-      actualLastMessageDate: thread.actualLastMessageDate,
-      lastMessageFromUser: thread.lastMessageFromUser,
-      lastMessageSender: thread.lastMessageSender,
-      lastMessageSnippet: thread.lastMessageSnippet,
-      lastMessageSubject: thread.lastMessageSubject,
+      actualLastMessageDate: thread.last_message_date,
+      lastReceivedDate: thread.last_received_date,
+      lastMessageFromUser: thread.last_message_from_user || false,
+      lastMessageSender: thread.last_message_sender_name || 'Unknown',
+      lastMessageSnippet: thread.last_message_snippet || '',
+      lastMessageSubject: thread.last_message_subject || '',
       // Deprecated AI fields (use actual message data above instead)
       priority: thread.priority_level, // DEPRECATED
       processed: thread.llm_processed, // DEPRECATED